@@ -18,10 +18,16 @@
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
+import argparse
 import json
 import re
 import sys
 
+parser = argparse.ArgumentParser(description="Generates Python API wrappers from wrapper_table.json (read from stdin).")
+parser.add_argument("--aio", action="store_true",
+                    help="Generate coroutine wrappers for dxpy.aio instead of the synchronous dxpy.api wrappers")
+args = parser.parse_args()
+
 preamble = '''# Do not modify this file by hand.
 #
 # It is automatically generated by src/api_wrappers/generatePythonAPIWrappers.py.
@@ -34,6 +40,16 @@ import sys
 from dxpy import DXHTTPRequest
 '''
 
+aio_preamble = '''# Do not modify this file by hand.
+#
+# It is automatically generated by src/api_wrappers/generatePythonAPIWrappers.py.
+# (Run make api_wrappers to update it.)
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+from dxpy.aio import DXHTTPRequest
+'''
+
 class_method_template = '''def {legacy_wrapper_method_name}(*args, **kwargs):
     """
 
@@ -86,6 +102,36 @@ def {wrapper_method_name}(app_name_or_id, alias=None, input_params={{}}, always_
     return DXHTTPRequest('/%s/{api_method_name}' % fully_qualified_version, input_params, always_retry=always_retry, **kwargs)
 '''
 
+aio_class_method_template = '''async def {wrapper_method_name}(input_params={{}}, always_retry={retry}, **kwargs):
+    """
+    Invokes the {route} API method.{wiki_ref}
+    """
+    return await DXHTTPRequest('{route}', input_params, always_retry=always_retry, **kwargs)
+'''
+
+aio_object_method_template = '''async def {wrapper_method_name}(object_id, input_params={{}}, always_retry={retry}, **kwargs):
+    """
+    Invokes the {route} API method.{wiki_ref}
+    """
+    return await DXHTTPRequest('/%s/{api_method_name}' % object_id, input_params, always_retry=always_retry, **kwargs)
+'''
+
+aio_app_object_method_template = '''async def {wrapper_method_name}(app_name_or_id, alias=None, input_params={{}}, always_retry={retry}, **kwargs):
+    """
+    Invokes the /app-xxxx/{api_method_name} API method.{wiki_ref}
+    """
+    fully_qualified_version = app_name_or_id + (('/' + alias) if alias else '')
+    return await DXHTTPRequest('/%s/{api_method_name}' % fully_qualified_version, input_params, always_retry=always_retry, **kwargs)
+'''
+
+if args.aio:
+    # The coroutine wrappers are new, so the deprecated camelCase aliases are
+    # not carried over to them.
+    preamble = aio_preamble
+    class_method_template = aio_class_method_template
+    object_method_template = aio_object_method_template
+    app_object_method_template = aio_app_object_method_template
+
 def make_wiki_ref(url):
     return ("\n\n    For more info, see: " + url) if url else ""
 
@@ -127,6 +127,7 @@ from __future__ import print_function, unicode_literals, division, absolute_impo
 
 import os, sys, json, time, logging, platform, ssl, traceback
 import errno
+import functools
 import math
 import mmap
 import requests
@@ -138,7 +139,7 @@ from random import randint
 from requests.auth import AuthBase
 from requests.packages import urllib3
 from requests.packages.urllib3.packages.ssl_match_hostname import match_hostname
-from .compat import USING_PYTHON2, expanduser, BadStatusLine, StringIO
+from .compat import USING_PYTHON2, expanduser, BadStatusLine, basestring
 from threading import Lock
 try:
     from urllib.parse import urlsplit
@@ -205,6 +206,51 @@ _expected_exceptions = (exceptions.network_exceptions, exceptions.DXAPIError, Ba
 _pool_mutex = Lock()
 _pool_manager = None
 
+from .connection_health import ConnectionHealthTracker as _ConnectionHealthTracker
+from . import connection_health as _connection_health
+from . import json_stream as _json_stream
+from . import json_codec as _json_codec
+from .concurrency_control import ConcurrencyController as _ConcurrencyController
+from .concurrency_control import MAX_LATENCY_SAMPLE_BYTES as _MAX_LATENCY_SAMPLE_BYTES
+
+_concurrency_controller = _ConcurrencyController(enabled=os.environ.get('DX_ADAPTIVE_CONCURRENCY') == '1')
+
+from . import retry_policy as _retry_policy
+from . import metrics as _metrics
+from . import cassette as _cassette
+
+_cassette_recorder = _cassette.CassetteRecorder(os.environ['DX_RECORD_CASSETTE']) \
+    if os.environ.get('DX_RECORD_CASSETTE') else None
+
+from . import metadata_cache as _metadata_cache_module
+from . import block_cache as _block_cache_module
+from . import download_cache as _download_cache_module
+from . import download_url_cache as _download_url_cache_module
+from . import hedging as _hedging
+
+_metadata_cache = None
+# Shared by DXFile handlers; see set_block_cache
+_block_cache = None
+# Used by download_dxfile; see set_download_cache
+_download_cache = None
+# Shared by all DXFile handlers; see set_download_url_cache
+_download_url_cache = _download_url_cache_module.DownloadURLCache()
+# Applied to ranged reads of files; see set_read_hedging
+_hedge_policy = None
+# Whether DXFile chooses part sizes from measured throughput; see set_adaptive_part_sizing
+_adaptive_part_sizing = False
+
+_retry_budget = _retry_policy.RetryBudget() if os.environ.get('DX_RETRY_BUDGET') == '1' else None
+_circuit_breakers = _retry_policy.CircuitBreakerRegistry(enabled=os.environ.get('DX_CIRCUIT_BREAKER') == '1')
+
+_connection_health_tracker = _ConnectionHealthTracker()
+
+# Errors after which the connection a response was received on may be left in
+# an inconsistent state, e.g. with unread bytes of a truncated body (observed
+# as "ResponseNotReady" errors when the connection is reused).
+_suspect_connection_exceptions = (exceptions.ContentLengthError, exceptions.BadJSONInReply,
+                                  exceptions.UrllibInternalError, urllib3.exceptions.ProtocolError)
+
 def _get_proxy_info(url):
     proxy_info = {}
 
@@ -336,6 +382,32 @@ def _extract_retry_after_timeout(response):
     return max(1, seconds_to_wait)
 
 
+def _body_length(data):
+    '''Returns the size of a request body, or infinity if it cannot be
+    determined without consuming the body.'''
+    if data is None:
+        return 0
+    try:
+        return len(data)
+    except TypeError:
+        return float('inf')
+
+
+def _record_attempt(method, route, response, time_sent, body, streamed):
+    '''Records a request attempt in :data:`dxpy.metrics.registry`.'''
+    request_bytes = _body_length(body)
+    response_bytes = 0
+    if response is not None:
+        if streamed and response.status // 100 == 2:
+            response_bytes = int(response.headers.get('content-length', 0))
+        else:
+            response_bytes = response.tell()
+    _metrics.registry.observe_request(method, route, response.status if response is not None else None,
+                                      time.time() - time_sent,
+                                      request_bytes=request_bytes if request_bytes != float('inf') else 0,
+                                      response_bytes=response_bytes)
+
+
 # Truncate the message, if the error injection flag is on, and other
 # conditions hold. This causes a BadRequest 400 HTTP code, which is
 # subsequentally retried.
@@ -368,7 +440,7 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
                   timeout=DEFAULT_TIMEOUT,
                   use_compression=None, jsonify_data=True, want_full_response=False,
                   decode_response_body=True, prepend_srv=True, session_handler=None,
-                  max_retries=DEFAULT_RETRIES, always_retry=False,
+                  max_retries=DEFAULT_RETRIES, always_retry=False, stream_json_array=None,
                   **kwargs):
     '''
     :param resource: API server route, e.g. "/record/new". If *prepend_srv* is False, a fully qualified URL is expected. If this argument is a callable, it will be called just before each request attempt, and expected to return a tuple (URL, headers). Headers returned by the callback are updated with *headers* (including headers set by this method).
@@ -411,7 +483,9 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
                         - Note: It is not guaranteed that the request will *always* be retried on failure; rather, this is an indication to the function that it would be safe to do so.
 
     :type always_retry: boolean
-    :returns: Response from API server in the format indicated by *want_full_response* and *decode_response_body*.
+    :param stream_json_array: If given, the name of an array-valued field of the (JSON) response; the response body is decoded incrementally as it is received, and a :class:`~dxpy.json_stream.DXJSONStream` over the elements of that field is returned instead of the decoded response. Takes precedence over *want_full_response* and *decode_response_body*.
+    :type stream_json_array: string
+    :returns: Response from API server in the format indicated by *want_full_response*, *decode_response_body*, and *stream_json_array*.
     :raises: :exc:`exceptions.DXAPIError` or a subclass if the server returned a non-200 status code; :exc:`requests.exceptions.HTTPError` if an invalid response was received from the server; or :exc:`requests.exceptions.ConnectionError` if a connection cannot be established.
 
     Wrapper around :meth:`requests.request()` that makes an HTTP
@@ -429,6 +503,26 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
 
     global _UPGRADE_NOTIFY
 
+    metadata_cache, cache_key, cache_generation, invalidates_metadata = _metadata_cache, None, None, False
+    if metadata_cache is not None and prepend_srv:
+        if not _metadata_cache_module.is_read_only(resource):
+            invalidates_metadata = True
+        elif jsonify_data and decode_response_body and not want_full_response and stream_json_array is None:
+            cache_key = metadata_cache.key_for(resource, data)
+            if cache_key is not None:
+                cache_generation, content = metadata_cache.get(cache_key)
+                if content is not None:
+                    return content
+
+    reissue_request = None
+    if stream_json_array is not None:
+        # Used to resume a stream whose connection fails after some of its
+        # elements have already been produced
+        reissue_request = functools.partial(DXHTTPRequest, resource, data, method=method, headers=dict(headers),
+                                            auth=auth, timeout=timeout, jsonify_data=jsonify_data,
+                                            prepend_srv=prepend_srv, max_retries=max_retries,
+                                            always_retry=always_retry, stream_json_array=stream_json_array, **kwargs)
+
     url = APISERVER + resource if prepend_srv else resource
     method = method.upper()  # Convert method name to uppercase, to ease string comparisons later
 
@@ -456,10 +550,13 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
                 formatted_data = "<binary data>"
 
     if jsonify_data:
-        data = json.dumps(data)
+        data = _json_codec.dumps_bytes(data)
         if 'Content-Type' not in headers and method == 'POST':
             headers['Content-Type'] = 'application/json'
 
+    if invalidates_metadata:
+        metadata_cache.invalidate(resource, data if isinstance(data, (bytes, basestring)) else None)
+
     # If the input is a buffer, its data gets consumed by
     # requests.request (moving the read position). Record the initial
     # buffer position so that we can return to it if the request fails
@@ -468,10 +565,16 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
     if hasattr(data, 'seek') and hasattr(data, 'tell'):
         rewind_input_buffer_offset = data.tell()
 
+    if _retry_budget is not None:
+        _retry_budget.record_request()
+
+    route = _metrics.route_for_path(resource) if prepend_srv else None
+
     try_index = 0
     while True:
         success, time_started = True, None
-        response = None
+        response, pool_key, limiter, breaker, is_probe = None, None, None, None, False
+        request_route, time_sent, body = None, None, None
         try:
             if _DEBUG > 0:
                 time_started = time.time()
@@ -488,9 +591,27 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
 
             body = _maybe_trucate_request(_url, try_index, data)
 
+            pool_key = _connection_health.get_pool_key(_url)
+            request_route = route if route is not None else pool_key[1]
+            breaker = _circuit_breakers.get_breaker(pool_key)
+            if breaker is not None:
+                is_probe = breaker.before_request()
+            host_limiter = _concurrency_controller.get_limiter(pool_key)
+            if host_limiter is not None:
+                _metrics.registry.observe_pool_wait(method, request_route, host_limiter.acquire())
+                limiter = host_limiter
+            time_sent = time.time()
+
             # throws BadStatusLine if the server returns nothing
+            # The connection is held until the response has been checked, so
+            # that it can be evicted if the response turns out to be bad.
             response = _get_pool_manager(**pool_args).request(_method, _url, headers=_headers, body=body,
-                                                              timeout=timeout, retries=False, **kwargs)
+                                                              timeout=timeout, retries=False, release_conn=False,
+                                                              preload_content=(stream_json_array is None or
+                                                                               _cassette_recorder is not None),
+                                                              **kwargs)
+            if _cassette_recorder is not None:
+                _cassette_recorder.record(_method, _url, _headers, body, response, time_sent, api=prepend_srv)
             _raise_error_for_testing(try_index, method)
             req_id = response.headers.get("x-request-id", "unavailable")
 
@@ -508,12 +629,10 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
             if response.status // 100 != 2:
                 # response.headers key lookup is case-insensitive
                 if response.headers.get('content-type', '').startswith('application/json'):
-                    try:
-                        content = response.data.decode('utf-8')
-                    except AttributeError:
+                    if response.data is None:
                         raise exceptions.UrllibInternalError("Content is none", response.status)
                     try:
-                        content = json.loads(content)
+                        content = _json_codec.loads(response.data)
                     except ValueError:
                         # The JSON is not parsable, but we should be able to retry.
                         raise exceptions.BadJSONInReply("Invalid JSON received from server", response.status)
@@ -532,7 +651,24 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
                                                                                  req_id,
                                                                                  content))
 
-            if want_full_response:
+            if stream_json_array is not None:
+                if _DEBUG > 0:
+                    print(method, req_id, url, "<=", response.status, "(streaming %s)" % (stream_json_array,),
+                          file=sys.stderr)
+                is_retryable = always_retry or method == 'GET'
+                _record_attempt(method, request_route, response, time_sent, body, True)
+                time_sent = None
+                if _cassette_recorder is not None:
+                    # The body has already been read in full to be recorded
+                    _connection_health.release_connection(response)
+                    response = _cassette.replayable_response(response)
+                stream = _json_stream.DXJSONStream(response, stream_json_array,
+                                                   reissue_request=reissue_request if is_retryable else None,
+                                                   max_retries=max_retries)
+                # The stream releases the connection once the body has been read
+                response = None
+                return stream
+            elif want_full_response:
                 return response
             else:
                 if 'content-length' in response.headers:
@@ -547,10 +683,11 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
                 content = response.data
 
                 if decode_response_body:
-                    content = content.decode('utf-8')
-                    if response.headers.get('content-type', '').startswith('application/json'):
+                    if not response.headers.get('content-type', '').startswith('application/json'):
+                        content = content.decode('utf-8')
+                    else:
                         try:
-                            content = json.loads(content)
+                            content = _json_codec.loads(content)
                         except ValueError:
                             # The JSON is not parsable, but we should be able to retry.
                             raise exceptions.BadJSONInReply("Invalid JSON received from server", response.status)
@@ -566,13 +703,40 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
                         elif _DEBUG > 0:
                             print(method, req_id, url, "<=", response.status, "(%dms)" % t, Repr().repr(content),
                                   file=sys.stderr)
+                if cache_key is not None:
+                    metadata_cache.put(cache_key, content, cache_generation)
                 return content
             raise AssertionError('Should never reach this line: expected a result to have been returned by now')
+        except exceptions.DXCircuitOpenError:
+            success = False
+            raise
         except Exception as e:
-            # Avoid reusing connections in the pool, since they may be
-            # in an inconsistent state (observed as "ResponseNotReady"
-            # errors).
-            _get_pool_manager(**pool_args).clear()
+            # Only the connection that produced a bad response is discarded
+            # (urllib3 already discards connections that fail at the socket
+            # level); the rest of the pool stays warm. A host whose requests
+            # keep failing gets a fresh pool.
+            connection_failed = isinstance(e, _suspect_connection_exceptions) or \
+                (response is None and isinstance(e, exceptions.network_exceptions))
+            if response is not None:
+                _connection_health.release_connection(response, evict=connection_failed)
+            if limiter is not None:
+                if response is not None and response.status == 503:
+                    limiter.release(time_sent, overloaded=True, retry_after=_extract_retry_after_timeout(response))
+                else:
+                    limiter.release(time_sent)
+            if time_sent is not None:
+                _record_attempt(method, request_route, response, time_sent, body, stream_json_array is not None)
+            if pool_key is not None and _connection_health_tracker.record(pool_key, ok=not connection_failed):
+                _connection_health.reset_host_pool(_get_pool_manager(**pool_args), pool_key)
+            if breaker is not None:
+                if response is not None and response.status == 503:
+                    breaker.record(None, is_probe=is_probe)
+                elif connection_failed or (response is not None and response.status >= 500):
+                    breaker.record(False, is_probe=is_probe)
+                elif response is not None:
+                    breaker.record(True, is_probe=is_probe)
+                else:
+                    breaker.record(None, is_probe=is_probe)
             success = False
             exception_msg = _extract_msg_from_last_exception()
             if isinstance(e, _expected_exceptions):
@@ -580,6 +744,7 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
                     seconds_to_wait = _extract_retry_after_timeout(response)
                     logger.warn("%s %s: %s. Waiting %d seconds due to server unavailability...",
                                 method, url, exception_msg, seconds_to_wait)
+                    _metrics.registry.observe_retry(method, request_route, "503")
                     time.sleep(seconds_to_wait)
                     # Note, we escape the "except" block here without
                     # incrementing try_index because 503 responses with
@@ -617,13 +782,23 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
                             logger.info("400 HTTP error, of unknown origin, exception_msg=[%s]", exception_msg)
                         ok_to_retry = True
 
+                if ok_to_retry and _retry_budget is not None and not _retry_budget.try_retry():
+                    logger.warn("%s %s: %s. Not retrying: the retry budget of this process is exhausted",
+                                method, url, exception_msg)
+                    ok_to_retry = False
+
                 if ok_to_retry:
                     if rewind_input_buffer_offset is not None:
                         data.seek(rewind_input_buffer_offset)
-                    delay = min(2 ** try_index, DEFAULT_TIMEOUT)
+                    delay = _retry_policy.backoff_delay(try_index, DEFAULT_TIMEOUT)
                     range_str = (' (range=%s)' % (headers['Range'],)) if 'Range' in headers else ''
-                    logger.warn("%s %s: %s. Waiting %d seconds before retry %d of %d... %s",
+                    logger.warn("%s %s: %s. Waiting %.1f seconds before retry %d of %d... %s",
                                 method, url, exception_msg, delay, try_index + 1, max_retries, range_str)
+                    if request_route is not None:
+                        _metrics.registry.observe_retry(
+                            method, request_route,
+                            str(response.status) if response is not None and not connection_failed
+                            else type(e).__name__)
                     time.sleep(delay)
                     try_index += 1
                     continue
@@ -640,13 +815,208 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
                 raise exceptions.DXIncompleteReadsError(exception_msg)
             raise
         finally:
-            if success and try_index > 0:
-                logger.info("%s %s: Recovered after %d retries", method, url, try_index)
+            if invalidates_metadata:
+                # Also evicts results read while the call was in progress
+                metadata_cache.invalidate(resource, data if isinstance(data, (bytes, basestring)) else None)
+            if success:
+                if time_sent is not None:
+                    _record_attempt(method, request_route, response, time_sent, body, stream_json_array is not None)
+                if limiter is not None:
+                    latency = None
+                    if response is not None and len(response.data) <= _MAX_LATENCY_SAMPLE_BYTES and \
+                       _body_length(data) <= _MAX_LATENCY_SAMPLE_BYTES:
+                        latency = time.time() - time_sent
+                    limiter.release(time_sent, latency=latency)
+                if response is not None:
+                    _connection_health.release_connection(response)
+                if pool_key is not None:
+                    _connection_health_tracker.record(pool_key, ok=True)
+                if breaker is not None:
+                    breaker.record(True, is_probe=is_probe)
+                if try_index > 0:
+                    logger.info("%s %s: Recovered after %d retries", method, url, try_index)
 
         raise AssertionError('Should never reach this line: should have attempted a retry or reraised by now')
     raise AssertionError('Should never reach this line: should never break out of loop')
 
 
+def get_connection_health():
+    '''
+    :returns: Number of requests, transport-level errors, and connection pool resets, per host
+    :rtype: dict
+
+    Reports the connection health tracked by :func:`DXHTTPRequest` for
+    the current process.
+    '''
+    return _connection_health_tracker.snapshot()
+
+
+def get_concurrency_limits():
+    '''
+    :returns: Current limit on concurrent requests, requests in flight, and overload signals seen, per host
+    :rtype: dict
+
+    Reports the state of the adaptive concurrency control applied by
+    :func:`DXHTTPRequest` in the current process. See
+    :mod:`dxpy.concurrency_control`.
+    '''
+    return _concurrency_controller.snapshot()
+
+
+def set_metadata_cache(ttl=_metadata_cache_module.DEFAULT_TTL, max_entries=_metadata_cache_module.DEFAULT_MAX_ENTRIES):
+    '''
+    :param ttl: Time, in seconds, for which results are cached; 0 or None disables the cache
+    :type ttl: float
+    :param max_entries: Maximum number of results cached
+    :type max_entries: int
+
+    Enables (or disables) caching of describe and listFolder results in
+    this process. See :mod:`dxpy.metadata_cache` for which results are
+    cached and when they are invalidated. The cache is disabled by
+    default (``dx`` enables it with ``--metadata-cache``), and can be
+    configured with the environment variable ``DX_METADATA_CACHE_TTL``.
+    '''
+    global _metadata_cache
+    _metadata_cache = _metadata_cache_module.MetadataCache(ttl, max_entries) if ttl else None
+
+if os.environ.get('DX_METADATA_CACHE_TTL'):
+    set_metadata_cache(float(os.environ['DX_METADATA_CACHE_TTL']))
+
+
+def set_block_cache(memory_limit=_block_cache_module.DEFAULT_MEMORY_LIMIT,
+                    block_size=_block_cache_module.DEFAULT_BLOCK_SIZE, disk_dir=None, disk_limit=None):
+    '''
+    :param memory_limit: Number of bytes of file contents kept in memory; 0 or None disables the cache
+    :type memory_limit: int
+    :param block_size: Size of the blocks in which files are read and cached, in bytes
+    :type block_size: int
+    :param disk_dir: Directory in which to keep blocks evicted from memory, if any
+    :type disk_dir: string
+    :param disk_limit: Number of bytes of blocks this process keeps in *disk_dir*, if limited
+    :type disk_limit: int
+
+    Enables (or disables) caching of the contents of files read with
+    :class:`~dxpy.bindings.dxfile.DXFile` in this process, for
+    random-access workloads. See :mod:`dxpy.block_cache`. The cache is
+    disabled by default, and can be configured with the environment
+    variables ``DX_BLOCK_CACHE_SIZE`` (the memory limit) and
+    ``DX_BLOCK_CACHE_DIR``.
+    '''
+    global _block_cache
+    if memory_limit:
+        _block_cache = _block_cache_module.BlockCache(memory_limit, block_size, disk_dir=disk_dir,
+                                                      disk_limit=disk_limit)
+    else:
+        _block_cache = None
+
+if os.environ.get('DX_BLOCK_CACHE_SIZE'):
+    set_block_cache(int(os.environ['DX_BLOCK_CACHE_SIZE']), disk_dir=os.environ.get('DX_BLOCK_CACHE_DIR'))
+
+
+def set_download_cache(directory, max_size=_download_cache_module.DEFAULT_MAX_SIZE, link="auto"):
+    '''
+    :param directory: Directory in which to keep downloaded files; None disables the cache
+    :type directory: string
+    :param max_size: Total size, in bytes, of the files kept
+    :type max_size: int
+    :param link: "hardlink" to serve files from the cache by hard links where possible (see :mod:`dxpy.download_cache`)
+    :type link: string
+
+    Enables (or disables) the persistent cache of files downloaded with
+    :func:`~dxpy.bindings.dxfile_functions.download_dxfile`. The cache is
+    disabled by default, and can be configured with the environment
+    variables ``DX_DOWNLOAD_CACHE_DIR`` and ``DX_DOWNLOAD_CACHE_SIZE``.
+    '''
+    global _download_cache
+    if directory:
+        _download_cache = _download_cache_module.DownloadCache(directory, max_size, link=link)
+    else:
+        _download_cache = None
+
+if os.environ.get('DX_DOWNLOAD_CACHE_DIR'):
+    set_download_cache(os.environ['DX_DOWNLOAD_CACHE_DIR'],
+                       int(os.environ.get('DX_DOWNLOAD_CACHE_SIZE') or _download_cache_module.DEFAULT_MAX_SIZE))
+
+
+def set_download_url_cache(directory):
+    '''
+    :param directory: Directory in which to share download URLs with other processes; None keeps them in memory only
+    :type directory: string
+
+    Sets where the download URLs of files are cached (see
+    :mod:`dxpy.download_url_cache`). URLs are always shared by the file
+    handlers of a process; with a directory, they are also shared with
+    the other processes using it. The directory can also be set with
+    the environment variable ``DX_DOWNLOAD_URL_CACHE_DIR``.
+    '''
+    global _download_url_cache
+    _download_url_cache = _download_url_cache_module.DownloadURLCache(directory or None)
+
+if os.environ.get('DX_DOWNLOAD_URL_CACHE_DIR'):
+    set_download_url_cache(os.environ['DX_DOWNLOAD_URL_CACHE_DIR'])
+
+
+def set_read_hedging(percentile=_hedging.DEFAULT_PERCENTILE, min_samples=_hedging.DEFAULT_MIN_SAMPLES,
+                     max_hedge_ratio=_hedging.DEFAULT_MAX_HEDGE_RATIO):
+    '''
+    :param percentile: Fraction of recent reads that a read must be slower than to be hedged; 0 or None disables hedging
+    :type percentile: float
+    :param min_samples: Number of reads to observe before any is hedged
+    :type min_samples: int
+    :param max_hedge_ratio: Largest fraction of reads that may be hedged
+    :type max_hedge_ratio: float
+
+    Enables (or disables) hedging of the ranged reads made by
+    :class:`~dxpy.bindings.dxfile.DXFile` and
+    :func:`~dxpy.bindings.dxfile_functions.download_dxfile`: a read slower
+    than the given percentile of recent reads is sent again, and the first
+    response is used. See :mod:`dxpy.hedging`. Hedging is disabled by
+    default, and can be enabled with the environment variable
+    ``DX_READ_HEDGING_PERCENTILE``.
+    '''
+    global _hedge_policy
+    if percentile:
+        _hedge_policy = _hedging.HedgePolicy(percentile, min_samples, max_hedge_ratio)
+    else:
+        _hedge_policy = None
+
+if os.environ.get('DX_READ_HEDGING_PERCENTILE'):
+    set_read_hedging(float(os.environ['DX_READ_HEDGING_PERCENTILE']))
+
+
+def set_adaptive_part_sizing(enabled=True):
+    '''
+    :param enabled: Whether to choose the size of upload parts from the measured throughput
+    :type enabled: boolean
+
+    Enables (or disables) adaptive sizing of the parts of files uploaded
+    with :class:`~dxpy.bindings.dxfile.DXFile` (and functions such as
+    :func:`~dxpy.bindings.dxfile_functions.upload_local_file`) in this
+    process: parts grow on fast connections and shrink when uploads fail,
+    within the limits of the project. See :mod:`dxpy.part_sizing`. It is
+    disabled by default, and can be enabled by setting the environment
+    variable ``DX_ADAPTIVE_PART_SIZE`` to 1. Uploads resumed from a
+    manifest always use parts of a fixed size.
+    '''
+    global _adaptive_part_sizing
+    _adaptive_part_sizing = enabled
+
+if os.environ.get('DX_ADAPTIVE_PART_SIZE') == '1':
+    set_adaptive_part_sizing(True)
+
+
+def get_retry_state():
+    '''
+    :returns: Remaining retry budget, and the state of the circuit breaker of each host
+    :rtype: dict
+
+    Reports the process-wide retry limits applied by
+    :func:`DXHTTPRequest`. See :mod:`dxpy.retry_policy`.
+    '''
+    return {"budget": _retry_budget.snapshot() if _retry_budget is not None else None,
+            "circuit_breakers": _circuit_breakers.snapshot()}
+
+
 class DXHTTPOAuth2(AuthBase):
     def __init__(self, security_context):
         self.security_context = security_context
@@ -672,6 +1042,16 @@ The smaller chunks are then concatenated to form the original range of data. If
 
 
 def _dxhttp_read_range(url, headers, start_pos, end_pos, timeout, sub_range=True):
+    try:
+        return _dxhttp_read_range_or_subranges(url, headers, start_pos, end_pos, timeout, sub_range)
+    except Exception:
+        # The URL may have expired or been revoked; readers that retry
+        # get a new one
+        _download_url_cache.invalidate_url(url)
+        raise
+
+
+def _dxhttp_read_range_or_subranges(url, headers, start_pos, end_pos, timeout, sub_range):
     if sub_range:
         headers['Range'] = "bytes=" + str(start_pos) + "-" + str(end_pos)
     try:
@@ -682,24 +1062,44 @@ def _dxhttp_read_range(url, headers, start_pos, end_pos, timeout, sub_range=True
 
     # When chunk fails to be read, it gets broken into sub-chunks
     except exceptions.DXIncompleteReadsError:
-        chunk_buffer = StringIO()
+        # The sub-chunks are received directly into place in a buffer
+        # sized for the whole range
+        chunk_buffer = bytearray(end_pos - start_pos + 1)
+        chunk_view = memoryview(chunk_buffer)
         subchunk_len = int(math.ceil((end_pos - start_pos + 1)/INCOMPLETE_READS_NUM_SUBCHUNKS))
         subchunk_start_pos = start_pos
 
         while subchunk_start_pos <= end_pos:
             subchunk_end_pos = min(subchunk_start_pos + subchunk_len - 1, end_pos)
             headers['Range'] = "bytes=" + str(subchunk_start_pos) + "-" + str(subchunk_end_pos)
-            subchunk_start_pos += subchunk_len
             data = DXHTTPRequest(url, '', method='GET', headers=headers, auth=None, jsonify_data=False,
                                  prepend_srv=False, always_retry=True, timeout=timeout,
                                  decode_response_body=False)
+            if len(data) != subchunk_end_pos - subchunk_start_pos + 1:
+                raise exceptions.DXIncompleteReadsError(
+                    "Expected {} bytes for range {}, received {}".format(
+                        subchunk_end_pos - subchunk_start_pos + 1, headers['Range'], len(data)))
 
-            # Concatenate sub-chunks
-            chunk_buffer.write(data)
+            offset = subchunk_start_pos - start_pos
+            chunk_view[offset:offset + len(data)] = data
+            subchunk_start_pos += subchunk_len
 
-        concat_chunks = chunk_buffer.getvalue()
-        chunk_buffer.close()
-        return concat_chunks
+        return bytes(chunk_buffer)
+
+
+def _dxhttp_read_file_range(file_id, url, headers, start_pos, end_pos, timeout, sub_range=True):
+    '''
+    Reads a range of a file with :func:`_dxhttp_read_range`, hedging the
+    request if read hedging is enabled (see :func:`set_read_hedging`).
+    '''
+    hedge_policy = _hedge_policy
+    if hedge_policy is None:
+        return _dxhttp_read_range(url, headers, start_pos, end_pos, timeout, sub_range)
+
+    def attempt():
+        # Each attempt sets its own Range header
+        return _dxhttp_read_range(url, dict(headers), start_pos, end_pos, timeout, sub_range)
+    return hedge_policy.call(attempt, end_pos - start_pos + 1, label=file_id)
 
 
 def set_api_server_info(host=None, port=None, protocol=None):
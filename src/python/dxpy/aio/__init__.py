@@ -0,0 +1,330 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Asyncio Bindings
+****************
+
+Coroutine versions of :func:`dxpy.DXHTTPRequest` and of the API wrappers in
+:mod:`dxpy.api`. They let a single thread keep thousands of API calls in
+flight, for example::
+
+    import asyncio
+    import dxpy.aio
+
+    async def describe_all(file_ids):
+        return await asyncio.gather(*[dxpy.aio.api.file_describe(f) for f in file_ids])
+
+The configuration (API server, security context, and so on) is shared with
+:mod:`dxpy`. This module requires Python 3.5 or later and the ``aiohttp``
+package (``pip install dxpy[aio]``).
+
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import asyncio, mmap, os, ssl, sys, time, weakref
+from collections import namedtuple
+
+import aiohttp
+import requests
+
+import dxpy
+from .. import exceptions, json_codec, logger, DEFAULT_RETRIES, DEFAULT_TIMEOUT
+from .. import (_RequestForAuth, _expected_exceptions, _extract_retry_after_timeout, _extract_msg_from_last_exception,
+                _is_retryable_exception)
+from .. import retry_policy as _retry_policy
+from ..compat import BadStatusLine
+from ..connection_health import get_pool_key
+
+DEFAULT_CONNECTION_LIMIT = 100
+
+# Response returned when *want_full_response* is True. The body has already
+# been read by the time the coroutine returns, so unlike urllib3 responses
+# this can be used after the underlying connection has been released.
+DXHTTPResponse = namedtuple('DXHTTPResponse', 'status reason headers data')
+
+# aiohttp sessions are bound to the event loop they were created in, so keep
+# one per loop.
+_sessions = weakref.WeakKeyDictionary()
+
+_network_exceptions = (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+def _get_ssl_context(verify, cert_file, key_file):
+    if verify is False or os.environ.get('DX_CA_CERT') == 'NOVERIFY':
+        return False
+    context = ssl.create_default_context(cafile=verify or os.environ.get('DX_CA_CERT') or requests.certs.where())
+    if cert_file is not None:
+        context.load_cert_chain(cert_file, key_file)
+    return context
+
+
+def _get_session():
+    loop = asyncio.get_event_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=DEFAULT_CONNECTION_LIMIT,
+                                         ssl=_get_ssl_context(None, None, None))
+        session = aiohttp.ClientSession(connector=connector,
+                                        headers=dict(dxpy._default_headers),
+                                        trust_env=True)
+        _sessions[loop] = session
+    return session
+
+
+async def close():
+    '''
+    Closes the connection pool used by the current event loop. Call this
+    before the event loop is shut down to avoid "Unclosed client session"
+    warnings from aiohttp.
+    '''
+    session = _sessions.pop(asyncio.get_event_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+def _to_str(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def _is_retryable_network_exception(e):
+    '''
+    Like :func:`dxpy._is_retryable_exception`, but also recognizes
+    aiohttp failures that happen before a connection is established.
+    '''
+    if isinstance(e, aiohttp.ClientConnectorError):
+        return True
+    return _is_retryable_exception(e)
+
+
+async def _process_method_url_headers(method, url, headers):
+    if callable(url):
+        _url, _headers = url()
+        if asyncio.iscoroutine(_url):
+            # Coroutine callbacks return the (url, headers) tuple when awaited
+            _url, _headers = await _url
+        _headers.update(headers)
+    else:
+        _url, _headers = url, headers
+    return method, _url, {_to_str(k): _to_str(v) for k, v in _headers.items()}
+
+
+def _raise_for_status(status, reason, headers, content, req_id):
+    '''
+    Raises the appropriate exception if *status* indicates that the request
+    failed. Mirrors the error handling of :func:`dxpy.DXHTTPRequest`.
+    '''
+    if status // 100 == 2:
+        return
+    if headers.get('content-type', '').startswith('application/json'):
+        try:
+            content = json_codec.loads(content)
+        except ValueError:
+            # The JSON is not parsable, but we should be able to retry.
+            raise exceptions.BadJSONInReply("Invalid JSON received from server", status)
+        try:
+            error_class = getattr(exceptions, content["error"]["type"], exceptions.DXAPIError)
+        except (KeyError, AttributeError, TypeError):
+            error_class = exceptions.HTTPError
+        raise error_class(content, status)
+    raise exceptions.HTTPError("{} {} [RequestID={}]\n{}".format(status, reason, req_id,
+                                                                 content.decode('utf-8', 'replace')))
+
+
+async def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
+                        timeout=DEFAULT_TIMEOUT,
+                        jsonify_data=True, want_full_response=False,
+                        decode_response_body=True, prepend_srv=True,
+                        max_retries=DEFAULT_RETRIES, always_retry=False,
+                        **kwargs):
+    '''
+    :param resource: API server route, e.g. "/record/new". If *prepend_srv* is False, a fully qualified URL is expected. If this argument is a callable, it will be called just before each request attempt, and expected to return a tuple (URL, headers) or a coroutine producing one.
+    :type resource: string
+    :param data: Content of the request body
+    :type data: list or dict, if *jsonify_data* is True; or string or file-like object, otherwise
+    :param want_full_response: If True, a :class:`DXHTTPResponse` (with *status*, *reason*, *headers*, and *data* fields) is returned instead of only the content of the response body
+    :type want_full_response: boolean
+    :returns: Response from API server in the format indicated by *want_full_response* and *decode_response_body*.
+    :raises: :exc:`exceptions.DXAPIError` or a subclass if the server returned a non-200 status code; :exc:`requests.exceptions.HTTPError` if an invalid response was received from the server; or :exc:`aiohttp.ClientError` if a connection cannot be established.
+
+    Coroutine version of :func:`dxpy.DXHTTPRequest`. The remaining
+    arguments, and the rules for when a failed request is retried
+    (including waiting out 503 responses with a Retry-After header
+    without counting them against *max_retries*), are the same, as are the
+    retry budget, backoff and circuit breakers of :mod:`dxpy.retry_policy`.
+
+    Retries wait with :func:`asyncio.sleep`, so they do not block other
+    requests issued from the same event loop.
+
+    '''
+    if headers is None:
+        headers = {}
+
+    url = dxpy.APISERVER + resource if prepend_srv else resource
+    method = method.upper()
+
+    if auth is True:
+        auth = dxpy.AUTH_HELPER
+
+    if auth:
+        auth(_RequestForAuth(method, url, headers))
+
+    verify, cert_file, key_file = (kwargs.pop(arg, None) for arg in ("verify", "cert_file", "key_file"))
+    if verify is None and cert_file is None and 'DX_CA_CERT' not in os.environ:
+        ssl_context = None  # Use the context the session was created with
+    else:
+        ssl_context = _get_ssl_context(verify, cert_file, key_file)
+
+    if jsonify_data:
+        data = json_codec.dumps_bytes(data)
+        if 'Content-Type' not in headers and method == 'POST':
+            headers['Content-Type'] = 'application/json'
+    elif isinstance(data, mmap.mmap):
+        data = memoryview(data)
+
+    # If the input is a buffer, record the initial position so that we
+    # can rewind to it if the request fails and needs to be retried.
+    rewind_input_buffer_offset = None
+    if hasattr(data, 'seek') and hasattr(data, 'tell'):
+        rewind_input_buffer_offset = data.tell()
+
+    client_timeout = aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout)
+
+    if dxpy._retry_budget is not None:
+        dxpy._retry_budget.record_request()
+
+    try_index = 0
+    while True:
+        success, time_started = True, None
+        status, response_headers = None, None
+        breaker, is_probe = None, False
+        try:
+            if dxpy._DEBUG > 0:
+                time_started = time.time()
+            _method, _url, _headers = await _process_method_url_headers(method, url, headers)
+            if dxpy._DEBUG > 0:
+                print("%s %s (async)" % (method, _url), file=sys.stderr)
+
+            breaker = dxpy._circuit_breakers.get_breaker(get_pool_key(_url))
+            if breaker is not None:
+                is_probe = breaker.before_request()
+
+            request_kwargs = dict(headers=_headers, data=data, timeout=client_timeout, allow_redirects=False)
+            if ssl_context is not None:
+                request_kwargs['ssl'] = ssl_context
+            async with _get_session().request(_method, _url, **request_kwargs) as response:
+                status, response_headers = response.status, response.headers
+                req_id = response_headers.get("x-request-id", "unavailable")
+                try:
+                    content = await response.read()
+                except aiohttp.ClientPayloadError as e:
+                    raise exceptions.ContentLengthError("Incomplete response body: %s [RequestID=%s]" % (e, req_id))
+
+                _raise_for_status(status, response.reason, response_headers, content, req_id)
+
+                if want_full_response:
+                    return DXHTTPResponse(status, response.reason, response_headers, content)
+
+                if decode_response_body:
+                    if not response_headers.get('content-type', '').startswith('application/json'):
+                        content = content.decode('utf-8')
+                    else:
+                        try:
+                            content = json_codec.loads(content)
+                        except ValueError:
+                            # The JSON is not parsable, but we should be able to retry.
+                            raise exceptions.BadJSONInReply("Invalid JSON received from server", status)
+                if dxpy._DEBUG > 0:
+                    t = int((time.time() - time_started) * 1000)
+                    print(method, req_id, url, "<=", status, "(%dms)" % t, file=sys.stderr)
+                if breaker is not None:
+                    breaker.record(True, is_probe=is_probe)
+                return content
+        except exceptions.DXCircuitOpenError:
+            success = False
+            raise
+        except Exception as e:
+            success = False
+            if breaker is not None:
+                if status == 503:
+                    breaker.record(None, is_probe=is_probe)
+                elif (status is None and isinstance(e, _network_exceptions)) or (status is not None and status >= 500):
+                    breaker.record(False, is_probe=is_probe)
+                elif status is not None:
+                    breaker.record(True, is_probe=is_probe)
+                else:
+                    breaker.record(None, is_probe=is_probe)
+            exception_msg = _extract_msg_from_last_exception()
+            if isinstance(e, _expected_exceptions + _network_exceptions):
+                if status == 503:
+                    seconds_to_wait = _extract_retry_after_timeout(response)
+                    logger.warn("%s %s: %s. Waiting %d seconds due to server unavailability...",
+                                method, url, exception_msg, seconds_to_wait)
+                    await asyncio.sleep(seconds_to_wait)
+                    # 503 responses with Retry-After do not count against
+                    # the number of permitted retries.
+                    continue
+
+                total_allowed_tries = max_retries + 1
+                ok_to_retry = False
+                is_retryable = always_retry or (method == 'GET') or _is_retryable_network_exception(e)
+                if try_index + 1 < total_allowed_tries:
+                    if status is None or \
+                       isinstance(e, (exceptions.ContentLengthError, BadStatusLine, exceptions.BadJSONInReply)):
+                        ok_to_retry = is_retryable
+                    else:
+                        ok_to_retry = 500 <= status < 600
+
+                    # The server has closed the connection prematurely
+                    if status == 400 and is_retryable and method == 'PUT' and \
+                       isinstance(e, requests.exceptions.HTTPError):
+                        if '<Code>RequestTimeout</Code>' in exception_msg:
+                            logger.info("Retrying 400 HTTP error, due to slow data transfer")
+                        else:
+                            logger.info("400 HTTP error, of unknown origin, exception_msg=[%s]", exception_msg)
+                        ok_to_retry = True
+
+                if ok_to_retry and dxpy._retry_budget is not None and not dxpy._retry_budget.try_retry():
+                    logger.warn("%s %s: %s. Not retrying: the retry budget of this process is exhausted",
+                                method, url, exception_msg)
+                    ok_to_retry = False
+
+                if ok_to_retry:
+                    if rewind_input_buffer_offset is not None:
+                        data.seek(rewind_input_buffer_offset)
+                    delay = _retry_policy.backoff_delay(try_index, DEFAULT_TIMEOUT)
+                    range_str = (' (range=%s)' % (headers['Range'],)) if 'Range' in headers else ''
+                    logger.warn("%s %s: %s. Waiting %.1f seconds before retry %d of %d... %s",
+                                method, url, exception_msg, delay, try_index + 1, max_retries, range_str)
+                    await asyncio.sleep(delay)
+                    try_index += 1
+                    continue
+
+            # All retries have been exhausted OR the error is deemed not
+            # retryable. Print the latest error and propagate it back to the caller.
+            if not isinstance(e, exceptions.DXAPIError):
+                logger.error("%s %s: %s", method, url, exception_msg)
+            raise
+        finally:
+            if success and try_index > 0:
+                logger.info("%s %s: Recovered after %d retries", method, url, try_index)
+
+        raise AssertionError('Should never reach this line: should have attempted a retry or reraised by now')
+    raise AssertionError('Should never reach this line: should never break out of loop')
+
+
+from . import api
@@ -342,6 +342,11 @@ class DXDataObject(DXObject):
         tags) are obtained from the copy of the object in the project
         associated with the handler, if possible.
 
+        If describe batching is enabled (see
+        :func:`~dxpy.bindings.batch_describe.enable_describe_batching`),
+        concurrent calls from different threads may be served by a
+        single API request.
+
         """
 
         if self._dxid is None:
@@ -365,7 +370,11 @@ class DXDataObject(DXObject):
         if self._proj is not None:
             describe_input["project"] = self._proj
 
-        self._desc = self._describe(self._dxid, describe_input, **kwargs)
+        describe_batcher = get_describe_batcher()
+        if describe_batcher is not None:
+            self._desc = describe_batcher.describe(self._describe, self._dxid, describe_input, **kwargs)
+        else:
+            self._desc = self._describe(self._dxid, describe_input, **kwargs)
 
         return self._desc
 
@@ -650,6 +659,7 @@ class DXDataObject(DXObject):
             time.sleep(2)
             elapsed += 2
 
+from .batch_describe import enable_describe_batching, disable_describe_batching, get_describe_batcher
 from .dxfile import DXFile, DXFILE_HTTP_THREADS, DEFAULT_BUFFER_SIZE
 from .dxfile_functions import open_dxfile, new_dxfile, download_dxfile, upload_local_file, upload_string
 from .dxgtable import DXGTable, NULL, DXGTABLE_HTTP_THREADS
@@ -666,3 +676,4 @@ from .dxdataobject_functions import dxlink, is_dxlink, get_dxlink_ids, get_handl
 from .search import (find_data_objects, find_executions, find_jobs, find_analyses, find_projects, find_apps,
                      find_one_data_object, find_one_project, find_one_app, resolve_data_objects, find_orgs,
                      org_find_members, org_find_projects, org_find_apps)
+from .batch_wait import wait_all
@@ -0,0 +1,190 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Describe Batching
+*****************
+
+When batching is enabled, calls to
+:meth:`~dxpy.bindings.DXDataObject.describe` that are issued concurrently
+(from different threads) within a short window are coalesced into a single
+``/system/describeDataObjects`` call. Each caller still receives its own
+description, exactly as if it had described the object by itself.
+
+Example::
+
+    dxpy.enable_describe_batching()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=32) as executor:
+        descriptions = list(executor.map(dxpy.describe, file_ids))
+
+Batching is off by default.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import threading
+import concurrent.futures
+
+import dxpy
+from .. import logger
+from ..compat import THREAD_TIMEOUT_MAX
+from ..exceptions import DXAPIError
+
+DEFAULT_BATCH_WINDOW = 0.05
+MAX_BATCH_SIZE = 1000
+
+# Returned to a caller whose object could not be described as part of a
+# batch; the caller then issues its own describe call, so that it sees
+# exactly the result (or error) that it would have seen without batching.
+_DESCRIBE_INDIVIDUALLY = object()
+
+
+class _Batch(object):
+    def __init__(self):
+        self.objects, self.futures = [], []
+        self.full = threading.Event()
+
+
+class DescribeBatcher(object):
+    '''
+    :param window: Maximum time, in seconds, to wait for other describe
+        calls to join a batch before sending it
+    :type window: float
+    :param max_batch_size: Maximum number of objects to describe in a
+        single request; a batch is sent as soon as it reaches this size
+    :type max_batch_size: int
+
+    Coalesces concurrent describe calls into batched
+    ``/system/describeDataObjects`` calls.
+
+    The first caller to join an empty batch waits up to *window*
+    seconds (less if the batch fills up), then sends the batch on
+    behalf of everyone who joined it. Callers that supply extra keyword
+    arguments for :func:`dxpy.DXHTTPRequest` (custom auth, timeouts,
+    etc.) bypass batching.
+    '''
+    def __init__(self, window=DEFAULT_BATCH_WINDOW, max_batch_size=MAX_BATCH_SIZE):
+        if max_batch_size < 1 or max_batch_size > MAX_BATCH_SIZE:
+            raise ValueError("max_batch_size must be between 1 and {}".format(MAX_BATCH_SIZE))
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._lock = threading.Lock()
+        self._open_batch = None
+
+    def describe(self, describe_method, object_id, describe_input, **kwargs):
+        '''
+        :param describe_method: API wrapper to call if the object cannot be described as part of a batch, e.g. :func:`dxpy.api.file_describe`
+        :type describe_method: function
+        :param object_id: ID of the data object
+        :type object_id: string
+        :param describe_input: Input hash for the ``/describe`` call of the object (possibly including "project")
+        :type describe_input: dict
+        :returns: Description of the object
+
+        '''
+        if kwargs:
+            return describe_method(object_id, describe_input, **kwargs)
+
+        describe_options = dict(describe_input)
+        batch_entry = {"id": object_id, "describe": describe_options}
+        if "project" in describe_options:
+            batch_entry["project"] = describe_options.pop("project")
+        if not describe_options:
+            batch_entry["describe"] = True
+
+        future = concurrent.futures.Future()
+        with self._lock:
+            batch = self._open_batch
+            is_leader = batch is None
+            if is_leader:
+                batch = self._open_batch = _Batch()
+            batch.objects.append(batch_entry)
+            batch.futures.append(future)
+            if len(batch.objects) >= self.max_batch_size:
+                self._open_batch = None
+                batch.full.set()
+
+        if is_leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._open_batch is batch:
+                    self._open_batch = None
+            self._send(batch)
+
+        result = future.result(timeout=THREAD_TIMEOUT_MAX)
+        if result is _DESCRIBE_INDIVIDUALLY:
+            return describe_method(object_id, describe_input)
+        return result
+
+    def _send(self, batch):
+        if len(batch.objects) == 1:
+            # Nothing to coalesce with, so use the object's own route
+            batch.futures[0].set_result(_DESCRIBE_INDIVIDUALLY)
+            return
+        try:
+            results = dxpy.api.system_describe_data_objects({"objects": batch.objects})["results"]
+        except DXAPIError as e:
+            # Typically one of the objects is missing or inaccessible. Let
+            # each caller make its own call so the error goes to the right
+            # caller.
+            logger.debug("Batched describe of %d objects failed (%s); describing individually",
+                         len(batch.objects), e.error_message())
+            results = []
+        except BaseException as e:
+            for future in batch.futures:
+                future.set_exception(e)
+            raise
+
+        for i, future in enumerate(batch.futures):
+            result = results[i] if i < len(results) else None
+            if isinstance(result, dict) and isinstance(result.get("describe"), dict) and \
+               result["describe"].get("id") == batch.objects[i]["id"]:
+                future.set_result(result["describe"])
+            else:
+                future.set_result(_DESCRIBE_INDIVIDUALLY)
+
+
+_describe_batcher = None
+
+
+def enable_describe_batching(window=DEFAULT_BATCH_WINDOW, max_batch_size=MAX_BATCH_SIZE):
+    '''
+    :param window: Maximum time, in seconds, that a describe call waits for others to join its batch
+    :type window: float
+    :param max_batch_size: Maximum number of objects described in a single API call
+    :type max_batch_size: int
+
+    Turns on coalescing of concurrent
+    :meth:`~dxpy.bindings.DXDataObject.describe` calls for the rest of
+    the session. See :class:`DescribeBatcher`.
+    '''
+    global _describe_batcher
+    _describe_batcher = DescribeBatcher(window=window, max_batch_size=max_batch_size)
+
+
+def disable_describe_batching():
+    '''
+    Turns off coalescing of describe calls.
+    '''
+    global _describe_batcher
+    _describe_batcher = None
+
+
+def get_describe_batcher():
+    '''
+    :returns: The active :class:`DescribeBatcher`, or None if batching is disabled
+    '''
+    return _describe_batcher
@@ -0,0 +1,169 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Bulk Waiting
+************
+
+:func:`wait_all` waits on many data objects, jobs and analyses at once.
+Rather than polling each object separately, as
+:meth:`~dxpy.bindings.DXDataObject._wait_on_close` and
+:meth:`~dxpy.bindings.dxjob.DXJob.wait_on_done` do, it polls the states of
+up to 1000 jobs and analyses per ``/system/findExecutions`` call, and of
+up to 1000 data objects per ``/system/describeDataObjects`` call. The
+interval between polls grows exponentially, with random jitter, so that
+many clients waiting on long-running executions do not poll in step.
+
+Example::
+
+    for job in dxpy.wait_all(jobs, fail_fast=True):
+        print(job.get_id(), "is done")
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import random
+import time
+
+import dxpy
+from . import DXDataObject
+from .dxjob import DXJob
+from .dxanalysis import DXAnalysis
+from ..exceptions import DXError, DXJobFailureError
+
+DEFAULT_INITIAL_INTERVAL = 2
+DEFAULT_MAX_INTERVAL = 60
+BACKOFF_FACTOR = 1.5
+MAX_BATCH_SIZE = 1000
+
+_DESCRIBE_FIELDS = {"state": True, "failureReason": True, "failureMessage": True, "failureFrom": True}
+
+
+def _execution_failure(handler, desc):
+    # Mirrors the errors raised by DXJob.wait_on_done and DXAnalysis.wait_on_done
+    noun = "Analysis" if isinstance(handler, DXAnalysis) else "Job"
+    if desc["state"] == "terminated":
+        return "{id}: {noun} was terminated.".format(id=handler.get_id(), noun=noun)
+    err_msg = "{id}: {noun} has failed because of {reason}: {message}".format(
+        id=handler.get_id(), noun=noun, reason=desc.get("failureReason"), message=desc.get("failureMessage"))
+    if desc.get("failureFrom") is not None and desc["failureFrom"]["id"] != handler.get_id():
+        err_msg += " (failure from {id})".format(id=desc['failureFrom']['id'])
+    return err_msg
+
+
+def _poll_executions(handlers, **kwargs):
+    # Returns the description (state and failure) of each of the jobs
+    # and analyses, by ID
+    ids = [handler.get_id() for handler in handlers]
+    results = dxpy.api.system_find_executions({"id": ids, "describe": {"fields": _DESCRIBE_FIELDS},
+                                               "includeSubjobs": True, "limit": len(ids)}, **kwargs)["results"]
+    return {result["id"]: result["describe"] for result in results}
+
+
+def _poll_data_objects(handlers, **kwargs):
+    # Returns the state of each of the data objects, by ID
+    objects = []
+    for handler in handlers:
+        entry = {"id": handler.get_id(), "describe": {"fields": {"state": True}}}
+        if handler.get_proj_id() is not None:
+            entry["project"] = handler.get_proj_id()
+        objects.append(entry)
+    results = dxpy.api.system_describe_data_objects({"objects": objects}, **kwargs)["results"]
+    return {handler.get_id(): result["describe"] for handler, result in zip(handlers, results)}
+
+
+def _poll(handlers, **kwargs):
+    # Returns the handlers that have finished successfully, and the
+    # exception class and error message of those that have failed, by ID
+    finished, failed = [], {}
+    executions = [handler for handler in handlers if isinstance(handler, (DXJob, DXAnalysis))]
+    data_objects = [handler for handler in handlers if not isinstance(handler, (DXJob, DXAnalysis))]
+    for i in range(0, len(executions), MAX_BATCH_SIZE):
+        batch = executions[i:i + MAX_BATCH_SIZE]
+        descriptions = _poll_executions(batch, **kwargs)
+        for handler in batch:
+            desc = descriptions.get(handler.get_id())
+            if desc is None:
+                continue
+            if desc["state"] == "done":
+                finished.append(handler)
+            elif desc["state"] in ("failed", "partially_failed", "terminated"):
+                failed[handler.get_id()] = (DXJobFailureError, _execution_failure(handler, desc))
+    for i in range(0, len(data_objects), MAX_BATCH_SIZE):
+        batch = data_objects[i:i + MAX_BATCH_SIZE]
+        descriptions = _poll_data_objects(batch, **kwargs)
+        for handler in batch:
+            state = descriptions[handler.get_id()]["state"]
+            if state == "closed":
+                finished.append(handler)
+            elif state != "closing":
+                failed[handler.get_id()] = (DXError, "{id}: Unexpected state: {state}".format(id=handler.get_id(),
+                                                                                              state=state))
+    return finished, failed
+
+
+def wait_all(handlers, timeout=3600*24*7, fail_fast=False, initial_interval=DEFAULT_INITIAL_INTERVAL,
+             max_interval=DEFAULT_MAX_INTERVAL, **kwargs):
+    '''
+    :param handlers: Data objects to wait to close, and jobs and analyses to wait to finish
+    :type handlers: list of :class:`~dxpy.bindings.DXDataObject`, :class:`~dxpy.bindings.dxjob.DXJob` or :class:`~dxpy.bindings.dxanalysis.DXAnalysis`
+    :param timeout: Maximum amount of time to wait, in seconds, until all have finished
+    :type timeout: integer
+    :param fail_fast: If True, raises as soon as any object fails; otherwise, waits on the others first
+    :type fail_fast: boolean
+    :param initial_interval: Number of seconds between the first polls
+    :type initial_interval: float
+    :param max_interval: Largest number of seconds between polls
+    :type max_interval: float
+    :returns: Generator of the handlers, as they finish
+    :raises: :exc:`~dxpy.exceptions.DXJobFailureError` if a job or analysis fails, or :exc:`~dxpy.exceptions.DXError` if a data object is open or the timeout is reached
+
+    Waits until all the data objects are closed and all the jobs and
+    analyses are done, yielding each of them as soon as a poll finds it
+    finished, as :func:`concurrent.futures.as_completed` does. Without
+    *fail_fast*, failures are raised, together, once all the others
+    have finished. Nothing is polled until the generator is iterated
+    over; ``list(wait_all(handlers))`` just waits on all of them.
+    '''
+    pending = []
+    for handler in handlers:
+        if not isinstance(handler, (DXDataObject, DXJob, DXAnalysis)):
+            raise DXError("wait_all: cannot wait on {handler!r}".format(handler=handler))
+        pending.append(handler)
+
+    started, interval, failures = time.time(), initial_interval, []
+    while pending:
+        finished, failed = _poll(pending, **kwargs)
+        for handler in finished:
+            yield handler
+        failures.extend(failed[handler.get_id()] for handler in pending if handler.get_id() in failed)
+        if failures and fail_fast:
+            exc_class, err_msg = failures[0]
+            raise exc_class(err_msg)
+        done = set(handler.get_id() for handler in finished) | set(failed)
+        pending = [handler for handler in pending if handler.get_id() not in done]
+        if not pending:
+            break
+
+        if time.time() - started >= timeout:
+            raise DXError("Reached timeout while waiting for {n} objects to finish".format(n=len(pending)))
+        # Exponential backoff with "equal jitter": between half and all of the interval
+        time.sleep(interval / 2 + random.uniform(0, interval / 2))
+        interval = min(interval * BACKOFF_FACTOR, max_interval)
+
+    if failures:
+        exc_class = DXJobFailureError if any(exc_class is DXJobFailureError for exc_class, _ in failures) else DXError
+        raise exc_class("; ".join(err_msg for _, err_msg in failures))
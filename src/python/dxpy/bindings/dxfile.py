@@ -23,10 +23,9 @@ This remote file handler is a Python file-like object.
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
-import os, sys, logging, traceback, hashlib, copy, time
+import os, sys, logging, traceback, hashlib, time
 import math
 import mmap
-from threading import Lock
 from multiprocessing import cpu_count
 
 import dxpy
@@ -34,7 +33,10 @@ from . import DXDataObject
 from ..exceptions import DXFileError, DXIncompleteReadsError
 from ..utils import warn
 from ..utils.resolver import object_exists_in_project
-from ..compat import BytesIO, basestring
+from ..compat import basestring, USING_PYTHON2
+from ..read_ahead import ReadAheadController
+from ..part_sizing import PartSizeController
+from ..buffer_pool import BufferPool
 
 
 DXFILE_HTTP_THREADS = min(cpu_count(), 8)
@@ -45,9 +47,17 @@ if dxpy.JOB_ID:
     # platform.
     DEFAULT_BUFFER_SIZE = 1024*1024*96
 
+# Largest number of chunks that sequential reads keep in flight or
+# awaiting consumption; see dxpy.read_ahead
+READ_AHEAD_MAX_WINDOW = 2 * DXFILE_HTTP_THREADS
+
 MD5_READ_CHUNK_SIZE = 1024*1024*4
 FILE_REQUEST_TIMEOUT = 60
 
+# Largest total size of the buffers holding parts being written and
+# uploaded by a handler; see dxpy.buffer_pool
+UPLOAD_MEMORY_LIMIT = int(os.environ['DX_UPLOAD_MEMORY_LIMIT']) if os.environ.get('DX_UPLOAD_MEMORY_LIMIT') else None
+
 
 def _validate_headers(headers):
     for key, value in headers.items():
@@ -59,6 +69,10 @@ def _validate_headers(headers):
     return headers
 
 
+def _skip_bytes(data, num_bytes):
+    return data[num_bytes:] if num_bytes else data
+
+
 def _readable_part_size(num_bytes):
     "Returns the file size in readable form."
     B = num_bytes
@@ -79,6 +93,57 @@ def _readable_part_size(num_bytes):
         return '{0:.2f} TB'.format(B/TB)
 
 
+class _WriteBuffer(object):
+    '''
+    Data of the next part to be uploaded, accumulated in a buffer from a
+    BufferPool, which is acquired on the first write. Has the subset of
+    the BytesIO interface used by DXFile.
+    '''
+    def __init__(self, pool):
+        self._pool = pool
+        self._buf = None
+        self._size = 0
+
+    def tell(self):
+        return self._size
+
+    def write(self, data):
+        if self._buf is None:
+            self._buf = self._pool.acquire()
+        end = self._size + len(data)
+        self._buf[self._size:end] = data
+        self._size = end
+
+    def read_from(self, fileobj, size):
+        '''
+        Reads from *fileobj* until the buffer holds *size* bytes or the
+        end of *fileobj* is reached, and returns the number of bytes read.
+        '''
+        if self._buf is None:
+            self._buf = self._pool.acquire()
+        view, num_bytes_read = memoryview(self._buf), 0
+        while self._size < size:
+            num_bytes = fileobj.readinto(view[self._size:size])
+            if not num_bytes:
+                break
+            self._size += num_bytes
+            num_bytes_read += num_bytes
+        return num_bytes_read
+
+    def getvalue(self):
+        if self._buf is None:
+            return b""
+        return memoryview(self._buf)[:self._size]
+
+    def release(self):
+        '''
+        Returns the buffer to the pool, once the data has been uploaded.
+        '''
+        if self._buf is not None:
+            self._pool.release(self._buf)
+            self._buf = None
+
+
 def _get_write_buf_size(buffer_size_hint, file_upload_params, expected_file_size, file_is_mmapd=False):
     max_num_parts = file_upload_params['maximumNumParts']
     min_part_size = file_upload_params['minimumPartSize']
@@ -170,6 +235,8 @@ class DXFile(DXDataObject):
 
     _http_threadpool_size = DXFILE_HTTP_THREADS
     _http_threadpool = dxpy.utils.get_futures_threadpool(max_workers=_http_threadpool_size)
+    # Hashes parts, and requests their upload URLs, ahead of their upload
+    _prepare_threadpool = dxpy.utils.get_futures_threadpool(max_workers=_http_threadpool_size)
 
     NO_PROJECT_HINT = 'NO_PROJECT_HINT'
 
@@ -213,8 +280,13 @@ class DXFile(DXDataObject):
             if mode not in ['r', 'w', 'a']:
                 raise ValueError("mode must be one of 'r', 'w', or 'a'")
             self._close_on_exit = (mode == 'w')
-        self._read_buf = BytesIO()
-        self._write_buf = BytesIO()
+        # Most recently received chunk of the file, and the offset in it
+        # of the byte at the current position (self._pos)
+        self._read_buf, self._read_buf_pos = b"", 0
+        # Buffers of the parts being written and uploaded, within a
+        # memory limit; sized once the part size is known
+        self._buffer_pool = BufferPool(None, UPLOAD_MEMORY_LIMIT, num_buffers=self._http_threadpool_size + 2)
+        self._write_buf = _WriteBuffer(self._buffer_pool)
 
         self._read_bufsize = read_buffer_size
 
@@ -228,21 +300,27 @@ class DXFile(DXDataObject):
         self._expected_file_size = expected_file_size
         self._file_is_mmapd = file_is_mmapd
 
-        # These are cached once for all download threads. This saves calls to the apiserver.
-        self._download_url, self._download_url_headers, self._download_url_expires = None, None, None
-
-        # This lock protects accesses to the above three variables, ensuring that they would
-        # be checked and changed atomically. This protects against thread race conditions.
-        self._url_download_mutex = Lock()
-
         self._request_iterator, self._response_iterator = None, None
         self._http_threadpool_futures = set()
+        # Created on the first read, and kept across seeks so that what
+        # it has learned about the connection is not lost
+        self._read_ahead = None
+        # Whether the current requests are for blocks of the block cache,
+        # and the number of chunks consumed since they were started
+        self._reading_blocks, self._num_chunks_read = False, 0
 
         # Initialize state
         self._pos = 0
         self._file_length = None
         self._cur_part = 1
         self._num_uploaded_parts = 0
+        # If set, a dxpy.upload_manifest.UploadManifest in which uploaded
+        # parts are recorded
+        self._upload_manifest = None
+        # If set, a dxpy.part_sizing.PartSizeController that chooses the
+        # size of each part, and the number of bytes in the parts started
+        self._part_size_controller = None
+        self._num_bytes_in_parts = 0
 
     def _new(self, dx_hash, media_type=None, **kwargs):
         """
@@ -367,38 +445,23 @@ class DXFile(DXDataObject):
         else:
             raise DXFileError("Invalid value supplied for from_what")
 
-        orig_pos = self._pos
-        self._pos = reference_pos + offset
+        new_pos = reference_pos + offset
+        buf_start = self._pos - self._read_buf_pos
+        buf_end = buf_start + len(self._read_buf)
+        self._pos = new_pos
 
-        in_buf = False
-        orig_buf_pos = self._read_buf.tell()
-        if offset < orig_pos:
-            if orig_buf_pos > orig_pos - offset:
-                # offset is less than original position but within the buffer
-                in_buf = True
-        else:
-            buf_len = dxpy.utils.string_buffer_length(self._read_buf)
-            if buf_len - orig_buf_pos > offset - orig_pos:
-                # offset is greater than original position but within the buffer
-                in_buf = True
-
-        if in_buf:
-            # offset is within the buffer (at least one byte following
-            # the offset can be read directly out of the buffer)
-            self._read_buf.seek(orig_buf_pos - orig_pos + offset)
-        elif offset == orig_pos:
-            # This seek is a no-op (the cursor is just past the end of
-            # the read buffer and coincides with the desired seek
-            # position). We don't have the data ready, but the request
-            # for the data starting here is already in flight.
+        if buf_start <= new_pos <= buf_end:
+            # The new position is within the buffer, or just past its end.
+            # In the latter case we don't have the data ready, but the
+            # request for the data starting there is already in flight.
             #
             # Detecting this case helps to optimize for sequential read
             # access patterns.
-            pass
+            self._read_buf_pos = new_pos - buf_start
         else:
             # offset is outside the buffer-- reset buffer and queues.
             # This is the failsafe behavior
-            self._read_buf = BytesIO()
+            self._read_buf, self._read_buf_pos = b"", 0
             # TODO: if the offset is within the next response(s), don't throw out the queues
             self._request_iterator, self._response_iterator = None, None
 
@@ -416,15 +479,7 @@ class DXFile(DXDataObject):
         Flushes the internal write buffer.
         '''
         if self._write_buf.tell() > 0:
-            data = self._write_buf.getvalue()
-            self._write_buf = BytesIO()
-
-            if multithread:
-                self._async_upload_part_request(data, index=self._cur_part, **kwargs)
-            else:
-                self.upload_part(data, self._cur_part, **kwargs)
-
-            self._cur_part += 1
+            self._upload_write_buf(multithread, **kwargs)
 
         if len(self._http_threadpool_futures) > 0:
             dxpy.utils.wait_for_all_futures(self._http_threadpool_futures)
@@ -435,14 +490,53 @@ class DXFile(DXDataObject):
             finally:
                 self._http_threadpool_futures = set()
 
-    def _async_upload_part_request(self, *args, **kwargs):
-        while len(self._http_threadpool_futures) >= self._http_threadpool_size:
+    def _upload_write_buf(self, multithread=True, **kwargs):
+        # Uploads the data accumulated in the write buffer as the next
+        # part; its buffer is returned to the pool once it is uploaded
+        write_buf, self._write_buf = self._write_buf, _WriteBuffer(self._buffer_pool)
+        data = write_buf.getvalue()
+        if multithread:
+            self._async_upload_part_request(data, index=self._cur_part, release_fn=write_buf.release, **kwargs)
+        else:
+            try:
+                self.upload_part(data, self._cur_part, **kwargs)
+            finally:
+                write_buf.release()
+        self._cur_part += 1
+        self._part_started(len(data))
+
+    def _wait_for_parts_in_flight(self):
+        # Waits for the parts still being uploaded once the upload has
+        # failed, so that none of them is uploaded (and recorded in the
+        # upload manifest) after the error has been raised
+        futures, self._http_threadpool_futures = self._http_threadpool_futures, set()
+        if len(futures) > 0:
+            dxpy.utils.wait_for_all_futures(futures)
+
+    def _async_upload_part_request(self, data, index=None, display_progress=False, report_progress_fn=None,
+                                   release_fn=None, **kwargs):
+        # Parts are hashed, and their upload URLs requested, in
+        # _prepare_threadpool as soon as they are queued, so that this
+        # overlaps with the upload of earlier parts. mmap'd parts take no
+        # memory until they are read, so more of them are queued.
+        max_queued = self._http_threadpool_size + (self._http_threadpool_size if self._file_is_mmapd else 1)
+        while len(self._http_threadpool_futures) >= max_queued:
             future = dxpy.utils.wait_for_a_future(self._http_threadpool_futures)
             if future.exception() != None:
+                self._wait_for_parts_in_flight()
                 raise future.exception()
             self._http_threadpool_futures.remove(future)
 
-        future = self._http_threadpool.submit(self.upload_part, *args, **kwargs)
+        prepared = self._prepare_threadpool.submit(self._prepare_part, data, index, **kwargs)
+
+        def upload():
+            try:
+                self._upload_prepared_part(data, prepared.result(), display_progress=display_progress,
+                                           report_progress_fn=report_progress_fn, **kwargs)
+            finally:
+                if release_fn is not None:
+                    release_fn()
+        future = self._http_threadpool.submit(upload)
         self._http_threadpool_futures.add(future)
 
     def _ensure_write_bufsize(self, **kwargs):
@@ -458,6 +552,26 @@ class DXFile(DXDataObject):
                                                   file_upload_params,
                                                   self._expected_file_size,
                                                   self._file_is_mmapd)
+        if dxpy._adaptive_part_sizing:
+            alignment = mmap.ALLOCATIONGRANULARITY if self._file_is_mmapd else 1
+            min_part_size = file_upload_params['minimumPartSize']
+            max_part_size = file_upload_params['maximumPartSize']
+            self._part_size_controller = PartSizeController(
+                self._write_bufsize,
+                min_part_size + (-min_part_size % alignment),
+                max_part_size - max_part_size % alignment,
+                file_upload_params['maximumNumParts'],
+                expected_file_size=self._expected_file_size,
+                alignment=alignment)
+
+    def _part_started(self, num_bytes):
+        # Called once a part has been dispatched, and the write buffer is
+        # empty: the next part may be of a different size
+        self._num_bytes_in_parts += num_bytes
+        if self._part_size_controller is not None:
+            self._write_bufsize = self._part_size_controller.next_part_size(self._num_bytes_in_parts,
+                                                                             self._cur_part - 1)
+            self._buffer_pool.buffer_size = self._write_bufsize
 
     def write(self, data, multithread=True, **kwargs):
         '''
@@ -473,6 +587,7 @@ class DXFile(DXDataObject):
 
         '''
         self._ensure_write_bufsize(**kwargs)
+        self._buffer_pool.buffer_size = self._write_bufsize
 
         def write_request(data_for_write_req):
             if multithread:
@@ -480,6 +595,7 @@ class DXFile(DXDataObject):
             else:
                 self.upload_part(data_for_write_req, self._cur_part, **kwargs)
             self._cur_part += 1
+            self._part_started(len(data_for_write_req))
 
         if self._write_buf.tell() == 0 and self._write_bufsize == len(data):
             # In the special case of a write that is the same size as
@@ -503,15 +619,31 @@ class DXFile(DXDataObject):
             self._write_buf.write(data)
         else:
             self._write_buf.write(data[:remaining_space])
-
-            temp_data = self._write_buf.getvalue()
-            self._write_buf = BytesIO()
-            write_request(temp_data)
+            self._upload_write_buf(multithread, **kwargs)
 
             # TODO: check if repeat string splitting is bad for
             # performance when len(data) >> _write_bufsize
             self.write(data[remaining_space:], **kwargs)
 
+    def _write_stream(self, fileobj, multithread=True, **kwargs):
+        '''
+        :param fileobj: File-like object with a readinto method, e.g. a pipe
+        :type fileobj: file
+
+        Writes the data read from *fileobj*, up to its end, to the file.
+        The data is read directly into the buffers of the parts, so that
+        reading, hashing and uploading parts overlap within the memory
+        limit of the buffers (see :mod:`dxpy.buffer_pool`).
+        '''
+        self._ensure_write_bufsize(**kwargs)
+        while True:
+            self._buffer_pool.buffer_size = self._write_bufsize
+            num_bytes = self._write_buf.read_from(fileobj, self._write_bufsize)
+            if self._write_buf.tell() == self._write_bufsize:
+                self._upload_write_buf(multithread, **kwargs)
+            if num_bytes == 0:
+                break
+
     def closed(self, **kwargs):
         '''
         :returns: Whether the remote file is closed
@@ -586,6 +718,14 @@ class DXFile(DXDataObject):
         defaults to 1. This probably only makes sense if this is the
         only part to be uploaded.
         """
+        self._upload_prepared_part(data, self._prepare_part(data, index, **kwargs), display_progress=display_progress,
+                                   report_progress_fn=report_progress_fn, **kwargs)
+
+    def _prepare_part(self, data, index=None, **kwargs):
+        # Hashes the part, reading it once (so that its pages are still in
+        # the page cache when it is uploaded), and requests a URL to
+        # upload it to. Returns the input of /file-xxxx/upload, and the
+        # URL, its headers, and the time after which it is not used.
         req_input = {}
         if index is not None:
             req_input["index"] = int(index)
@@ -608,7 +748,27 @@ class DXFile(DXDataObject):
         req_input["md5"] = md5.hexdigest()
         req_input["size"] = len(data)
 
+        if "timeout" not in kwargs:
+            kwargs["timeout"] = FILE_REQUEST_TIMEOUT
+        resp = dxpy.api.file_upload(self._dxid, req_input, **kwargs)
+        # Try to account for drift
+        expires = resp["expires"] / 1000 - 60 if "expires" in resp else None
+        return req_input, resp["url"], _validate_headers(resp.get("headers", {})), expires
+
+    def _upload_prepared_part(self, data, prepared, display_progress=False, report_progress_fn=None, **kwargs):
+        req_input, prepared_url, prepared_headers, prepared_url_expires = prepared
+        # The prepared URL is used for the first attempt, unless it has
+        # expired while the part was queued
+        prepared_url_and_headers = [(prepared_url, prepared_headers)]
+        if prepared_url_expires is not None and prepared_url_expires < time.time():
+            prepared_url_and_headers = []
+        num_attempts = [0]
+
         def get_upload_url_and_headers():
+            num_attempts[0] += 1
+            if prepared_url_and_headers:
+                return prepared_url_and_headers.pop()
+
             # This function is called from within a retry loop, so to avoid amplifying the number of retries
             # geometrically, we decrease the allowed number of retries for the nested API call every time.
             if 'max_retries' not in kwargs:
@@ -626,6 +786,7 @@ class DXFile(DXDataObject):
         # The file upload API requires us to get a pre-authenticated upload URL (and headers for it) every time we
         # attempt an upload. Because DXHTTPRequest will retry requests under retryable conditions, we give it a callback
         # to ask us for a new upload URL every time it attempts a request (instead of giving them directly).
+        started = time.time()
         dxpy.DXHTTPRequest(get_upload_url_and_headers,
                            data,
                            jsonify_data=False,
@@ -635,7 +796,12 @@ class DXFile(DXDataObject):
                            auth=None,
                            method='PUT')
 
+        if self._part_size_controller is not None:
+            self._part_size_controller.observe(len(data), time.time() - started, max(num_attempts[0], 1))
+
         self._num_uploaded_parts += 1
+        if self._upload_manifest is not None and "index" in req_input:
+            self._upload_manifest.record(req_input["index"], req_input["size"], req_input["md5"])
 
         if display_progress:
             warn(".")
@@ -670,6 +836,9 @@ class DXFile(DXDataObject):
         Obtains a URL that can be used to directly download the associated
         file.
 
+        URLs are cached, and shared with the other handlers of the file
+        (see :mod:`dxpy.download_url_cache`), unless *duration* is given.
+
         """
         # Test hook to write 'project' argument passed to API call to a
         # local file
@@ -687,34 +856,24 @@ class DXFile(DXDataObject):
         if project is not None:
             args["project"] = project
 
-        with self._url_download_mutex:
-            if self._download_url is None or self._download_url_expires < time.time():
-                # The idea here is to cache a download URL for the entire file, that will
-                # be good for a few minutes. This avoids each thread having to ask the
-                # server for a URL, increasing server load.
-                #
-                # To avoid thread race conditions, this check/update procedure is protected
-                # with a lock.
-
-                # logging.debug("Download URL unset or expired, requesting a new one")
-                if "timeout" not in kwargs:
-                    kwargs["timeout"] = FILE_REQUEST_TIMEOUT
-                resp = dxpy.api.file_download(self._dxid, args, **kwargs)
-                self._download_url = resp["url"]
-                self._download_url_headers = _validate_headers(resp.get("headers", {}))
-                if preauthenticated:
-                    self._download_url_expires = resp["expires"]/1000 - 60  # Try to account for drift
-                else:
-                    self._download_url_expires = 32503680000  # doesn't expire (year 3000)
-
-            # Make a copy, ensuring each thread has its own mutable
-            # version of the headers.  Note: python strings are
-            # immutable, so we can safely give a reference to the
-            # download url.
-            retval_download_url = self._download_url
-            retval_download_url_headers = copy.copy(self._download_url_headers)
-
-        return retval_download_url, retval_download_url_headers
+        if "timeout" not in kwargs:
+            kwargs["timeout"] = FILE_REQUEST_TIMEOUT
+
+        def fetch():
+            resp = dxpy.api.file_download(self._dxid, args, **kwargs)
+            resp["headers"] = _validate_headers(resp.get("headers", {}))
+            return resp
+
+        if duration is not None or set(kwargs) - {"timeout"}:
+            # The URL must be valid for *duration* from now, or is
+            # obtained with custom credentials or settings
+            resp = fetch()
+            return resp["url"], resp["headers"]
+        # The idea here is to cache a download URL for the entire file,
+        # shared by all threads and handlers. This avoids each of them
+        # having to ask the server for a URL, increasing server load.
+        url_cache = dxpy._download_url_cache
+        return url_cache.get(url_cache.key(self._dxid, args, dxpy.APISERVER, dxpy.SECURITY_CONTEXT), fetch)
 
     def _generate_read_requests(self, start_pos=0, end_pos=None, project=None,
                                 limit_chunk_size=None, **kwargs):
@@ -732,32 +891,70 @@ class DXFile(DXDataObject):
         if end_pos > self._file_length:
             raise DXFileError("Invalid end_pos")
 
-        def chunk_ranges(start_pos, end_pos, init_chunk_size=1024*64, ramp=2, num_requests_between_ramp=4):
-            cur_chunk_start = start_pos
-            cur_chunk_size = min(init_chunk_size, limit_chunk_size)
-            i = 0
-            while cur_chunk_start < end_pos:
-                cur_chunk_end = min(cur_chunk_start + cur_chunk_size - 1, end_pos)
-                yield cur_chunk_start, cur_chunk_end
-                cur_chunk_start += cur_chunk_size
-                if cur_chunk_size < limit_chunk_size and i % num_requests_between_ramp == (num_requests_between_ramp - 1):
-                    cur_chunk_size = min(cur_chunk_size * ramp, limit_chunk_size)
-                i += 1
-
-        for chunk_start_pos, chunk_end_pos in chunk_ranges(start_pos, end_pos):
+        # The chunk size is chosen as each request is generated, from what
+        # the read-ahead controller has measured so far
+        read_ahead = self._get_read_ahead()
+        chunk_start_pos = start_pos
+        while chunk_start_pos < end_pos:
+            chunk_size = min(read_ahead.get_chunk_size(), limit_chunk_size)
+            chunk_end_pos = min(chunk_start_pos + chunk_size - 1, end_pos, self._file_length - 1)
             url, headers = self.get_download_url(project=project, **kwargs)
-            # It is possible for chunk_end_pos to be outside of the range of the file
-            yield dxpy._dxhttp_read_range, [url, headers, chunk_start_pos, min(chunk_end_pos, self._file_length - 1),
-                                            FILE_REQUEST_TIMEOUT], {}
+            yield read_ahead.fetch, [dxpy._dxhttp_read_file_range, chunk_end_pos - chunk_start_pos + 1, self._dxid,
+                                     url, headers, chunk_start_pos, chunk_end_pos, FILE_REQUEST_TIMEOUT], {}
+            chunk_start_pos += chunk_size
+
+    def _generate_block_requests(self, block_cache, start_pos=0, project=None, **kwargs):
+        # Like _generate_read_requests, but requests whole blocks of
+        # block_cache, and serves the cached ones from it. The first
+        # chunk starts at start_pos, the others at block boundaries.
+        block_size = block_cache.block_size
+        skip = start_pos % block_size
+        for index in range(start_pos // block_size, (self._file_length + block_size - 1) // block_size):
+            block = block_cache.get(self._dxid, index)
+            if block is None:
+                url, headers = self.get_download_url(project=project, **kwargs)
+                block_start_pos = index * block_size
+                block_end_pos = min(block_start_pos + block_size, self._file_length) - 1
+                yield self._read_block, [block_cache, index, url, headers, block_start_pos, block_end_pos, skip], {}
+            else:
+                yield _skip_bytes, [block, skip], {}
+            skip = 0
+
+    def _read_block(self, block_cache, index, url, headers, start_pos, end_pos, skip):
+        data = self._get_read_ahead().fetch(dxpy._dxhttp_read_file_range, end_pos - start_pos + 1, self._dxid, url,
+                                            headers, start_pos, end_pos, FILE_REQUEST_TIMEOUT)
+        block_cache.put(self._dxid, index, data)
+        return _skip_bytes(data, skip)
+
+    def _read_ahead_window(self):
+        window = self._get_read_ahead().get_window()
+        if self._reading_blocks:
+            # Random access is likely: read ahead no further than the
+            # reader has read sequentially since the last seek
+            window = min(window, self._num_chunks_read + 1)
+        return window
+
+    def _get_read_ahead(self):
+        if self._read_ahead is None:
+            self._read_ahead = ReadAheadController(max_chunk_size=self._read_bufsize,
+                                                   max_window=READ_AHEAD_MAX_WINDOW)
+        return self._read_ahead
 
     def _next_response_content(self):
+        read_ahead = self._get_read_ahead()
         if self._response_iterator is None:
+            self._num_chunks_read = 0
             self._response_iterator = dxpy.utils.response_iterator(
                 self._request_iterator,
-                self._http_threadpool
+                self._http_threadpool,
+                max_active_tasks=self._read_ahead_window
             )
         try:
-            return next(self._response_iterator)
+            started = time.time()
+            content = next(self._response_iterator)
+            read_ahead.consumed(len(content), time.time() - started)
+            self._num_chunks_read += 1
+            return content
         except:
             # If an exception is raised, the iterator is unusable for
             # retrieving any more items. Destroy it so we'll reinitialize it
@@ -766,42 +963,19 @@ class DXFile(DXDataObject):
             self._request_iterator = None
             raise
 
-    def read(self, length=None, use_compression=None, project=None, **kwargs):
-        '''
-        :param length: Maximum number of bytes to be read
-        :type length: integer
-        :param project: project to use as context for this download (may affect
-            which billing account is billed for this download). If specified,
-            must be a project in which this file exists. If not specified, the
-            project ID specified in the handler is used for the download, IF it
-            contains this file. If set to DXFile.NO_PROJECT_HINT, no project ID
-            is supplied for the download, even if the handler specifies a
-            project ID.
-        :type project: str or None
-        :rtype: string
-        :raises: :exc:`~dxpy.exceptions.ResourceNotFound` if *project* is
-            supplied and it does not contain this file
-
-        Returns the next *length* bytes, or all the bytes until the end of file
-        (if no *length* is given or there are fewer than *length* bytes left in
-        the file).
-
-        .. note:: After the first call to read(), the project arg and
-           passthrough kwargs are not respected while using the same response
-           iterator (i.e. until next seek).
-
-        '''
+    def _prepare_read(self, length, project, **kwargs):
+        # Returns the number of bytes to read (at most *length*), and the
+        # project hint to supply with download requests
         if self._file_length == None:
             desc = self.describe(**kwargs)
             if desc["state"] != "closed":
                 raise DXFileError("Cannot read from file until it is in the closed state")
             self._file_length = int(desc["size"])
 
-        if self._pos == self._file_length:
-            return b""
-
-        if length == None or length > self._file_length - self._pos:
-            length = self._file_length - self._pos
+        if length == None or length < 0 or length > self._file_length - self._pos:
+            length = max(self._file_length - self._pos, 0)
+        if length == 0:
+            return 0, None
 
         # Project specified explicitly to this method read(project=...) is
         # treated strictly. If supplied, it must be a project in which this
@@ -822,39 +996,97 @@ class DXFile(DXDataObject):
                 project = project_from_handler
         elif project == DXFile.NO_PROJECT_HINT:
             project = None
+        return length, project
+
+    def _read_pieces(self, length, project, **kwargs):
+        # Yields memoryviews of the next *length* bytes of the file, as
+        # they become available, advancing the position past each of them.
+        # The views refer to the chunks received; nothing is copied here.
+        while length > 0:
+            if self._read_buf_pos == len(self._read_buf):
+                if self._response_iterator is None:
+                    block_cache = dxpy._block_cache
+                    self._reading_blocks = block_cache is not None
+                    if self._reading_blocks:
+                        self._request_iterator = self._generate_block_requests(
+                            block_cache, start_pos=self._pos, project=project, **kwargs)
+                    else:
+                        self._request_iterator = self._generate_read_requests(
+                            start_pos=self._pos, project=project, **kwargs)
+                self._read_buf, self._read_buf_pos = self._next_response_content(), 0
+                if len(self._read_buf) == 0:
+                    raise DXFileError("Received no data for {} at position {}".format(self.get_id(), self._pos))
+            num_bytes = min(length, len(self._read_buf) - self._read_buf_pos)
+            piece = memoryview(self._read_buf)[self._read_buf_pos:self._read_buf_pos + num_bytes]
+            self._read_buf_pos += num_bytes
+            self._pos += num_bytes
+            length -= num_bytes
+            yield piece
 
-        buf = self._read_buf
-        buf_remaining_bytes = dxpy.utils.string_buffer_length(buf) - buf.tell()
-        if length <= buf_remaining_bytes:
-            self._pos += length
-            return buf.read(length)
-        else:
-            orig_buf_pos = buf.tell()
-            orig_file_pos = self._pos
-            buf.seek(0, os.SEEK_END)
-            self._pos += buf_remaining_bytes
-            while self._pos < orig_file_pos + length:
-                remaining_len = orig_file_pos + length - self._pos
+    def read(self, length=None, use_compression=None, project=None, **kwargs):
+        '''
+        :param length: Maximum number of bytes to be read
+        :type length: integer
+        :param project: project to use as context for this download (may affect
+            which billing account is billed for this download). If specified,
+            must be a project in which this file exists. If not specified, the
+            project ID specified in the handler is used for the download, IF it
+            contains this file. If set to DXFile.NO_PROJECT_HINT, no project ID
+            is supplied for the download, even if the handler specifies a
+            project ID.
+        :type project: str or None
+        :rtype: string
+        :raises: :exc:`~dxpy.exceptions.ResourceNotFound` if *project* is
+            supplied and it does not contain this file
 
-                if self._response_iterator is None:
-                    self._request_iterator = self._generate_read_requests(
-                        start_pos=self._pos, project=project, **kwargs)
-                content = self._next_response_content()
-
-                if len(content) < remaining_len:
-                    buf.write(content)
-                    self._pos += len(content)
-                else: # response goes beyond requested length
-                    buf.write(content[:remaining_len])
-                    self._pos += remaining_len
-                    self._read_buf = BytesIO()
-                    self._read_buf.write(content[remaining_len:])
-                    self._read_buf.seek(0)
-            buf.seek(orig_buf_pos)
-            return buf.read()
+        Returns the next *length* bytes, or all the bytes until the end of file
+        (if no *length* is given or there are fewer than *length* bytes left in
+        the file).
+
+        .. note:: After the first call to read(), the project arg and
+           passthrough kwargs are not respected while using the same response
+           iterator (i.e. until next seek).
+
+        '''
+        length, project = self._prepare_read(length, project, **kwargs)
+        if length == 0:
+            return b""
+        pieces = list(self._read_pieces(length, project, **kwargs))
+        if len(pieces) == 1 or USING_PYTHON2:
+            return b"".join(piece.tobytes() for piece in pieces)
+        # Copies each piece exactly once
+        return b"".join(pieces)
 
         # Debug fallback
         # import urllib2
         # req = urllib2.Request(url, headers=headers)
         # response = urllib2.urlopen(req)
         # return response.read()
+
+    def readinto(self, buffer, project=None, **kwargs):
+        '''
+        :param buffer: Writable buffer to read into, e.g. a bytearray, or a memoryview of a larger buffer
+        :type buffer: bytearray or memoryview
+        :param project: See :meth:`read`
+        :type project: str or None
+        :returns: Number of bytes read; 0 at the end of the file
+        :rtype: int
+
+        Reads up to ``len(buffer)`` bytes into *buffer*, copying the data
+        received once, directly into place.
+        '''
+        try:
+            view = memoryview(buffer)
+            if not USING_PYTHON2 and (view.ndim != 1 or view.itemsize != 1):
+                view = view.cast('B')
+        except TypeError:
+            # Python 2 objects without a new-style buffer interface (e.g. mmap)
+            view = buffer
+        length, project = self._prepare_read(len(view), project, **kwargs)
+        offset = 0
+        for piece in self._read_pieces(length, project, **kwargs):
+            if view is buffer:
+                piece = piece.tobytes()
+            view[offset:offset + len(piece)] = piece
+            offset += len(piece)
+        return offset
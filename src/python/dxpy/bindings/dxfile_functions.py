@@ -24,19 +24,21 @@ The following helper functions are useful shortcuts for interacting with File ob
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
-import os, sys, math, mmap, stat
+import os, sys, math, mmap, stat, copy, collections
 import hashlib
 import traceback
 import warnings
 from collections import defaultdict
+from threading import Lock
 
 import dxpy
 from .. import logger
 from . import dxfile, DXFile
-from .dxfile import FILE_REQUEST_TIMEOUT
+from .. import upload_manifest
+from .dxfile import FILE_REQUEST_TIMEOUT, MD5_READ_CHUNK_SIZE
 from ..compat import open
 from ..exceptions import DXFileError, DXPartLengthMismatchError, DXChecksumMismatchError, DXIncompleteReadsError
-from ..utils import response_iterator
+from ..utils import get_futures_threadpool, wait_for_a_future, wait_for_all_futures
 
 def open_dxfile(dxid, project=None, read_buffer_size=dxfile.DEFAULT_BUFFER_SIZE):
     '''
@@ -92,8 +94,36 @@ def new_dxfile(mode=None, write_buffer_size=dxfile.DEFAULT_BUFFER_SIZE, expected
     return dx_file
 
 
+def _write_at(fd, offset, data, lock):
+    # Positional write; a lock serializes seek and write where os.pwrite
+    # is not available (Python 2)
+    if hasattr(os, 'pwrite'):
+        view = memoryview(data)
+        while len(view) > 0:
+            written = os.pwrite(fd, view, offset)
+            view, offset = view[written:], offset + written
+    else:
+        with lock:
+            os.lseek(fd, offset, os.SEEK_SET)
+            while len(data) > 0:
+                written = os.write(fd, data)
+                data = data[written:]
+
+
+def _preallocate(fh, size):
+    # Reserves space for the file up front, where the filesystem allows
+    fh.flush()
+    if hasattr(os, 'posix_fallocate') and size > 0:
+        try:
+            os.posix_fallocate(fh.fileno(), 0, size)
+            return
+        except OSError:
+            pass
+    fh.truncate(size)
+
+
 def download_dxfile(dxid, filename, chunksize=dxfile.DEFAULT_BUFFER_SIZE, append=False, show_progress=False,
-                    project=None, **kwargs):
+                    project=None, describe_output=None, **kwargs):
     '''
     :param dxid: DNAnexus file ID or DXFile (file handler) object
     :type dxid: string or DXFile
@@ -105,30 +135,53 @@ def download_dxfile(dxid, filename, chunksize=dxfile.DEFAULT_BUFFER_SIZE, append
             which billing account is billed for this download). If None, no
             project hint is supplied to the API server.
     :type project: str or None
+    :param describe_output: Description of the file, including its "parts" field, if already known (for example from :func:`~dxpy.bindings.search.find_data_objects`); the file is then not described again
+    :type describe_output: dict or None
 
 
     Downloads the remote file referenced by *dxid* and saves it to *filename*.
 
+    If the download cache is enabled (see :func:`dxpy.set_download_cache`),
+    the file is served from it if it was downloaded before, and added to
+    it otherwise.
+
     Example::
 
         download_dxfile("file-xxxx", "localfilename.fastq")
 
     '''
+    download_cache = dxpy._download_cache
+    dxfile_desc = None
+    if describe_output is not None and "parts" in describe_output:
+        dxfile_desc = describe_output
+    if download_cache is not None and not append:
+        if not isinstance(dxid, DXFile):
+            dxid = DXFile(dxid, mode="r")
+        if dxfile_desc is None:
+            dxfile_desc = dxid.describe(fields={"parts"}, default_fields=True, **kwargs)
+        if dxfile_desc["state"] == "closed" and download_cache.fetch(dxid.get_id(), dxfile_desc["parts"], filename):
+            logger.debug("Served %s from the download cache", dxid.get_id())
+            return
+
     # retry the inner loop while there are retriable errors
     part_retry_counter = defaultdict(lambda: 3)
     success = False
     while not success:
         success = _download_dxfile(dxid, filename, part_retry_counter,
                                    chunksize=dxfile.MIN_BUFFER_SIZE, append=append,
-                                   show_progress=show_progress, project=project, **kwargs)
+                                   show_progress=show_progress, project=project, dxfile_desc=dxfile_desc, **kwargs)
+
+    if download_cache is not None and not append and dxfile_desc is not None and dxfile_desc["state"] == "closed":
+        download_cache.add(dxid.get_id() if isinstance(dxid, DXFile) else dxid, dxfile_desc["parts"], filename)
 
 
 def _download_dxfile(dxid, filename, part_retry_counter,
                      chunksize=dxfile.DEFAULT_BUFFER_SIZE, append=False, show_progress=False,
-                     project=None, **kwargs):
+                     project=None, dxfile_desc=None, **kwargs):
     '''
     Core of download logic. Download file-id *dxid* and store it in
-    a local file *filename*.
+    a local file *filename*. *dxfile_desc*, if given, is its description,
+    including its parts.
 
     The return value is as follows:
     - True means the download was successfully completed
@@ -167,8 +220,9 @@ def _download_dxfile(dxid, filename, part_retry_counter,
     else:
         dxfile = DXFile(dxid, mode="r")
 
-    dxfile_desc = dxfile.describe(fields={"parts"}, default_fields=True, **kwargs)
-    parts = dxfile_desc["parts"]
+    if dxfile_desc is None:
+        dxfile_desc = dxfile.describe(fields={"parts"}, default_fields=True, **kwargs)
+    parts = copy.deepcopy(dxfile_desc["parts"])
     parts_to_get = sorted(parts, key=int)
     file_size = dxfile_desc.get("size")
 
@@ -177,17 +231,26 @@ def _download_dxfile(dxid, filename, part_retry_counter,
         parts[part_id]["start"] = offset
         offset += parts[part_id]["size"]
 
+    verify_existing = False
     if append:
-        fh = open(filename, "ab")
+        # Chunks are written at explicit offsets, which files opened for
+        # appending ignore
+        with open(filename, "ab") as fh:
+            write_base = fh.tell()
+        fh = open(filename, "rb+")
     else:
+        write_base = 0
         try:
             fh = open(filename, "rb+")
+            verify_existing = True
         except IOError:
             fh = open(filename, "wb")
 
     if show_progress:
         print_progress(0, None)
 
+    write_lock = Lock()
+
     def get_chunk(part_id_to_get, start, end):
         url, headers = dxfile.get_download_url(project=project, **kwargs)
         # If we're fetching the whole object in one shot, avoid setting the Range header to take advantage of gzip
@@ -195,15 +258,21 @@ def _download_dxfile(dxid, filename, part_retry_counter,
         sub_range = False
         if len(parts) > 1 or (start > 0) or (end - start + 1 < parts[part_id_to_get]["size"]):
             sub_range = True
-        data = dxpy._dxhttp_read_range(url, headers, start, end, FILE_REQUEST_TIMEOUT, sub_range)
-        return part_id_to_get, data
+        data = dxpy._dxhttp_read_file_range(dxfile.get_id(), url, headers, start, end, FILE_REQUEST_TIMEOUT, sub_range)
+        if len(data) != end - start + 1:
+            msg = "Unexpected chunk data size in {} part {} at offset {} (expected {}, got {})"
+            msg = msg.format(dxfile.get_id(), part_id_to_get, start, end - start + 1, len(data))
+            raise DXPartLengthMismatchError(msg)
+        # Written in this thread, as soon as the chunk arrives
+        _write_at(fh.fileno(), write_base + start, data, write_lock)
+        return len(data)
 
     def chunk_requests():
         for part_id_to_chunk in parts_to_get:
             part_info = parts[part_id_to_chunk]
             for chunk_start in range(part_info["start"], part_info["start"] + part_info["size"], chunksize):
                 chunk_end = min(chunk_start + chunksize, part_info["start"] + part_info["size"]) - 1
-                yield get_chunk, [part_id_to_chunk, chunk_start, chunk_end], {}
+                yield part_id_to_chunk, chunk_start, chunk_end
 
     def verify_part(_part_id, got_bytes, hasher):
         if got_bytes is not None and got_bytes != parts[_part_id]["size"]:
@@ -218,7 +287,7 @@ def _download_dxfile(dxid, filename, part_retry_counter,
             raise DXChecksumMismatchError(msg)
 
     with fh:
-        if fh.mode == "rb+":
+        if verify_existing:
             # We already downloaded the beginning of the file, verify that the
             # chunk checksums match the metadata.
             last_verified_part, last_verified_pos, max_verify_chunk_size = None, 0, 1024*1024
@@ -253,20 +322,78 @@ def _download_dxfile(dxid, filename, part_retry_counter,
                 print_progress(last_verified_pos, file_size, action="Resuming at")
             logger.debug("Verified %s/%d downloaded parts", last_verified_part, len(parts_to_get))
 
+        # Chunks are downloaded in parallel, and each one is written to its
+        # place in the file by the thread that downloaded it, as soon as it
+        # arrives, so that a slow chunk does not hold up the others. The
+        # parts are checksummed by a separate thread, which reads back each
+        # part as the range of it written without gaps grows.
+        _preallocate(fh, write_base + offset)
+        hash_threadpool = get_futures_threadpool(1)
+        hashers = {part_id: hashlib.md5() for part_id in parts_to_get}
+        # Offset up to which each part has been written without gaps, and
+        # the ranges written past that offset, by start offset
+        hashed_to = {part_id: parts[part_id]["start"] for part_id in parts_to_get}
+        completed_ranges = {part_id: {} for part_id in parts_to_get}
+        chunk_futures, hash_futures = {}, collections.deque()
+        max_active_chunks = dxfile._http_threadpool_size * 2
+        cur_part = None
+
+        def hash_range(part_id, start, end, read_fh):
+            read_fh.seek(write_base + start)
+            while start < end:
+                data = read_fh.read(min(MD5_READ_CHUNK_SIZE, end - start))
+                if not data:
+                    raise DXFileError("Local data for part {} is truncated".format(part_id))
+                hashers[part_id].update(data)
+                start += len(data)
+            if end == parts[part_id]["start"] + parts[part_id]["size"]:
+                verify_part(part_id, parts[part_id]["size"], hashers[part_id])
+
         try:
-            # Main loop. In parallel: download chunks, verify them, and write them to disk.
-            cur_part, got_bytes, hasher = None, None, None
-            for chunk_part, chunk_data in response_iterator(chunk_requests(), dxfile._http_threadpool):
-                if chunk_part != cur_part:
-                    verify_part(cur_part, got_bytes, hasher)
-                    cur_part, got_bytes, hasher = chunk_part, 0, hashlib.md5()
-                got_bytes += len(chunk_data)
-                hasher.update(chunk_data)
-                fh.write(chunk_data)
-                if show_progress:
-                    _bytes += len(chunk_data)
-                    print_progress(_bytes, file_size)
-            verify_part(cur_part, got_bytes, hasher)
+            # Unbuffered, so that no data is read ahead of what has been written
+            with open(filename, "rb", buffering=0) as read_fh:
+                try:
+                    chunks_to_get = chunk_requests()
+                    more_chunks = True
+                    while True:
+                        while more_chunks and len(chunk_futures) < max_active_chunks:
+                            try:
+                                part_id, chunk_start, chunk_end = next(chunks_to_get)
+                            except StopIteration:
+                                more_chunks = False
+                                break
+                            future = dxfile._http_threadpool.submit(get_chunk, part_id, chunk_start, chunk_end)
+                            chunk_futures[future] = (part_id, chunk_start)
+                        if not chunk_futures:
+                            break
+
+                        future = wait_for_a_future(chunk_futures)
+                        cur_part, chunk_start = chunk_futures.pop(future)
+                        chunk_len = future.result()
+                        completed_ranges[cur_part][chunk_start] = chunk_start + chunk_len
+                        hash_start = hashed_to[cur_part]
+                        while hashed_to[cur_part] in completed_ranges[cur_part]:
+                            hashed_to[cur_part] = completed_ranges[cur_part].pop(hashed_to[cur_part])
+                        if hashed_to[cur_part] > hash_start:
+                            hash_futures.append((cur_part, hash_threadpool.submit(hash_range, cur_part, hash_start,
+                                                                                    hashed_to[cur_part], read_fh)))
+                        while hash_futures and hash_futures[0][1].done():
+                            cur_part, hash_future = hash_futures.popleft()
+                            hash_future.result()
+                        if show_progress:
+                            _bytes += chunk_len
+                            print_progress(_bytes, file_size)
+
+                    while hash_futures:
+                        cur_part, hash_future = hash_futures.popleft()
+                        hash_future.result()
+                finally:
+                    # Nothing may write to the file, or read from it, once
+                    # it is closed
+                    for future in chunk_futures:
+                        future.cancel()
+                    wait_for_all_futures(list(chunk_futures) + [f for _, f in hash_futures])
+                    hash_threadpool.shutdown(wait=True)
             if show_progress:
                 print_progress(_bytes, file_size, action="Completed")
         except DXFileError:
@@ -284,7 +411,8 @@ def _download_dxfile(dxid, filename, part_retry_counter,
         return True
 
 def upload_local_file(filename=None, file=None, media_type=None, keep_open=False,
-                      wait_on_close=False, use_existing_dxfile=None, show_progress=False, **kwargs):
+                      wait_on_close=False, use_existing_dxfile=None, show_progress=False, resume_manifest=None,
+                      **kwargs):
     '''
     :param filename: Local filename
     :type filename: string
@@ -298,6 +426,8 @@ def upload_local_file(filename=None, file=None, media_type=None, keep_open=False
     :type wait_on_close: boolean
     :param use_existing_dxfile: Instead of creating a new file object, upload to the specified file
     :type use_existing_dxfile: :class:`~dxpy.bindings.dxfile.DXFile`
+    :param resume_manifest: Path of a local manifest of the upload, from which an interrupted upload of *filename* is resumed (see :mod:`dxpy.upload_manifest`)
+    :type resume_manifest: string
     :returns: Remote file handler
     :rtype: :class:`~dxpy.bindings.dxfile.DXFile`
 
@@ -319,8 +449,12 @@ def upload_local_file(filename=None, file=None, media_type=None, keep_open=False
       # Upload from a file-like object
       with open("reads.fastq") as fh:
           dxpy.upload_local_file(file=fh)
+      # Upload from a path, resuming the upload if it was interrupted
+      dxpy.upload_local_file("/home/ubuntu/reads.fastq.gz", resume_manifest="reads.fastq.gz.manifest")
 
     '''
+    if resume_manifest is not None and filename is None:
+        raise DXFileError("Only uploads from a path can be resumed")
     fd = file if filename is None else open(filename, 'rb')
 
     try:
@@ -330,6 +464,20 @@ def upload_local_file(filename=None, file=None, media_type=None, keep_open=False
 
     file_is_mmapd = hasattr(fd, "fileno")
 
+    manifest, completed_parts = None, set()
+    if resume_manifest is not None:
+        manifest = upload_manifest.UploadManifest(resume_manifest, filename)
+        if manifest.file_id is not None and not use_existing_dxfile:
+            resumed = DXFile(manifest.file_id, project=manifest.project, mode='a', expected_file_size=file_size,
+                             file_is_mmapd=file_is_mmapd)
+            try:
+                desc = resumed.describe(fields={"parts", "state"})
+            except dxpy.exceptions.ResourceNotFound:
+                desc = None
+            if desc is not None and desc["state"] == "open":
+                use_existing_dxfile = resumed
+                completed_parts = manifest.completed_parts(desc.get("parts") or {})
+
     if use_existing_dxfile:
         handler = use_existing_dxfile
     else:
@@ -362,6 +510,15 @@ def upload_local_file(filename=None, file=None, media_type=None, keep_open=False
 
     handler._ensure_write_bufsize(**remaining_kwargs)
 
+    if manifest is not None:
+        if handler.get_id() == manifest.file_id:
+            # Parts are uploaded at the same offsets as before
+            handler._write_bufsize = manifest.part_size
+        # Parts are resumed by index, so they must all be the same size
+        handler._part_size_controller = None
+        manifest.start(handler.get_id(), handler.get_proj_id(), handler._write_bufsize)
+        handler._upload_manifest = manifest
+
     def can_be_mmapd(fd):
         if not hasattr(fd, "fileno"):
             return False
@@ -407,19 +564,35 @@ def upload_local_file(filename=None, file=None, media_type=None, keep_open=False
     if show_progress:
         report_progress(handler, 0)
 
-    while True:
-        buf = read(handler._write_bufsize)
-        offset += len(buf)
+    try:
+        if not can_be_mmapd(fd) and hasattr(fd, "readinto"):
+            # Pipes are read directly into the buffers of the parts
+            handler._write_stream(fd, report_progress_fn=report_progress if show_progress else None, **remaining_kwargs)
+
+        while True:
+            buf = read(handler._write_bufsize)
+            offset += len(buf)
+
+            if len(buf) == 0:
+                break
 
-        if len(buf) == 0:
-            break
+            if handler._cur_part in completed_parts:
+                # Uploaded before the upload was interrupted
+                handler._cur_part += 1
+                handler._num_uploaded_parts += 1
+                if show_progress:
+                    report_progress(handler, len(buf))
+                continue
 
-        handler.write(buf, report_progress_fn=report_progress if show_progress else None, **remaining_kwargs)
+            handler.write(buf, report_progress_fn=report_progress if show_progress else None, **remaining_kwargs)
 
-    if filename is not None:
-        fd.close()
+        if filename is not None:
+            fd.close()
 
-    handler.flush(report_progress_fn=report_progress if show_progress else None, **remaining_kwargs)
+        handler.flush(report_progress_fn=report_progress if show_progress else None, **remaining_kwargs)
+    except:
+        handler._wait_for_parts_in_flight()
+        raise
 
     if show_progress:
         sys.stderr.write("\n")
@@ -428,6 +601,10 @@ def upload_local_file(filename=None, file=None, media_type=None, keep_open=False
     if not keep_open:
         handler.close(block=wait_on_close, report_progress_fn=report_progress if show_progress else None, **remaining_kwargs)
 
+    if manifest is not None:
+        handler._upload_manifest = None
+        manifest.remove()
+
     return handler
 
 def upload_string(to_upload, media_type=None, keep_open=False, wait_on_close=False, **kwargs):
@@ -21,11 +21,12 @@ DXGTable Handler
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
-import os, sys, json, traceback
+import os, sys, traceback
 import concurrent.futures
 
 import dxpy
 from . import DXDataObject
+from .. import json_codec
 from ..exceptions import DXError
 from ..compat import StringIO, basestring
 from ..utils import warn
@@ -53,6 +54,22 @@ DEFAULT_TABLE_WRITE_REQUEST_SIZE = 1024*1024*64 # bytes
 # Available in apps as dxpy.NULL
 NULL = - (1 << 31)
 
+def _streaming_read_requests(request_iterator):
+    '''
+    Adapts requests produced by :meth:`DXGTable._generate_read_requests`
+    so that response bodies are decoded as they are received. The rows of
+    the first response are produced while it is still arriving; the
+    following responses are received and decoded in full in the
+    background, while the rows before them are being consumed.
+    '''
+    def read_all_rows(method):
+        return lambda *args, **kwargs: list(method(*args, **kwargs))
+
+    for i, (method, args, kwargs) in enumerate(request_iterator):
+        kwargs = dict(kwargs, stream_json_array='data')
+        yield (method if i == 0 else read_all_rows(method)), args, kwargs
+
+
 class DXGTable(DXDataObject):
     '''
     Remote GTable object handler.
@@ -334,14 +351,15 @@ class DXGTable(DXDataObject):
 
         DXGTable._ensure_http_threadpool()
 
-        request_iterator = self._generate_read_requests(start_row=start, end_row=end, columns=columns, **kwargs)
+        request_iterator = _streaming_read_requests(
+            self._generate_read_requests(start_row=start, end_row=end, columns=columns, **kwargs))
 
-        for response in dxpy.utils.response_iterator(request_iterator, self._http_threadpool, max_active_tasks=self._http_threadpool_size):
+        for rows in dxpy.utils.response_iterator(request_iterator, self._http_threadpool, max_active_tasks=self._http_threadpool_size):
             if want_dict:
-                for row in response['data']:
+                for row in rows:
                     yield dict(zip(col_names, row))
             else:
-                for row in response['data']:
+                for row in rows:
                     yield row
 
     def iterate_query_rows(self, query=None, columns=None, limit=None, want_dict=False, **kwargs):
@@ -380,18 +398,14 @@ class DXGTable(DXDataObject):
             resp = self.get_rows(query=query, columns=columns,
                                  starting=cursor,
                                  limit=(self._read_row_buffer_size if limit is None else min(limit - returned, self._read_row_buffer_size)),
+                                 stream_json_array='data',
                                  **kwargs)
-            _buffer = resp['data']
-            cursor = resp['next']
-            if len(_buffer) < 1: break
-            if want_dict:
-                for row in _buffer:
-                    returned += 1
-                    yield dict(zip(col_names, row))
-            else:
-                for row in _buffer:
-                    returned += 1
-                    yield row
+            returned_before = returned
+            for row in resp:
+                returned += 1
+                yield dict(zip(col_names, row)) if want_dict else row
+            cursor = resp.fields['next']
+            if returned == returned_before: break
 
     def __iter__(self):
         return self.iterate_rows()
@@ -472,7 +486,7 @@ class DXGTable(DXDataObject):
             self._string_row_buf.write('{"data": [')
 
         if len(self._row_buf) > 0:
-            self._string_row_buf.write(json.dumps(self._row_buf)[1:])
+            self._string_row_buf.write(json_codec.dumps(self._row_buf)[1:])
             self._string_row_buf.seek(-1, os.SEEK_END) # chop off trailing "]"
             self._string_row_buf.write(", ")
             self._row_buf = []
@@ -70,11 +70,19 @@ def resolve_data_objects(objects, project=None, folder=None, batchsize=1000):
     return results
 
 
-def _find(api_method, query, limit, return_handler, first_page_size, **kwargs):
+def _find(api_method, query, limit, return_handler, first_page_size, stream=False, **kwargs):
     ''' Takes an API method handler (dxpy.api.find*) and calls it with *query*,
     and then wraps a generator around its output. Used by the methods below.
 
     Note that this function may only be used for /system/find* methods.
+
+    With *stream* (which the find_* functions below pass through), each
+    page of results is decoded as it is received, so results are yielded
+    before the rest of the page has arrived. The connection stays open
+    until the page has been consumed, so this suits callers that consume
+    results quickly. It must not be used for responses whose results are
+    returned together with other fields of the page ("byParent" and
+    "describe", which may follow the results).
     '''
     num_results = 0
 
@@ -82,30 +90,34 @@ def _find(api_method, query, limit, return_handler, first_page_size, **kwargs):
         query["limit"] = first_page_size
 
     while True:
-        resp = api_method(query, **kwargs)
+        if stream:
+            resp = api_method(query, stream_json_array="results", **kwargs)
+            results, fields = resp, resp.fields
+        else:
+            resp = api_method(query, **kwargs)
+            results, fields = resp["results"], resp
 
-        by_parent = resp.get('byParent')
-        descriptions = resp.get('describe')
         def format_result(result):
             if return_handler:
                 result = dxpy.get_handler(result['id'], project=result.get('project'))
+            by_parent = fields.get('byParent')
             if by_parent is not None:
-                return result, by_parent, descriptions
+                return result, by_parent, fields.get('describe')
             else:
                 return result
 
-        for i in resp["results"]:
+        for i in results:
             if num_results == limit:
-                raise StopIteration()
+                return
             num_results += 1
             yield format_result(i)
 
         # set up next query
-        if resp["next"] is not None:
-            query["starting"] = resp["next"]
+        if fields["next"] is not None:
+            query["starting"] = fields["next"]
             query["limit"] = min(query["limit"]*2, 1000)
         else:
-            raise StopIteration()
+            return
 
 def find_data_objects(classname=None, state=None, visibility=None,
                       name=None, name_mode='exact', properties=None,
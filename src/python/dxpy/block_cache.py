@@ -0,0 +1,216 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Process-wide cache of file contents, for random-access reads.
+
+When enabled (see :func:`dxpy.set_block_cache`), :class:`dxpy.DXFile`
+reads closed files in fixed-size blocks, aligned to multiples of the block
+size, and keeps the blocks it has downloaded in a :class:`BlockCache`
+shared by all handlers in the process, keyed by file ID and block index.
+Reading a region again, e.g. after seeking back to it, is then served
+from the cache.
+
+The cache keeps the most recently used blocks in memory, up to a memory
+limit. Optionally, blocks evicted from memory are written to a directory
+on local disk, up to a disk limit, from which they are read back when
+needed again. The directory may be shared by several processes; blocks
+written to it by earlier processes are reused. Closed files never change,
+so cached blocks never need to be invalidated.
+
+The disk limit is enforced by each process separately, over the blocks
+that were in the directory when its cache was created and those it has
+written since. Blocks written by other processes running at the same time
+are not counted, so processes sharing a directory can together keep up
+to their number times the limit in it.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import collections, os, re, threading
+
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+DEFAULT_MEMORY_LIMIT = 256 * 1024 * 1024
+
+_BLOCK_FILE_NAME = re.compile(r'^([a-z]+-[0-9A-Za-z]{24})\.(\d+)\.(\d+)$')
+
+
+class BlockCache(object):
+    '''
+    :param memory_limit: Number of bytes of blocks kept in memory
+    :type memory_limit: int
+    :param block_size: Size of the blocks, in bytes
+    :type block_size: int
+    :param disk_dir: Directory in which blocks evicted from memory are kept; if None, they are discarded
+    :type disk_dir: string
+    :param disk_limit: Number of bytes of blocks this process keeps in *disk_dir*; if None, they are not limited
+    :type disk_limit: int
+
+    Thread-safe two-tier LRU cache of file blocks.
+    '''
+    def __init__(self, memory_limit=DEFAULT_MEMORY_LIMIT, block_size=DEFAULT_BLOCK_SIZE, disk_dir=None,
+                 disk_limit=None):
+        self.memory_limit = memory_limit
+        self.block_size = block_size
+        self.disk_dir = disk_dir
+        self.disk_limit = disk_limit
+        self._lock = threading.Lock()
+        # (file ID, block index) -> data, least recently used first
+        self._memory = collections.OrderedDict()
+        self._memory_bytes = 0
+        # (file ID, block index) -> size
+        self._disk = collections.OrderedDict()
+        self._disk_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk_dir is not None:
+            self._load_disk_index()
+
+    def _block_path(self, key):
+        return os.path.join(self.disk_dir, "{}.{}.{}".format(key[0], self.block_size, key[1]))
+
+    def _load_disk_index(self):
+        if not os.path.isdir(self.disk_dir):
+            try:
+                os.makedirs(self.disk_dir, 0o700)
+            except OSError:
+                if not os.path.isdir(self.disk_dir):
+                    raise
+        blocks = []
+        for name in os.listdir(self.disk_dir):
+            match = _BLOCK_FILE_NAME.match(name)
+            if match is None or int(match.group(2)) != self.block_size:
+                continue
+            try:
+                stat = os.stat(os.path.join(self.disk_dir, name))
+            except OSError:
+                continue
+            blocks.append((stat.st_atime, (match.group(1), int(match.group(3))), stat.st_size))
+        for _atime, key, size in sorted(blocks):
+            self._disk[key] = size
+            self._disk_bytes += size
+        self._evict_from_disk()
+
+    def get(self, file_id, index):
+        '''
+        :param file_id: ID of a closed file
+        :type file_id: string
+        :param index: Index of the block, i.e. its offset in the file divided by the block size
+        :type index: int
+        :returns: Contents of the block, or None if it is not cached
+        :rtype: bytes
+        '''
+        key = (file_id, index)
+        with self._lock:
+            data = self._memory.pop(key, None)
+            if data is not None:
+                self._memory[key] = data
+                self.hits += 1
+                return data
+            on_disk = key in self._disk
+        if on_disk:
+            try:
+                with open(self._block_path(key), 'rb') as fh:
+                    data = fh.read()
+            except (IOError, OSError):
+                # Evicted by another process
+                data = None
+        with self._lock:
+            if data is None:
+                self._disk_bytes -= self._disk.pop(key, 0)
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._put(key, data)
+        return data
+
+    def put(self, file_id, index, data):
+        '''
+        :param data: Contents of the block; all blocks but the last one of the file are expected to be *block_size* bytes long
+        :type data: bytes
+
+        Caches a block, evicting the least recently used ones if needed.
+        '''
+        self._put((file_id, index), bytes(data))
+
+    def _put(self, key, data):
+        evicted = []
+        with self._lock:
+            if key in self._memory:
+                self._memory_bytes -= len(self._memory.pop(key))
+            self._memory[key] = data
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.memory_limit and self._memory:
+                evicted_key, evicted_data = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted_data)
+                evicted.append((evicted_key, evicted_data))
+        if self.disk_dir is not None:
+            for evicted_key, evicted_data in evicted:
+                self._write_to_disk(evicted_key, evicted_data)
+
+    def _write_to_disk(self, key, data):
+        with self._lock:
+            if key in self._disk:
+                self._disk[key] = self._disk.pop(key)
+                return
+        path = self._block_path(key)
+        tmp_path = "{}.{}.{}".format(path, os.getpid(), threading.current_thread().ident)
+        try:
+            with open(tmp_path, 'wb') as fh:
+                fh.write(data)
+            os.rename(tmp_path, path)
+        except (IOError, OSError):
+            # The disk tier is best-effort, e.g. if the disk is full
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            if key not in self._disk:
+                self._disk[key] = len(data)
+                self._disk_bytes += len(data)
+                self._evict_from_disk()
+
+    def _evict_from_disk(self):
+        # Called with the lock held
+        while self.disk_limit is not None and self._disk_bytes > self.disk_limit and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                os.unlink(self._block_path(key))
+            except OSError:
+                # Already evicted by another process
+                pass
+
+    def clear(self):
+        '''
+        Discards the blocks kept in memory. Blocks on disk are kept.
+        '''
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def snapshot(self):
+        '''
+        :returns: Number of blocks and bytes cached in memory and on disk, and numbers of hits and misses
+        :rtype: dict
+        '''
+        with self._lock:
+            return {"memory_blocks": len(self._memory), "memory_bytes": self._memory_bytes,
+                    "disk_blocks": len(self._disk), "disk_bytes": self._disk_bytes,
+                    "hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses}
@@ -0,0 +1,98 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Recyclable buffers for uploads, within a hard memory limit.
+
+:class:`dxpy.DXFile` accumulates the data of each part it uploads from
+:meth:`~dxpy.DXFile.write` (or, for uploads from pipes, reads it) into a
+buffer taken from a :class:`BufferPool`, and returns the buffer to the
+pool once the part has been uploaded. The pool allocates new buffers only
+while the total size of its buffers is within its memory limit; past it,
+writing blocks until an upload completes and frees a buffer. The memory
+used by an upload is therefore bounded by the limit, whatever the number
+of upload threads and the part size, and buffers are reused rather than
+reallocated for each part.
+
+The limit is set by the environment variable ``DX_UPLOAD_MEMORY_LIMIT``
+(in bytes). By default, it allows for one part per upload thread, plus
+two: one being hashed and one being filled.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import threading
+
+
+class BufferPool(object):
+    '''
+    :param buffer_size: Size of the buffers handed out, in bytes; may be changed later
+    :type buffer_size: int
+    :param memory_limit: Largest total size of the buffers allocated, in bytes
+    :type memory_limit: int
+    :param num_buffers: If *memory_limit* is None, the limit is this many buffers
+    :type num_buffers: int
+
+    Thread-safe. A single buffer is allocated even if it exceeds the
+    memory limit, so that a pool never blocks forever.
+    '''
+    def __init__(self, buffer_size, memory_limit=None, num_buffers=2):
+        self.buffer_size = buffer_size
+        self.memory_limit = memory_limit
+        self.num_buffers = num_buffers
+        self._cond = threading.Condition()
+        self._free = []
+        self._allocated_bytes = 0
+        self.num_waits = 0
+
+    def acquire(self):
+        '''
+        :returns: A buffer of at least *buffer_size* bytes, blocking until one can be allocated or is released
+        :rtype: bytearray
+        '''
+        with self._cond:
+            while True:
+                while self._free:
+                    buf = self._free.pop()
+                    if len(buf) >= self.buffer_size:
+                        return buf
+                    # Too small since the buffer size was increased
+                    self._allocated_bytes -= len(buf)
+                memory_limit = self.memory_limit
+                if memory_limit is None:
+                    memory_limit = self.num_buffers * self.buffer_size
+                if self._allocated_bytes == 0 or self._allocated_bytes + self.buffer_size <= memory_limit:
+                    self._allocated_bytes += self.buffer_size
+                    return bytearray(self.buffer_size)
+                self.num_waits += 1
+                self._cond.wait()
+
+    def release(self, buf):
+        '''
+        Returns a buffer obtained from :meth:`acquire` to the pool.
+        '''
+        with self._cond:
+            self._free.append(buf)
+            self._cond.notify()
+
+    def snapshot(self):
+        '''
+        :returns: Total size of the buffers allocated, number of them free, and number of times acquire() blocked
+        :rtype: dict
+        '''
+        with self._cond:
+            return {"allocated_bytes": self._allocated_bytes, "free_buffers": len(self._free),
+                    "waits": self.num_waits}
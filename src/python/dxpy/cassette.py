@@ -0,0 +1,282 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Recording of HTTP traffic for offline replay.
+
+If the environment variable ``DX_RECORD_CASSETTE`` is set to a file name,
+:func:`dxpy.DXHTTPRequest` appends every request attempt it makes, and the
+response received, to that file (the "cassette"). The cassette can then
+be served by ``test/mock_api/replay.py``, so that client-side performance
+can be measured and compared without access to the platform, e.g.::
+
+    $ DX_RECORD_CASSETTE=download.jsonl dx download -r project-xxxx:/reads
+    $ test/mock_api/replay.py --cassette download.jsonl --port 5000 &
+    $ DX_APISERVER_HOST=localhost DX_APISERVER_PORT=5000 DX_APISERVER_PROTOCOL=http \\
+          dx download -r project-xxxx:/reads
+
+The cassette has one JSON object per line, for each request attempt:
+
+* ``method``, ``url``, ``range`` (the Range header, if any), and ``api``
+  (whether the request was made to the API server)
+* ``request_json`` (the request body, if it is JSON), or
+  ``request_size`` and ``request_md5``
+* ``status``, ``headers``, and ``body`` (the response body, if it is
+  text), or ``body_file`` (name of a file holding the body, in the
+  directory named like the cassette with ``.bodies`` appended)
+* ``started`` and ``latency``: the time the request was sent, relative to
+  the first request recorded, and the time it took, in seconds
+
+Authorization headers are not recorded. The response bodies of downloads
+are recorded in full, and stored once per distinct content.
+:class:`CassettePlayer` looks up the recorded response for a request.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import hashlib, io, json, os, threading, time
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
+from requests.packages import urllib3
+
+# Response headers that describe the encoding of the body on the wire,
+# rather than the body itself
+_TRANSPORT_HEADERS = {'content-length', 'content-encoding', 'transfer-encoding', 'connection', 'keep-alive'}
+
+REPLAY_PREFIX = '/_replay'
+
+
+def _body_dir(path):
+    return path + '.bodies'
+
+
+def _decode_json(data):
+    if isinstance(data, bytes):
+        try:
+            data = data.decode('utf-8')
+        except UnicodeDecodeError:
+            return False, None
+    try:
+        return True, json.loads(data)
+    except ValueError:
+        return False, None
+
+
+def _request_fingerprint(method, path, range_header, body_json=None, body_md5=None):
+    if body_json is not None:
+        body = json.dumps(body_json, sort_keys=True)
+    else:
+        body = body_md5
+    return (method, path, range_header, body)
+
+
+def replayable_response(response):
+    '''
+    :param response: Response whose body has been read in full
+    :type response: :class:`urllib3.response.HTTPResponse`
+    :returns: Detached copy of *response*, whose (decoded) body can be read again, e.g. with :meth:`stream`
+    :rtype: :class:`urllib3.response.HTTPResponse`
+    '''
+    headers = {name: value for name, value in response.headers.items() if name.lower() not in _TRANSPORT_HEADERS}
+    return urllib3.HTTPResponse(body=io.BytesIO(response.data), headers=headers, status=response.status,
+                                reason=response.reason, preload_content=False)
+
+
+class CassetteRecorder(object):
+    '''
+    :param path: Name of the cassette file; interactions are appended to it
+    :type path: string
+
+    Thread-safe writer of cassettes.
+    '''
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._started = None
+
+    def _write_body_file(self, data):
+        name = hashlib.md5(data).hexdigest()
+        body_dir = _body_dir(self.path)
+        body_path = os.path.join(body_dir, name)
+        if not os.path.exists(body_path):
+            if not os.path.isdir(body_dir):
+                try:
+                    os.makedirs(body_dir)
+                except OSError:
+                    if not os.path.isdir(body_dir):
+                        raise
+            tmp_path = "{}.{}.{}".format(body_path, os.getpid(), threading.current_thread().ident)
+            with open(tmp_path, 'wb') as fh:
+                fh.write(data)
+            os.rename(tmp_path, body_path)
+        return name
+
+    def record(self, method, url, headers, body, response, time_sent, api=True):
+        '''
+        :param headers: Request headers; only the Range header is recorded
+        :type headers: dict
+        :param body: Request body, as sent
+        :type body: bytes or string
+        :param response: Response received, with its body read in full
+        :type response: :class:`urllib3.response.HTTPResponse`
+        :param time_sent: Time the request was sent, as returned by :func:`time.time`
+        :type time_sent: float
+        :param api: True if the request was made to the API server
+        :type api: boolean
+        '''
+        latency = time.time() - time_sent
+        interaction = {"method": method, "url": url, "range": headers.get('Range'), "api": api}
+
+        if isinstance(body, (bytes, type(''))):
+            is_json, body_json = _decode_json(body) if body else (False, None)
+            if is_json:
+                interaction["request_json"] = body_json
+            else:
+                data = body.encode('utf-8') if not isinstance(body, bytes) else body
+                interaction["request_size"] = len(data)
+                interaction["request_md5"] = hashlib.md5(data).hexdigest()
+
+        interaction["status"] = response.status
+        interaction["headers"] = {name.lower(): value for name, value in response.headers.items()
+                                  if name.lower() not in _TRANSPORT_HEADERS}
+        data = response.data or b''
+        content_type = response.headers.get('content-type', '')
+        text = None
+        if content_type.startswith('application/json') or content_type.startswith('text/'):
+            try:
+                text = data.decode('utf-8')
+            except UnicodeDecodeError:
+                pass
+        if text is not None:
+            interaction["body"] = text
+        else:
+            interaction["body_file"] = self._write_body_file(data)
+
+        with self._lock:
+            if self._started is None:
+                self._started = time_sent
+            interaction["started"] = time_sent - self._started
+            interaction["latency"] = latency
+            with io.open(self.path, 'a', encoding='utf-8') as fh:
+                fh.write('{}\n'.format(json.dumps(interaction, sort_keys=True)))
+
+
+def load_cassette(path):
+    '''
+    :param path: Name of a cassette file
+    :type path: string
+    :returns: Recorded interactions, in the order in which they were recorded
+    :rtype: list of dicts
+    '''
+    with io.open(path, encoding='utf-8') as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+class CassettePlayer(object):
+    '''
+    :param path: Name of a cassette file
+    :type path: string
+
+    Looks up the recorded responses to requests made to a replay server.
+    Requests to the API server are expected at their original path; those
+    to other hosts at ``/_replay/<scheme>/<host>/<path>``, which is where
+    URLs in the response bodies served by :meth:`response_body` point.
+
+    A request is matched by its method, path, Range header, and body. If
+    the body does not match any recorded request (e.g. because it contains
+    a random nonce), the request is matched by the rest. If several
+    responses were recorded for a request, they are served in turn, and
+    the last one again once all have been served.
+    '''
+    def __init__(self, path):
+        self.path = path
+        self.interactions = load_cassette(path)
+        self._lock = threading.Lock()
+        self._by_fingerprint = {}
+        self._by_path = {}
+        self._next_index = {}
+        self.external_origins = set()
+        for interaction in self.interactions:
+            url_info = urlsplit(interaction["url"])
+            if not interaction["api"]:
+                self.external_origins.add("{}://{}".format(url_info.scheme, url_info.netloc))
+            path = self.replay_path(interaction)
+            fingerprint = _request_fingerprint(interaction["method"], path, interaction.get("range"),
+                                               body_json=interaction.get("request_json"),
+                                               body_md5=interaction.get("request_md5"))
+            self._by_fingerprint.setdefault(fingerprint, []).append(interaction)
+            self._by_path.setdefault((interaction["method"], path, interaction.get("range")), []).append(interaction)
+
+    @staticmethod
+    def replay_path(interaction):
+        '''
+        :returns: Path (and query string) at which a replay server expects the request of *interaction*
+        :rtype: string
+        '''
+        url_info = urlsplit(interaction["url"])
+        path = url_info.path or '/'
+        if url_info.query:
+            path += '?' + url_info.query
+        if interaction["api"]:
+            return path
+        return "{}/{}/{}{}".format(REPLAY_PREFIX, url_info.scheme, url_info.netloc, path)
+
+    def _next(self, key, candidates):
+        index = self._next_index.get(key, 0)
+        self._next_index[key] = index + 1
+        return candidates[min(index, len(candidates) - 1)]
+
+    def find(self, method, path, body, range_header=None):
+        '''
+        :param path: Path and query string of the request
+        :type path: string
+        :param body: Request body
+        :type body: bytes
+        :returns: The recorded interaction to replay, or None if no request like this one was recorded
+        :rtype: dict
+        '''
+        method = method.upper()
+        is_json, body_json = _decode_json(body) if body else (False, None)
+        fingerprint = _request_fingerprint(method, path, range_header,
+                                           body_json=body_json if is_json else None,
+                                           body_md5=hashlib.md5(body or b'').hexdigest() if not is_json else None)
+        with self._lock:
+            if fingerprint in self._by_fingerprint:
+                return self._next(fingerprint, self._by_fingerprint[fingerprint])
+            path_key = (method, path, range_header)
+            if path_key in self._by_path:
+                return self._next(path_key, self._by_path[path_key])
+        return None
+
+    def response_body(self, interaction, base_url):
+        '''
+        :param base_url: Root URL of the replay server, e.g. "http://localhost:5000"
+        :type base_url: string
+        :returns: Recorded response body, with URLs of other hosts redirected to the replay server
+        :rtype: bytes
+        '''
+        if "body_file" in interaction:
+            with open(os.path.join(_body_dir(self.path), interaction["body_file"]), 'rb') as fh:
+                return fh.read()
+        body = interaction["body"]
+        for origin in self.external_origins:
+            scheme, netloc = origin.split('://', 1)
+            body = body.replace(origin, "{}{}/{}/{}".format(base_url.rstrip('/'), REPLAY_PREFIX, scheme, netloc))
+        return body.encode('utf-8')
@@ -21,6 +21,8 @@ almost exclusively by command-line tools such as dx.
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
+import atexit
+import os
 import sys
 
 INTERACTIVE_CLI = True if sys.stdin.isatty() and sys.stdout.isatty() else False
@@ -37,6 +39,39 @@ def try_call(func, *args, **kwargs):
     except:
         try_call_err_exit()
 
+_exit_hooks = []
+
+def register_exit_hook(func):
+    '''
+    Registers *func* to be called when the interpreter exits, as
+    :func:`atexit.register` does, and also when
+    :func:`err_exit_abandoning_futures` exits.
+    '''
+    _exit_hooks.append(func)
+    atexit.register(func)
+
+def err_exit_abandoning_futures(futures):
+    '''
+    Cancels the *futures* that have not started, and exits as
+    :func:`~dxpy.exceptions.err_exit` does, without waiting for those that
+    are running. The interpreter would otherwise join the threads running
+    them before exiting. The atexit handlers are skipped too, so only those
+    registered with :func:`register_exit_hook` are called.
+    '''
+    for future in futures:
+        future.cancel()
+    try:
+        err_exit()
+    except SystemExit as e:
+        for func in _exit_hooks:
+            try:
+                func()
+            except Exception:
+                pass
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(e.code if isinstance(e.code, int) else 1)
+
 def prompt_for_yn(prompt_str, default=None):
     if default == True:
         prompt = prompt_str + ' [Y/n]: '
@@ -24,24 +24,36 @@ import sys
 import collections
 import dxpy
 from ..utils.resolver import (resolve_existing_path, get_first_pos_of_char, is_project_explicit,
-                              object_exists_in_project, is_jbor_str)
+                              any_object_exists_in_project, is_jbor_str)
 from ..exceptions import err_exit
-from . import try_call
+from . import try_call, err_exit_abandoning_futures
 from dxpy.utils.printing import (fill)
-from dxpy.utils import pathmatch
+from dxpy.utils import pathmatch, get_futures_threadpool, wait_for_a_future
 
+# Number of files downloaded at once by default; see _run_downloads
+DEFAULT_PARALLEL_FILES = 8
 
-def download_one_file(project, file_desc, dest_filename, args):
+
+def _check_download(file_desc, dest_filename, args):
+    # Returns whether the file should be downloaded, and exits if it
+    # would overwrite a local file without -f/--overwrite
     if not args.overwrite:
         if os.path.exists(dest_filename):
             err_exit(fill('Error: path "' + dest_filename + '" already exists but -f/--overwrite was not set'))
 
     if file_desc['class'] != 'file':
         print("Skipping non-file data object {name} ({id})".format(**file_desc), file=sys.stderr)
-        return
+        return False
 
     if file_desc['state'] != 'closed':
         print("Skipping file {name} ({id}) because it is not closed".format(**file_desc), file=sys.stderr)
+        return False
+
+    return True
+
+
+def download_one_file(project, file_desc, dest_filename, args):
+    if not _check_download(file_desc, dest_filename, args):
         return
 
     try:
@@ -50,11 +62,65 @@ def download_one_file(project, file_desc, dest_filename, args):
         show_progress = False
 
     try:
-        dxpy.download_dxfile(file_desc['id'], dest_filename, show_progress=show_progress, project=project)
+        dxpy.download_dxfile(file_desc['id'], dest_filename, show_progress=show_progress, project=project,
+                             describe_output=file_desc)
     except:
         err_exit()
 
 
+def _run_downloads(downloads, args):
+    '''
+    :param downloads: (project, file description, local filename) of each file to download
+    :type downloads: list of tuples
+
+    Downloads the files, up to args.parallel_files of them at once, or one
+    at a time if two of them would be downloaded to the same local path.
+    Exits as soon as one fails, abandoning the downloads still running.
+
+    All files share the process-wide thread pool in which DXFile makes
+    its ranged requests, which bounds the number of requests in flight
+    whatever the number of files. The largest files are started first,
+    so that their chunks are spread over the whole transfer rather than
+    left to the end, while small files, each of which takes a single
+    request, fill the remaining slots many at a time.
+    '''
+    downloads = [(project, file_desc, dest_filename) for project, file_desc, dest_filename in downloads
+                 if _check_download(file_desc, dest_filename, args)]
+    # Files downloaded to the same path at once would be interleaved; one
+    # at a time, each overwrites the previous one (with -f), as before
+    num_dest_paths = len(set(os.path.abspath(dest_filename) for _project, _file_desc, dest_filename in downloads))
+    parallel_files = getattr(args, 'parallel_files', None) or 1
+    if parallel_files == 1 or len(downloads) <= 1 or num_dest_paths < len(downloads):
+        for project, file_desc, dest_filename in downloads:
+            download_one_file(project, file_desc, dest_filename, args)
+        return
+
+    downloads.sort(key=lambda download: -download[1].get('size', 0))
+    show_progress = getattr(args, 'show_progress', False)
+    pool = get_futures_threadpool(max_workers=parallel_files)
+    futures, num_done = set(), 0
+    try:
+        for project, file_desc, dest_filename in downloads:
+            # Per-file progress bars would be interleaved; progress is
+            # reported as the number of files completed instead
+            futures.add(pool.submit(dxpy.download_dxfile, file_desc['id'], dest_filename, show_progress=False,
+                                    project=project, describe_output=file_desc))
+        while futures:
+            future = wait_for_a_future(futures)
+            futures.remove(future)
+            future.result()
+            num_done += 1
+            if show_progress:
+                sys.stderr.write("\rDownloaded {} of {} files".format(num_done, len(downloads)))
+                sys.stderr.flush()
+    except:
+        err_exit_abandoning_futures(futures)
+    finally:
+        pool.shutdown(wait=False)
+    if show_progress:
+        sys.stderr.write("\n")
+
+
 def _ensure_local_dir(d):
     if not os.path.isdir(d):
         if os.path.exists(d):
@@ -75,7 +141,7 @@ def _list_subfolders(project, path, cached_folder_lists, recurse=True):
         return (f for f in cached_folder_lists[project] if f.startswith(path) and '/' not in f[len(path)+1:])
 
 
-def _download_one_folder(project, folder, strip_prefix, destdir, cached_folder_lists, args):
+def _download_one_folder(project, folder, strip_prefix, destdir, cached_folder_lists, args, downloads):
     assert(folder.startswith(strip_prefix))
     if not args.recursive:
         err_exit('Error: "' + folder + '" is a folder but the -r/--recursive option was not given')
@@ -84,11 +150,13 @@ def _download_one_folder(project, folder, strip_prefix, destdir, cached_folder_l
         _ensure_local_dir(os.path.join(destdir, subfolder[len(strip_prefix):].lstrip('/')))
 
     # TODO: control visibility=hidden
+    # The parts are described along with the files, so that the files
+    # need not be described again to be downloaded
     for f in dxpy.search.find_data_objects(classname='file', state='closed', project=project, folder=folder,
-                                           recurse=True, describe=True):
+                                           recurse=True, describe={"defaultFields": True, "fields": {"parts": True}}):
         file_desc = f['describe']
         dest_filename = os.path.join(destdir, file_desc['folder'][len(strip_prefix):].lstrip('/'), file_desc['name'])
-        download_one_file(project, file_desc, dest_filename, args)
+        downloads.append((project, file_desc, dest_filename))
 
 
 def _is_glob(path):
@@ -106,22 +174,25 @@ def _rel2abs(path, project):
     return abs_path, strip_prefix
 
 
-def _download_files(files, destdir, args, dest_filename=None):
+def _download_files(files, destdir, args, downloads, dest_filename=None):
     for project in files:
         for f in files[project]:
             file_desc = f['describe']
             dest = dest_filename or os.path.join(destdir, file_desc['name'].replace('/', '%2F'))
-            download_one_file(project, file_desc, dest, args)
+            downloads.append((project, file_desc, dest))
 
 
-def _download_folders(folders, destdir, cached_folder_lists, args):
+def _download_folders(folders, destdir, cached_folder_lists, args, downloads):
     for project in folders:
         for folder, strip_prefix in folders[project]:
-            _download_one_folder(project, folder, strip_prefix, destdir, cached_folder_lists, args)
+            _download_one_folder(project, folder, strip_prefix, destdir, cached_folder_lists, args, downloads)
 
 
 # Main entry point.
 def download(args):
+    if getattr(args, 'cache_dir', None):
+        dxpy.set_download_cache(args.cache_dir, link="hardlink" if args.cache_hardlink else "auto")
+
     # Get space for caching subfolders
     cached_folder_lists = {}
 
@@ -176,8 +247,11 @@ def download(args):
         #
         # If length of matching_files is 0 then we're only downloading folders
         # so skip this logic since the files will be verified in the API call.
+        # The descriptions of the matches already show whether they were
+        # found in the project; only the others are checked, in batches.
         if len(matching_files) > 0 and path_has_explicit_proj and not \
-                any(object_exists_in_project(f['describe']['id'], project) for f in matching_files):
+                any(f['describe'].get('project') == project for f in matching_files) and not \
+                any_object_exists_in_project([f['describe']['id'] for f in matching_files], project):
             err_exit(fill('Error: specified project does not contain specified file object'))
 
         files_to_get[project].extend(matching_files)
@@ -208,5 +282,8 @@ def download(args):
     else:
         destdir, dest_filename = os.getcwd(), args.output
 
-    _download_folders(folders_to_get, destdir, cached_folder_lists, args)
-    _download_files(files_to_get, destdir, args, dest_filename=dest_filename)
+    # The files in all folders and paths are downloaded together
+    downloads = []
+    _download_folders(folders_to_get, destdir, cached_folder_lists, args, downloads)
+    _download_files(files_to_get, destdir, args, downloads, dest_filename=dest_filename)
+    _run_downloads(downloads, args)
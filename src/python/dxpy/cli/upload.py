@@ -0,0 +1,165 @@
+# Copyright (C) 2014-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+This module handles recursive uploads of directories for the dx command-line client.
+'''
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import os
+import sys
+import json
+import dxpy
+from ..exceptions import err_exit
+from . import err_exit_abandoning_futures
+from ..upload_manifest import default_manifest_path
+from ..compat import open
+from dxpy.utils import get_futures_threadpool, wait_for_a_future
+
+# Real paths of the directories uploaded so far, to detect loops through symlinks
+upload_seen_paths = set()
+
+
+def upload_local_file_from_args(args, filename, project, folder, name, parents, show_progress):
+    '''
+    :returns: The file uploaded from *filename*, with the metadata given in *args*, to *project*:*folder*/*name*
+    :rtype: :class:`~dxpy.bindings.dxfile.DXFile`
+    '''
+    resume_manifest = None
+    if args.resume:
+        resume_manifest = default_manifest_path(dxpy.config.get_user_conf_dir(), filename, project, folder, name)
+    return dxpy.upload_local_file(filename=filename,
+                                  name=name,
+                                  tags=args.tags,
+                                  types=args.types,
+                                  hidden=args.hidden,
+                                  project=project,
+                                  properties=args.properties,
+                                  details=args.details,
+                                  folder=folder,
+                                  parents=parents,
+                                  show_progress=show_progress,
+                                  resume_manifest=resume_manifest)
+
+
+def _collect_directory(dirname, folder, files, folders):
+    # Appends to *files* the (local path, remote folder) of each file
+    # under *dirname*, which is uploaded into *folder*, and to *folders*
+    # the remote folders of the empty directories
+    norm_path = os.path.realpath(dirname)
+    if norm_path in upload_seen_paths:
+        print("Skipping {f}: directory loop".format(f=dirname), file=sys.stderr)
+        return
+    upload_seen_paths.add(norm_path)
+
+    subfolder = os.path.join(folder, os.path.basename(dirname))
+    dir_listing = os.listdir(dirname)
+    if len(dir_listing) == 0:
+        folders.append(subfolder)
+    for f in dir_listing:
+        path = os.path.join(dirname, f)
+        if os.path.isdir(path):
+            _collect_directory(path, subfolder, files, folders)
+        else:
+            files.append((path, subfolder))
+
+
+def _leaf_folders(folders):
+    # The folders that are not ancestors of others; creating them with
+    # "parents" creates all the others. The root folder always exists.
+    folders = sorted(set(folder.rstrip('/') for folder in folders) - {''})
+    return [folder for i, folder in enumerate(folders)
+            if i + 1 == len(folders) or not folders[i + 1].startswith(folder + '/')]
+
+
+def upload_directory(args, project, folder):
+    '''
+    :returns: Records of the files uploaded, with their local paths and IDs
+    :rtype: list of dicts
+
+    Uploads the directory *args.filename* recursively into *project*:*folder*.
+
+    The directory tree is listed first. The folders it needs are then
+    created, one request per leaf folder, and the files are uploaded, up
+    to *args.parallel_files* at once, largest first. The parts of all files
+    share the process-wide thread pool in which DXFile uploads parts. Each
+    file is closed, without waiting, as soon as it has been uploaded, so
+    that closing overlaps with the uploads of the next files; with
+    *args.wait*, the files are waited on once all have been uploaded. The
+    files are neither described nor printed, except for their IDs with
+    *args.brief*. If an upload fails, exits without waiting for the
+    uploads still running.
+    '''
+    files, folders = [], []
+    _collect_directory(args.filename, folder, files, folders)
+    parallel_files = getattr(args, 'parallel_files', None) or 1
+    try:
+        # Fails, like the upload would, on files that cannot be read
+        if parallel_files > 1:
+            files.sort(key=lambda upload: -os.path.getsize(upload[0]))
+        for leaf_folder in _leaf_folders(folders + [subfolder for _path, subfolder in files]):
+            dxpy.api.project_new_folder(project, {"folder": leaf_folder, "parents": True})
+    except:
+        err_exit()
+
+    # Per-file progress bars would be interleaved; progress is reported
+    # as the number of files completed instead
+    show_file_progress = args.show_progress and (parallel_files == 1 or len(files) <= 1)
+    show_progress = args.show_progress and not show_file_progress
+
+    pool = get_futures_threadpool(max_workers=parallel_files)
+    futures, uploaded = {}, []
+    try:
+        for path, subfolder in files:
+            future = pool.submit(upload_local_file_from_args, args, path, project, subfolder, os.path.basename(path),
+                                 True, show_file_progress)
+            futures[future] = path
+        while futures:
+            future = wait_for_a_future(futures)
+            path = futures.pop(future)
+            dxfile = future.result()
+            uploaded.append((path, dxfile))
+            if args.brief:
+                print(dxfile.get_id())
+            elif show_progress:
+                sys.stderr.write("\rUploaded {} of {} files".format(len(uploaded), len(files)))
+                sys.stderr.flush()
+        if show_progress and not args.brief:
+            sys.stderr.write("\n")
+        if args.wait:
+            for _path, dxfile in uploaded:
+                dxfile._wait_on_close()
+    except:
+        err_exit_abandoning_futures(futures)
+    finally:
+        pool.shutdown(wait=False)
+    return [manifest_record(local_path, uploaded_file) for local_path, uploaded_file in uploaded]
+
+
+def manifest_record(path, dxfile):
+    '''
+    :returns: Entry of the manifest written with --manifest for the upload of *path* to *dxfile*
+    :rtype: dict
+    '''
+    return {"path": path, "id": dxfile.get_id(), "project": dxfile.get_proj_id()}
+
+
+def write_manifest(filename, records):
+    '''
+    Writes the manifest of the files uploaded, as a JSON array, to the local file *filename*.
+    '''
+    with open(filename, 'wb') as fh:
+        fh.write((json.dumps(records, indent=4) + '\n').encode('utf-8'))
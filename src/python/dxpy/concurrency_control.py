@@ -0,0 +1,218 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Process-wide adaptive concurrency control for :func:`dxpy.DXHTTPRequest`.
+
+Every request attempt passes through the limiter of the host it is sent
+to, which bounds the number of requests in flight to that host, across
+all threads (e.g. the DXFile and DXGTable thread pools, or tasks run by
+:func:`dxpy.utils.response_iterator`).
+
+The limit is adjusted with additive increase, multiplicative decrease
+(AIMD), like TCP congestion control:
+
+* A 503 response halves the limit. If the limit is already at its
+  minimum, i.e. reducing concurrency has not helped, all requests to the
+  host are held back until the Retry-After period of the response has
+  passed. (The request that received the 503 always waits for that long
+  before it is retried.)
+* If the latency of small requests rises well above its long-term
+  average, the limit is reduced by a smaller factor.
+* Each successful request increases the limit by 1/limit, i.e. by about
+  one for every *limit* requests, up to the maximum.
+
+Only requests sent after the limit was last reduced can reduce it again,
+so that a burst of 503s received for requests that were in flight
+together counts as a single overload signal.
+
+The limits are off by default, as they apply to every host, including the
+storage hosts that serve file parts, whose latency varies with transfer
+load, and can cut concurrency to 1 on latency alone. Set the environment
+variable ``DX_ADAPTIVE_CONCURRENCY`` to ``1`` to turn them on.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import threading, time
+
+DEFAULT_MIN_CONCURRENCY = 1
+DEFAULT_MAX_CONCURRENCY = 128
+OVERLOAD_DECREASE_FACTOR = 0.5
+LATENCY_DECREASE_FACTOR = 0.9
+
+# A request is considered slow when the short-term latency average exceeds
+# the long-term one by this factor
+LATENCY_TOLERANCE = 2.0
+# Only requests with request and response bodies below this size are used
+# as latency samples; for larger ones latency is dominated by transfer time
+MAX_LATENCY_SAMPLE_BYTES = 64 * 1024
+MIN_LATENCY_SAMPLES = 20
+
+_SHORT_TERM_WEIGHT = 0.2
+_LONG_TERM_WEIGHT = 0.01
+# Maximum time to block in a single wait, so that waiting threads remain
+# responsive to KeyboardInterrupt on Python 2
+_MAX_WAIT = 1.0
+
+
+class AdaptiveConcurrencyLimiter(object):
+    '''
+    :param min_limit: Lowest number of requests in flight that is always permitted
+    :type min_limit: int
+    :param max_limit: Highest number of requests in flight that is ever permitted
+    :type max_limit: int
+
+    Bounds the number of concurrent requests to a single host, adjusting
+    the bound according to the responses received.
+    '''
+    def __init__(self, min_limit=DEFAULT_MIN_CONCURRENCY, max_limit=DEFAULT_MAX_CONCURRENCY):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self._limit = float(max_limit)
+        self._in_flight = 0
+        self._paused_until = 0
+        self._last_decrease = 0
+        self._latency_short_term = None
+        self._latency_long_term = None
+        self._num_latency_samples = 0
+        self._num_overloads = 0
+        self._cond = threading.Condition(threading.Lock())
+
+    @property
+    def limit(self):
+        '''
+        Number of requests currently permitted to be in flight
+        '''
+        return int(self._limit)
+
+    def acquire(self):
+        '''
+        :returns: Time spent waiting, in seconds
+        :rtype: float
+
+        Blocks until a request to the host is permitted. The caller must
+        call :meth:`release` once the request has completed.
+        '''
+        started = None
+        with self._cond:
+            while True:
+                now = time.time()
+                if now < self._paused_until:
+                    wait_time = self._paused_until - now
+                elif self._in_flight < int(self._limit):
+                    break
+                else:
+                    wait_time = _MAX_WAIT
+                if started is None:
+                    started = now
+                self._cond.wait(min(wait_time, _MAX_WAIT))
+            self._in_flight += 1
+        return 0.0 if started is None else time.time() - started
+
+    def release(self, sent_at, overloaded=False, retry_after=None, latency=None):
+        '''
+        :param sent_at: Time at which the request was sent, as returned by :func:`time.time`
+        :type sent_at: float
+        :param overloaded: True if the server reported that it is overloaded (e.g. a 503 response)
+        :type overloaded: boolean
+        :param retry_after: Time, in seconds, the server asked clients to wait before retrying
+        :type retry_after: float
+        :param latency: Duration of the request, in seconds, if it is to be used as a latency sample
+        :type latency: float
+
+        Records the completion of a request permitted by :meth:`acquire`.
+        Requests that failed for other reasons (e.g. network errors)
+        should be released with *sent_at* only.
+        '''
+        with self._cond:
+            self._in_flight -= 1
+            now = time.time()
+            if overloaded:
+                self._num_overloads += 1
+                if retry_after and self._limit <= self.min_limit:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+                self._decrease(OVERLOAD_DECREASE_FACTOR, sent_at, now)
+            elif latency is not None and self._is_slow(latency):
+                self._decrease(LATENCY_DECREASE_FACTOR, sent_at, now)
+            else:
+                self._limit = min(self._limit + 1 / self._limit, self.max_limit)
+            self._cond.notify_all()
+
+    def _is_slow(self, latency):
+        if self._latency_short_term is None:
+            self._latency_short_term = self._latency_long_term = latency
+        else:
+            self._latency_short_term += _SHORT_TERM_WEIGHT * (latency - self._latency_short_term)
+            self._latency_long_term += _LONG_TERM_WEIGHT * (latency - self._latency_long_term)
+        self._num_latency_samples += 1
+        return self._num_latency_samples >= MIN_LATENCY_SAMPLES and \
+            self._latency_short_term > LATENCY_TOLERANCE * self._latency_long_term
+
+    def _decrease(self, factor, sent_at, now):
+        if sent_at >= self._last_decrease:
+            self._limit = max(self._limit * factor, self.min_limit)
+            self._last_decrease = now
+
+    def snapshot(self):
+        '''
+        :returns: Current limit, requests in flight, overload signals seen, and remaining pause
+        :rtype: dict
+        '''
+        with self._cond:
+            return {"limit": int(self._limit),
+                    "in_flight": self._in_flight,
+                    "overloads": self._num_overloads,
+                    "paused_for": max(self._paused_until - time.time(), 0)}
+
+
+class ConcurrencyController(object):
+    '''
+    :param enabled: If False (the default), :meth:`get_limiter` returns None, and requests are not limited
+    :type enabled: boolean
+
+    Process-wide registry of per-host :class:`AdaptiveConcurrencyLimiter`
+    objects.
+    '''
+    def __init__(self, enabled=False, min_limit=DEFAULT_MIN_CONCURRENCY, max_limit=DEFAULT_MAX_CONCURRENCY):
+        self.enabled = enabled
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self._lock = threading.Lock()
+        self._limiters = {}
+
+    def get_limiter(self, pool_key):
+        '''
+        :param pool_key: (scheme, host, port) of the request, see :func:`dxpy.connection_health.get_pool_key`
+        :returns: The limiter for the host, or None if concurrency control is disabled
+        :rtype: :class:`AdaptiveConcurrencyLimiter`
+        '''
+        if not self.enabled:
+            return None
+        with self._lock:
+            limiter = self._limiters.get(pool_key)
+            if limiter is None:
+                limiter = self._limiters[pool_key] = AdaptiveConcurrencyLimiter(self.min_limit, self.max_limit)
+            return limiter
+
+    def snapshot(self):
+        '''
+        :returns: State of the limiter of each host, keyed by "scheme://host:port"
+        :rtype: dict
+        '''
+        with self._lock:
+            limiters = list(self._limiters.items())
+        return {"{}://{}:{}".format(*key): limiter.snapshot() for key, limiter in limiters}
@@ -0,0 +1,166 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Connection health tracking for the shared urllib3 pool manager used by
+:func:`dxpy.DXHTTPRequest`.
+
+Failures are handled at the narrowest scope that is known to be affected:
+
+* A connection that fails at the socket level is closed by urllib3 itself
+  and never returns to the pool.
+* A connection whose response turned out to be unusable (truncated body,
+  unparsable JSON) is closed here, and only that connection.
+* If a host keeps failing at the transport level (its error rate over the
+  last few requests is high), only that host's connection pool is reset.
+  Warm connections to other hosts (e.g. the API server, while S3 is
+  flaky) are kept.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import collections
+import threading
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
+from . import logger
+
+DEFAULT_WINDOW_SIZE = 20
+DEFAULT_MAX_ERROR_RATE = 0.5
+DEFAULT_MIN_ERRORS = 4
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def get_pool_key(url):
+    '''
+    :param url: Fully qualified URL
+    :returns: (scheme, host, port) tuple, as used by urllib3 to key its connection pools
+    '''
+    url_info = urlsplit(url)
+    scheme = (url_info.scheme or 'http').lower()
+    return scheme, (url_info.hostname or '').lower(), url_info.port or _DEFAULT_PORTS.get(scheme)
+
+
+def release_connection(response, evict=False):
+    '''
+    :param response: Response obtained with ``release_conn=False``
+    :type response: urllib3.response.HTTPResponse
+    :param evict: If True, the connection is closed before it is returned to the pool
+    :type evict: boolean
+
+    Returns the connection on which *response* was received to its pool.
+    An evicted connection occupies its pool slot in a closed state, and
+    is transparently reconnected the next time it is handed out. A
+    connection whose response body has not been read in full is always
+    evicted, as it cannot be reused.
+    '''
+    connection = getattr(response, '_connection', None)
+    if (evict or not response.closed) and connection is not None:
+        connection.close()
+    response.release_conn()
+
+
+class _HostStats(object):
+    def __init__(self, window_size):
+        self.outcomes = collections.deque(maxlen=window_size)
+        self.requests, self.errors, self.pool_resets = 0, 0, 0
+
+
+class ConnectionHealthTracker(object):
+    '''
+    :param window_size: Number of most recent requests per host used to compute the error rate
+    :type window_size: int
+    :param max_error_rate: Error rate above which the host's connection pool is reset
+    :type max_error_rate: float
+    :param min_errors: Minimum number of errors in the window before the pool is reset
+    :type min_errors: int
+
+    Records the transport-level outcome of each request, per
+    (scheme, host, port), and decides when a host's pool should be
+    reset.
+    '''
+    def __init__(self, window_size=DEFAULT_WINDOW_SIZE, max_error_rate=DEFAULT_MAX_ERROR_RATE,
+                 min_errors=DEFAULT_MIN_ERRORS):
+        self.window_size = window_size
+        self.max_error_rate = max_error_rate
+        self.min_errors = min_errors
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def record(self, pool_key, ok):
+        '''
+        :param pool_key: (scheme, host, port) of the request, see :func:`get_pool_key`
+        :param ok: False if the request failed at the transport level
+        :type ok: boolean
+        :returns: True if the host's pool should now be reset
+        :rtype: boolean
+        '''
+        with self._lock:
+            stats = self._hosts.get(pool_key)
+            if stats is None:
+                stats = self._hosts[pool_key] = _HostStats(self.window_size)
+            stats.requests += 1
+            stats.outcomes.append(ok)
+            if ok:
+                return False
+            stats.errors += 1
+            num_errors = stats.outcomes.count(False)
+            if num_errors >= self.min_errors and num_errors > self.max_error_rate * len(stats.outcomes):
+                # Start over, so that the reset pool gets a fresh chance
+                stats.outcomes.clear()
+                stats.pool_resets += 1
+                return True
+            return False
+
+    def error_rate(self, pool_key):
+        '''
+        :returns: Fraction of the recent requests to the host that failed
+        :rtype: float
+        '''
+        with self._lock:
+            stats = self._hosts.get(pool_key)
+            if stats is None or len(stats.outcomes) == 0:
+                return 0.0
+            return stats.outcomes.count(False) / len(stats.outcomes)
+
+    def snapshot(self):
+        '''
+        :returns: Per-host counters, keyed by "scheme://host:port"
+        :rtype: dict
+        '''
+        with self._lock:
+            return {"{}://{}:{}".format(*key): {"requests": stats.requests,
+                                                "errors": stats.errors,
+                                                "pool_resets": stats.pool_resets}
+                    for key, stats in self._hosts.items()}
+
+
+def reset_host_pool(pool_manager, pool_key):
+    '''
+    Closes and forgets the connection pool for a single host. Idle
+    connections are closed immediately; in-flight ones are discarded
+    when they are released.
+    '''
+    logger.info("Resetting connection pool for %s://%s:%s", *pool_key)
+    try:
+        del pool_manager.pools[pool_key]
+    except KeyError:
+        pass
@@ -0,0 +1,232 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Persistent local cache of downloaded files.
+
+When enabled (see :func:`dxpy.set_download_cache`, or ``dx download
+--cache-dir``), :func:`dxpy.download_dxfile` keeps a copy of every file it
+downloads in a cache directory, and serves later downloads of the same
+file from it, without downloading anything.
+
+Closed files never change, so an entry is keyed by the file ID and the
+sizes and MD5 checksums of its parts, as reported by
+``describe(fields={"parts"})``. Files that do not have checksums for all
+parts are not cached.
+
+Entries are served, and added, by the cheapest method available:
+
+* a hard link, if the cache was created with ``link="hardlink"``. The
+  entry and the local file are then the same inode; cache entries are
+  made read-only, so the local files linked to them are read-only too;
+* a reflink (copy-on-write clone), on Linux filesystems that support
+  them, such as XFS and Btrfs;
+* a copy.
+
+The cache is safe to share between processes. Entries are written under
+temporary names and renamed into place, and eviction, which removes the
+least recently used entries once the total size exceeds the limit, is
+serialized with a lock file.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import errno, hashlib, json, os, shutil, stat, threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_MAX_SIZE = 50 * 1024 * 1024 * 1024
+# ioctl that clones a file on Linux (FICLONE)
+_FICLONE = 0x40049409
+_LOCK_FILE_NAME = '.lock'
+_TMP_SUFFIX = '.tmp'
+
+
+def cache_key(file_id, parts):
+    '''
+    :param file_id: ID of a closed file
+    :type file_id: string
+    :param parts: "parts" field of the file's description
+    :type parts: dict
+    :returns: Name of the cache entry of the file, or None if the file cannot be cached
+    :rtype: string
+    '''
+    if not parts or not all("md5" in part for part in parts.values()):
+        return None
+    part_list = [[int(index), parts[index]["size"], parts[index]["md5"]] for index in sorted(parts, key=int)]
+    digest = hashlib.sha256(json.dumps(part_list).encode('utf-8')).hexdigest()
+    return "{}.{}".format(file_id, digest[:32])
+
+
+def _reflink(src, dest):
+    with open(src, 'rb') as src_fh:
+        with open(dest, 'wb') as dest_fh:
+            fcntl.ioctl(dest_fh.fileno(), _FICLONE, src_fh.fileno())
+
+
+def _unlink_quietly(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class DownloadCache(object):
+    '''
+    :param directory: Directory in which to keep the cached files; created if needed
+    :type directory: string
+    :param max_size: Total size, in bytes, of the cached files
+    :type max_size: int
+    :param link: "hardlink" to serve and add entries by hard links where possible; "auto" to clone or copy them
+    :type link: string
+    '''
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE, link="auto"):
+        if link not in ("auto", "hardlink"):
+            raise ValueError("link must be one of 'auto' or 'hardlink'")
+        self.directory = directory
+        self.max_size = max_size
+        self.link = link
+        self.hits = 0
+        self.misses = 0
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                if not os.path.isdir(directory):
+                    raise
+
+    def _tmp_path(self, path):
+        return "{}.{}.{}{}".format(path, os.getpid(), threading.current_thread().ident, _TMP_SUFFIX)
+
+    def _place(self, src, dest):
+        # Creates *dest* with the contents of *src*, by the cheapest
+        # method available, and atomically
+        tmp_path = self._tmp_path(dest)
+        try:
+            if self.link == "hardlink":
+                try:
+                    os.link(src, tmp_path)
+                    os.rename(tmp_path, dest)
+                    # rename() does nothing if *dest* is already a link
+                    # to *src*, leaving the temporary link behind
+                    _unlink_quietly(tmp_path)
+                    return "hardlink"
+                except OSError as e:
+                    if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                        raise
+                    _unlink_quietly(tmp_path)
+            if fcntl is not None:
+                try:
+                    _reflink(src, tmp_path)
+                    os.rename(tmp_path, dest)
+                    return "reflink"
+                except (IOError, OSError):
+                    _unlink_quietly(tmp_path)
+            shutil.copyfile(src, tmp_path)
+            os.rename(tmp_path, dest)
+            return "copy"
+        except:
+            _unlink_quietly(tmp_path)
+            raise
+
+    def fetch(self, file_id, parts, filename):
+        '''
+        :param file_id: ID of a closed file
+        :type file_id: string
+        :param parts: "parts" field of the file's description
+        :type parts: dict
+        :param filename: Local file name to create, or to replace
+        :type filename: string
+        :returns: The method by which the file was served ("hardlink", "reflink" or "copy"), or None if it is not cached
+        :rtype: string
+        '''
+        key = cache_key(file_id, parts)
+        if key is None:
+            return None
+        entry = os.path.join(self.directory, key)
+        try:
+            try:
+                # Marks the entry as recently used
+                os.utime(entry, None)
+            except OSError as e:
+                if e.errno != errno.EPERM:
+                    raise
+            method = self._place(entry, filename)
+        except (IOError, OSError) as e:
+            if e.errno != errno.ENOENT:
+                raise
+            self.misses += 1
+            return None
+        self.hits += 1
+        return method
+
+    def add(self, file_id, parts, filename):
+        '''
+        :param filename: Local file holding the downloaded and verified contents of the file
+        :type filename: string
+
+        Adds a file to the cache, and evicts the least recently used
+        entries if the cache has grown too large.
+        '''
+        key = cache_key(file_id, parts)
+        if key is None or sum(part["size"] for part in parts.values()) > self.max_size:
+            return
+        entry = os.path.join(self.directory, key)
+        if os.path.exists(entry):
+            return
+        self._place(filename, entry)
+        mode = os.stat(entry).st_mode
+        os.chmod(entry, mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+        self.evict()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name == _LOCK_FILE_NAME or name.endswith(_TMP_SUFFIX):
+                continue
+            try:
+                info = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((info.st_mtime, name, info.st_size))
+        return entries
+
+    def evict(self):
+        '''
+        Removes the least recently used entries until the cache fits in its maximum size.
+        '''
+        with open(os.path.join(self.directory, _LOCK_FILE_NAME), 'a') as lock_fh:
+            if fcntl is not None:
+                fcntl.flock(lock_fh.fileno(), fcntl.LOCK_EX)
+            entries = sorted(self._entries())
+            total_size = sum(size for _mtime, _name, size in entries)
+            for _mtime, name, size in entries:
+                if total_size <= self.max_size:
+                    break
+                _unlink_quietly(os.path.join(self.directory, name))
+                total_size -= size
+
+    def snapshot(self):
+        '''
+        :returns: Number and total size of the cached files, and numbers of hits and misses in this process
+        :rtype: dict
+        '''
+        entries = self._entries()
+        return {"entries": len(entries), "bytes": sum(size for _mtime, _name, size in entries),
+                "hits": self.hits, "misses": self.misses}
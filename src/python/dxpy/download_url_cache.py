@@ -0,0 +1,241 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Cache of file download URLs, shared by all file handlers.
+
+:meth:`dxpy.DXFile.get_download_url` obtains URLs from a
+:class:`DownloadURLCache` shared by the whole process, so that all the
+handlers of a file, and all the reads and downloads made through them,
+share the URL from a single ``/file-xxxx/download`` call. When a
+directory is given (see :func:`dxpy.set_download_url_cache`), the URLs
+are also kept there, and shared with the other processes using it, e.g.
+the tasks of a job that all read the same reference files.
+
+An entry is keyed by the file ID, the input of the ``/download`` call,
+the API server and the credentials in use, so URLs are only reused by
+callers that would have obtained an equivalent URL. It is used until its
+``expires`` time, less a margin of 60 seconds for clock drift (URLs
+without an expiry time are kept for :data:`DISK_TTL` seconds on disk).
+Once :data:`REFRESH_FRACTION` of its lifetime has passed, the URL is
+still returned, but a new one is requested in the background, so that
+readers do not wait for a new URL when the old one expires.
+
+URLs requested with an explicit *duration* are not cached, as the caller
+asked for a URL valid for that long from now.
+
+Expired entries are dropped, and at most :data:`MAX_ENTRIES` are kept in
+memory, those fetched longest ago being dropped first. A URL from which
+a read fails is dropped as well (see :meth:`DownloadURLCache.invalidate`),
+so that the next reader requests a new one.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import hashlib, json, os, tempfile, threading, time
+
+from . import logger
+from .compat import open
+
+# Margin for clock drift, in seconds
+EXPIRY_DRIFT = 60
+# URLs without an expiry time never expire in memory; on disk they are kept this long, in seconds
+DISK_TTL = 3600
+REFRESH_FRACTION = 0.75
+MAX_ENTRIES = 10000
+# Entries are pruned once there are this many, or twice as many as after
+# the last pruning
+_MIN_PRUNE_SIZE = 100
+_NEVER = 32503680000  # year 3000
+
+
+class DownloadURLCache(object):
+    '''
+    :param directory: Directory in which to share URLs with other processes, or None to keep them in memory only
+    :type directory: string
+
+    Thread-safe.
+    '''
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._lock = threading.Lock()
+        # Key => {"url", "headers", "fetched", "expires"}
+        self._entries = {}
+        # Keys being fetched, in the foreground or background, with their locks
+        self._fetch_locks = {}
+        self._refreshing = set()
+        self._prune_at = _MIN_PRUNE_SIZE
+        if directory is not None and not os.path.isdir(directory):
+            try:
+                os.makedirs(directory, 0o700)
+            except OSError:
+                if not os.path.isdir(directory):
+                    raise
+
+    @staticmethod
+    def key(file_id, download_input, apiserver, security_context):
+        '''
+        :returns: Key of the URL of *file_id* obtained with *download_input*, from *apiserver* with *security_context*
+        :rtype: string
+        '''
+        return hashlib.sha256(json.dumps([file_id, download_input, apiserver, security_context],
+                                         sort_keys=True).encode('utf-8')).hexdigest()
+
+    def get(self, key, fetch):
+        '''
+        :param key: Key of the URL, from :meth:`key`
+        :type key: string
+        :param fetch: Function calling ``/file-xxxx/download``, and returning its output
+        :type fetch: function
+        :returns: Download URL, and headers to supply with requests to it
+        :rtype: tuple (string, dict)
+        '''
+        now = time.time()
+        entry = self._lookup(key, now)
+        if entry is None:
+            with self._fetch_lock(key):
+                # Another thread may have fetched it meanwhile
+                entry = self._lookup(key, time.time())
+                if entry is None:
+                    entry = self._fetch(key, fetch)
+        elif now >= entry["fetched"] + REFRESH_FRACTION * (entry["expires"] - entry["fetched"]):
+            self._refresh(key, fetch)
+        return entry["url"], dict(entry["headers"])
+
+    def invalidate(self, key):
+        '''
+        :param key: Key of the URL, from :meth:`key`
+
+        Drops the URL, from memory and from the directory shared with other
+        processes, e.g. because reading from it failed.
+        '''
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.directory is not None:
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                pass
+
+    def invalidate_url(self, url):
+        '''
+        Drops the entries of the URL *url*, as :meth:`invalidate` does.
+        '''
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry["url"] == url]
+        for key in keys:
+            self.invalidate(key)
+
+    def _lookup(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["expires"] < now:
+                del self._entries[key]
+        if (entry is None or entry["expires"] < now) and self.directory is not None:
+            entry = self._load(key)
+            if entry is not None:
+                with self._lock:
+                    self._entries[key] = entry
+        if entry is None or entry["expires"] < now:
+            return None
+        return entry
+
+    def _fetch_lock(self, key):
+        with self._lock:
+            return self._fetch_locks.setdefault(key, threading.Lock())
+
+    def _fetch(self, key, fetch):
+        fetched = time.time()
+        resp = fetch()
+        if "expires" in resp:
+            expires = resp["expires"] / 1000 - EXPIRY_DRIFT
+        else:
+            expires = _NEVER
+        entry = {"url": resp["url"], "headers": resp.get("headers", {}), "fetched": fetched, "expires": expires}
+        with self._lock:
+            self._entries[key] = entry
+            if len(self._entries) >= self._prune_at:
+                self._prune(fetched)
+        if self.directory is not None:
+            self._save(key, dict(entry, expires=min(expires, fetched + DISK_TTL)))
+        return entry
+
+    def _prune(self, now):
+        # Drops the expired entries, and the oldest ones beyond
+        # MAX_ENTRIES, with the fetch locks not in use; called with the
+        # lock held
+        for key in [key for key, entry in self._entries.items() if entry["expires"] < now]:
+            del self._entries[key]
+        if len(self._entries) > MAX_ENTRIES:
+            oldest = sorted(self._entries, key=lambda key: self._entries[key]["fetched"])
+            for key in oldest[:len(self._entries) - MAX_ENTRIES]:
+                del self._entries[key]
+        for key in [key for key, lock in self._fetch_locks.items() if key not in self._entries and not lock.locked()]:
+            del self._fetch_locks[key]
+        self._prune_at = max(2 * len(self._entries), _MIN_PRUNE_SIZE)
+
+    def _refresh(self, key, fetch):
+        # Fetches a new URL in the background, unless one is being fetched
+        # already. Refreshes are rare, and run in daemon threads, so that
+        # they never delay the exit of the interpreter.
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                with self._fetch_lock(key):
+                    self._fetch(key, fetch)
+            except Exception as e:
+                # The current URL is used until it expires, and then fetched again
+                logger.debug("Refreshing download URL failed: %s", e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+        thread = threading.Thread(target=refresh)
+        thread.daemon = True
+        thread.start()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def _load(self, key):
+        try:
+            with open(self._path(key), 'rb') as fh:
+                entry = json.loads(fh.read().decode('utf-8'))
+        except (IOError, OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or not all(field in entry for field in ("url", "headers", "fetched", "expires")):
+            return None
+        return entry
+
+    def _save(self, key, entry):
+        # The entry is written under a temporary name (readable only by
+        # the user, as URLs may be preauthenticated) and renamed into place
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix=key + ".", suffix=".tmp", dir=self.directory)
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(json.dumps(entry).encode('utf-8'))
+            os.rename(tmp_path, self._path(key))
+        except (IOError, OSError) as e:
+            logger.debug("Could not save download URL in %s: %s", self.directory, e)
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
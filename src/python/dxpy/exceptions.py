@@ -99,6 +99,9 @@ class DXFileError(DXError):
 class DXIncompleteReadsError(DXError):
     '''Exception for :class:`dxpy.bindings.dxfile.DXFile` when returned read data is shorter than requested'''
 
+class DXCircuitOpenError(DXError):
+    '''Raised by :func:`dxpy.DXHTTPRequest` when requests to a host are failing fast because the host is unreachable.'''
+
 class DXPartLengthMismatchError(DXFileError):
     '''Exception raised by :class:`dxpy.bindings.dxfile.DXFile` on part length mismatch.'''
 
@@ -214,6 +217,7 @@ network_exceptions = (requests.packages.urllib3.exceptions.ProtocolError,
                       socket.error)
 
 default_expected_exceptions = network_exceptions + (DXAPIError,
+                                                    DXCircuitOpenError,
                                                     DXCLIError,
                                                     KeyboardInterrupt)
 
@@ -0,0 +1,178 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Hedged ranged reads of files.
+
+When enabled (see :func:`dxpy.set_read_hedging`), the ranged GETs made by
+:class:`dxpy.DXFile` reads and :func:`dxpy.download_dxfile` go through a
+:class:`HedgePolicy`. If a request has not completed within a percentile
+(by default the 95th) of the durations of recent requests, an identical
+request is sent, and the result of whichever completes first is used. The
+other request is left to complete in the background, and its result is
+discarded.
+
+The durations of requests of different sizes are compared by scaling up
+those of smaller requests in proportion to the size, so a request is only
+hedged once it is slower than the percentile of recent requests would be
+at its size. No request is hedged until enough durations have been
+recorded, and hedges are limited to a fraction of all requests, so that a
+slow network does not lead to all requests being sent twice.
+
+The number of hedged requests, and of hedges that completed first, are
+recorded per file in :mod:`dxpy.metrics`.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import collections, concurrent.futures, threading, time
+
+from . import metrics
+
+DEFAULT_PERCENTILE = 0.95
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_MAX_HEDGE_RATIO = 0.1
+NUM_SAMPLES = 200
+# Requests are never hedged sooner than this, in seconds
+MIN_HEDGE_DELAY = 0.05
+# Threads on which hedges are sent
+MAX_HEDGE_THREADS = 32
+
+
+def _start_thread(fn):
+    # Calls *fn* in a new daemon thread, and returns the future of its result
+    future = concurrent.futures.Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
+    return future
+
+
+class HedgePolicy(object):
+    '''
+    :param percentile: Fraction of recent requests that a request must be slower than to be hedged
+    :type percentile: float
+    :param min_samples: Number of requests to observe before any is hedged
+    :type min_samples: int
+    :param max_hedge_ratio: Largest fraction of requests that may be hedged
+    :type max_hedge_ratio: float
+
+    Thread-safe; shared by all the reads in the process.
+    '''
+    def __init__(self, percentile=DEFAULT_PERCENTILE, min_samples=DEFAULT_MIN_SAMPLES,
+                 max_hedge_ratio=DEFAULT_MAX_HEDGE_RATIO):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.max_hedge_ratio = max_hedge_ratio
+        self._lock = threading.Lock()
+        # (size, duration) of recent requests
+        self._samples = collections.deque(maxlen=NUM_SAMPLES)
+        self._num_requests = 0
+        self._num_hedges = 0
+        self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_HEDGE_THREADS)
+            return self._executor
+
+    def hedge_delay(self, num_bytes):
+        '''
+        :param num_bytes: Size of the response expected
+        :type num_bytes: int
+        :returns: Time after which a request is hedged, in seconds, or None if requests are not hedged yet
+        :rtype: float
+        '''
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            durations = sorted(duration * max(1.0, num_bytes / max(size, 1)) for size, duration in self._samples)
+        index = min(int(self.percentile * len(durations)), len(durations) - 1)
+        return max(durations[index], MIN_HEDGE_DELAY)
+
+    def _may_hedge(self):
+        with self._lock:
+            if self._num_hedges + 1 > self.max_hedge_ratio * self._num_requests:
+                return False
+            self._num_hedges += 1
+            return True
+
+    def call(self, attempt, num_bytes, label=None):
+        '''
+        :param attempt: Function making the request, and returning its result; it may be called twice, concurrently
+        :type attempt: function
+        :param num_bytes: Size of the response expected
+        :type num_bytes: int
+        :param label: Name under which hedges are recorded in the metrics, e.g. the file ID
+        :type label: string
+        :returns: Result of the first call of *attempt* to complete successfully
+
+        Calls *attempt*, and calls it again if the first call is slow.
+        '''
+        with self._lock:
+            self._num_requests += 1
+        delay = self.hedge_delay(num_bytes)
+        started = time.time()
+        if delay is None:
+            result = attempt()
+            self._record(num_bytes, time.time() - started)
+            return result
+
+        # The primary request starts at once, on a thread of its own,
+        # rather than waiting for a thread of the executor, where the time
+        # spent queued behind other reads would count as latency. The
+        # caller's thread waits for whichever request completes first.
+        primary = _start_thread(attempt)
+        done, _ = concurrent.futures.wait([primary], timeout=delay)
+        if done or not self._may_hedge():
+            result = primary.result()
+            self._record(num_bytes, time.time() - started)
+            return result
+
+        hedge = self._get_executor().submit(attempt)
+        pending = [primary, hedge]
+        while True:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            succeeded = [future for future in pending if future in done and future.exception() is None]
+            if succeeded or len(done) == len(pending):
+                # Fails only if both requests failed
+                winner = succeeded[0] if succeeded else primary
+                metrics.registry.observe_hedge(label, won=winner is hedge and bool(succeeded))
+                result = winner.result()
+                self._record(num_bytes, time.time() - started)
+                return result
+            pending = [future for future in pending if future not in done]
+
+    def _record(self, num_bytes, duration):
+        with self._lock:
+            self._samples.append((num_bytes, duration))
+
+    def snapshot(self):
+        '''
+        :returns: Numbers of requests made and hedged
+        :rtype: dict
+        '''
+        with self._lock:
+            return {"requests": self._num_requests, "hedges": self._num_hedges}
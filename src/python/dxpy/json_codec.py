@@ -0,0 +1,267 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+JSON Codec
+**********
+
+JSON serialization used for API requests and responses, GTable row
+batches, and job input and output. The fastest available backend is
+chosen when :mod:`dxpy` is imported:
+
+* ``orjson`` (Python 3 only)
+* ``ujson`` (version 5 or later, Python 3 only)
+* ``simplejson`` (Python 3 only; on Python 2 its decoder returns byte
+  strings)
+* ``stdlib``: the :mod:`json` module, always available
+
+Set the environment variable ``DX_JSON_CODEC`` to the name of a backend,
+or call :func:`set_json_codec`, to override the choice.
+
+Whichever backend is used, the decoded values are the same. Where a
+backend cannot handle some input exactly like :mod:`json` does (e.g.
+integers beyond 64 bits, or an indentation it does not support), that
+call falls back to :mod:`json`. The encoded text may differ in
+insignificant whitespace, and non-ASCII characters may be emitted as
+UTF-8 instead of being escaped.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import json, os
+
+from .compat import USING_PYTHON2
+
+
+class JSONCodec(object):
+    '''
+    JSON backend based on the standard library :mod:`json` module.
+    Subclasses override the methods for which their backend is faster.
+    '''
+    name = 'stdlib'
+
+    def dumps(self, obj, indent=None, sort_keys=False, default=None):
+        '''
+        :param obj: Value to serialize
+        :param indent: If not None, pretty-print with this many spaces per level
+        :type indent: int
+        :param sort_keys: If True, output object fields in sorted order
+        :type sort_keys: boolean
+        :param default: Called with any object that cannot otherwise be serialized; should return a serializable version of it, or raise :exc:`TypeError`
+        :type default: function
+        :returns: JSON text
+        :rtype: string
+        '''
+        return json.dumps(obj, indent=indent, sort_keys=sort_keys, default=default)
+
+    def dumps_bytes(self, obj, default=None):
+        '''
+        :returns: Compact JSON encoding of *obj*, as UTF-8
+        :rtype: bytes
+
+        Serializes *obj* for sending over the wire.
+        '''
+        text = self.dumps(obj, default=default)
+        return text.encode('utf-8') if not isinstance(text, bytes) else text
+
+    def loads(self, s):
+        '''
+        :param s: JSON text
+        :type s: string or bytes (UTF-8)
+        :returns: Decoded value
+        '''
+        if isinstance(s, bytes):
+            s = s.decode('utf-8')
+        return json.loads(s)
+
+
+_stdlib_codec = JSONCodec()
+
+
+class _ORJSONCodec(JSONCodec):
+    name = 'orjson'
+
+    def __init__(self, orjson):
+        self._orjson = orjson
+
+    def _options(self, indent, sort_keys):
+        options = 0
+        if indent == 2:
+            options |= self._orjson.OPT_INDENT_2
+        if sort_keys:
+            options |= self._orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj, indent=None, sort_keys=False, default=None):
+        if indent is not None and indent != 2:
+            return _stdlib_codec.dumps(obj, indent=indent, sort_keys=sort_keys, default=default)
+        return self.dumps_bytes(obj, default=default, options=self._options(indent, sort_keys)).decode('utf-8')
+
+    def dumps_bytes(self, obj, default=None, options=0):
+        try:
+            return self._orjson.dumps(obj, default=default, option=options | self._orjson.OPT_NON_STR_KEYS)
+        except self._orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits; errors that json would raise
+            # too are raised again below
+            return _stdlib_codec.dumps_bytes(obj, default=default)
+
+    def loads(self, s):
+        try:
+            return self._orjson.loads(s)
+        except ValueError:
+            # e.g. NaN or integers beyond 64 bits, which json accepts
+            return _stdlib_codec.loads(s)
+
+
+class _UJSONCodec(JSONCodec):
+    name = 'ujson'
+
+    def __init__(self, ujson):
+        self._ujson = ujson
+
+    def dumps(self, obj, indent=None, sort_keys=False, default=None):
+        if default is not None:
+            # ujson looks up toDict() and __json__() on objects before
+            # calling *default*, and on data object handlers such lookups
+            # turn into API calls (see DXDataObject.__getattr__)
+            return _stdlib_codec.dumps(obj, indent=indent, sort_keys=sort_keys, default=default)
+        try:
+            return self._ujson.dumps(obj, indent=indent or 0, sort_keys=sort_keys, default=default,
+                                     escape_forward_slashes=False)
+        except (OverflowError, ValueError):
+            return _stdlib_codec.dumps(obj, indent=indent, sort_keys=sort_keys, default=default)
+
+    def loads(self, s):
+        try:
+            return self._ujson.loads(s)
+        except ValueError:
+            return _stdlib_codec.loads(s)
+
+
+class _SimpleJSONCodec(JSONCodec):
+    name = 'simplejson'
+
+    def __init__(self, simplejson):
+        self._simplejson = simplejson
+
+    def dumps(self, obj, indent=None, sort_keys=False, default=None):
+        # Encode namedtuples as arrays, like json does. This also keeps
+        # simplejson from looking up _asdict() on data object handlers.
+        return self._simplejson.dumps(obj, indent=indent, sort_keys=sort_keys, default=default,
+                                      namedtuple_as_object=False)
+
+    def loads(self, s):
+        return self._simplejson.loads(s)
+
+
+def _load_orjson():
+    import orjson
+    return _ORJSONCodec(orjson)
+
+
+def _load_ujson():
+    import ujson
+    if int(ujson.__version__.split('.')[0]) < 5:
+        # Earlier versions have no "default" hook and lose floating point
+        # precision when decoding
+        raise ImportError("ujson 5 or later is required")
+    return _UJSONCodec(ujson)
+
+
+def _load_simplejson():
+    import simplejson
+    return _SimpleJSONCodec(simplejson)
+
+
+_codec_loaders = [('orjson', _load_orjson), ('ujson', _load_ujson), ('simplejson', _load_simplejson),
+                  ('stdlib', lambda: _stdlib_codec)]
+
+if USING_PYTHON2:
+    _codec_loaders = [('stdlib', lambda: _stdlib_codec)]
+
+
+def available_json_codecs():
+    '''
+    :returns: Names of the backends that can be used in this environment, fastest first
+    :rtype: list of strings
+    '''
+    names = []
+    for name, loader in _codec_loaders:
+        try:
+            loader()
+            names.append(name)
+        except ImportError:
+            pass
+    return names
+
+
+def get_json_codec(name=None):
+    '''
+    :param name: Name of a backend; if not given, the backend currently in use is returned
+    :type name: string
+    :returns: JSON backend
+    :rtype: :class:`JSONCodec`
+    :raises: :exc:`ValueError` if the backend is not known or not installed
+    '''
+    if name is None:
+        return _codec
+    for codec_name, loader in _codec_loaders:
+        if codec_name == name:
+            try:
+                return loader()
+            except ImportError as e:
+                raise ValueError("JSON codec {} is not available: {}".format(name, e))
+    raise ValueError("Unknown JSON codec {}; expected one of {}".format(
+        name, ", ".join(codec_name for codec_name, _loader in _codec_loaders)))
+
+
+def set_json_codec(name):
+    '''
+    :param name: Name of the backend to use for the rest of the session, e.g. "stdlib"
+    :type name: string
+    :raises: :exc:`ValueError` if the backend is not known or not installed
+    '''
+    global _codec
+    _codec = get_json_codec(name)
+
+
+def dumps(obj, indent=None, sort_keys=False, default=None):
+    '''
+    Serializes *obj* to JSON text with the current backend. See
+    :meth:`JSONCodec.dumps`.
+    '''
+    return _codec.dumps(obj, indent=indent, sort_keys=sort_keys, default=default)
+
+
+def dumps_bytes(obj, default=None):
+    '''
+    Serializes *obj* to compact UTF-8 encoded JSON with the current
+    backend. See :meth:`JSONCodec.dumps_bytes`.
+    '''
+    return _codec.dumps_bytes(obj, default=default)
+
+
+def loads(s):
+    '''
+    Decodes JSON text or UTF-8 encoded JSON with the current backend.
+    '''
+    return _codec.loads(s)
+
+
+if 'DX_JSON_CODEC' in os.environ:
+    _codec = get_json_codec(os.environ['DX_JSON_CODEC'])
+else:
+    _codec = get_json_codec(available_json_codecs()[0])
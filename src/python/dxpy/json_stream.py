@@ -0,0 +1,278 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Incremental decoding of large JSON API responses.
+
+Responses such as a page of ``/system/findDataObjects`` results or of
+``/gtable-xxxx/get`` rows consist of one large array (``results`` or
+``data``) plus a few small fields. :class:`JSONArrayStreamDecoder` decodes
+such a response as its body arrives, producing each element of the array
+as soon as it is complete, so that neither the raw body nor its decoded
+text has to be held in memory in full.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import codecs, json, re, time
+
+from . import exceptions, logger
+
+DEFAULT_STREAM_CHUNK_SIZE = 64 * 1024
+
+_MIN_PENDING_TO_DOUBLE = 64 * 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+(_START, _KEY_OR_END, _COLON, _VALUE, _FIELD_SEPARATOR_OR_END, _FIRST_ITEM_OR_END, _ITEM, _ITEM_SEPARATOR_OR_END,
+ _DONE) = range(9)
+
+
+class JSONArrayStreamDecoder(object):
+    '''
+    :param array_key: Name of the top-level field whose elements are produced incrementally
+    :type array_key: string
+
+    Incremental decoder for a JSON object, fed with the raw response body
+    one chunk at a time. Elements of the array stored in the field
+    *array_key* are returned by :meth:`feed` as soon as they have been
+    received in full. All other top-level fields are collected in
+    :attr:`fields`.
+
+    Example::
+
+        decoder = JSONArrayStreamDecoder("results")
+        for chunk in response.stream():
+            for result in decoder.feed(chunk):
+                process(result)
+        for result in decoder.close():
+            process(result)
+        next_page = decoder.fields["next"]
+
+    '''
+    def __init__(self, array_key):
+        self.array_key = array_key
+        self.fields = {}
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json_decoder = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        # Length the buffer has to reach before a value that was found to be
+        # incomplete is decoded again. Doubling the pending part of the buffer
+        # between attempts at large values keeps decoding them linear in
+        # their size.
+        self._min_buf_len = 0
+        self._state = _START
+        self._key = None
+
+    def feed(self, data):
+        '''
+        :param data: Next chunk of the response body
+        :type data: bytes
+        :returns: Array elements completed by this chunk
+        :rtype: list
+        '''
+        if self._pos > 0:
+            self._buf = self._buf[self._pos:]
+            self._min_buf_len -= self._pos
+            self._pos = 0
+        self._buf += self._text_decoder.decode(data)
+        if len(self._buf) < self._min_buf_len:
+            return []
+        return self._decode(final=False)
+
+    def close(self):
+        '''
+        :returns: Array elements not yet returned by :meth:`feed`
+        :rtype: list
+        :raises: :exc:`ValueError` if the body did not contain a complete JSON object
+
+        Signals the end of the body. :attr:`fields` is complete
+        afterwards.
+        '''
+        self._buf += self._text_decoder.decode(b'', final=True)
+        items = self._decode(final=True)
+        if self._state != _DONE or _WHITESPACE.match(self._buf, self._pos).end() != len(self._buf):
+            raise ValueError("Incomplete or malformed JSON object")
+        return items
+
+    def _decode_value(self, final):
+        # Returns (True, value) if a complete value starts at the current
+        # position, and (False, None) if more input is needed. Numbers and
+        # literals are only known to be complete once the character after
+        # them has been received.
+        try:
+            value, end = self._json_decoder.raw_decode(self._buf, self._pos)
+        except ValueError:
+            if final:
+                raise
+            num_pending = len(self._buf) - self._pos
+            self._min_buf_len = len(self._buf) + (num_pending if num_pending > _MIN_PENDING_TO_DOUBLE else 1)
+            return False, None
+        if end == len(self._buf) and not final:
+            self._min_buf_len = len(self._buf) + 1
+            return False, None
+        self._pos = end
+        return True, value
+
+    def _expect(self, char):
+        if self._buf[self._pos] != char:
+            raise ValueError("Expected {!r} at position {} of JSON object".format(char, self._pos))
+        self._pos += 1
+
+    def _decode(self, final):
+        items = []
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos == len(self._buf) or self._state == _DONE:
+                return items
+            char = self._buf[self._pos]
+            if self._state == _START:
+                self._expect('{')
+                self._state = _KEY_OR_END
+            elif self._state == _KEY_OR_END:
+                if char == '}':
+                    self._pos += 1
+                    self._state = _DONE
+                    continue
+                if char != '"':
+                    raise ValueError("Expected a field name at position {} of JSON object".format(self._pos))
+                complete, self._key = self._decode_value(final)
+                if not complete:
+                    return items
+                self._state = _COLON
+            elif self._state == _COLON:
+                self._expect(':')
+                self._state = _VALUE
+            elif self._state == _VALUE:
+                if self._key == self.array_key and char == '[':
+                    self._pos += 1
+                    self._state = _FIRST_ITEM_OR_END
+                    continue
+                complete, value = self._decode_value(final)
+                if not complete:
+                    return items
+                self.fields[self._key] = value
+                self._state = _FIELD_SEPARATOR_OR_END
+            elif self._state == _FIELD_SEPARATOR_OR_END:
+                self._pos += 1
+                if char == ',':
+                    self._state = _KEY_OR_END
+                elif char == '}':
+                    self._state = _DONE
+                else:
+                    raise ValueError("Expected ',' or '}}' at position {} of JSON object".format(self._pos - 1))
+            elif self._state in (_FIRST_ITEM_OR_END, _ITEM):
+                if char == ']' and self._state == _FIRST_ITEM_OR_END:
+                    self._pos += 1
+                    self._state = _FIELD_SEPARATOR_OR_END
+                    continue
+                complete, value = self._decode_value(final)
+                if not complete:
+                    return items
+                items.append(value)
+                self._state = _ITEM_SEPARATOR_OR_END
+            elif self._state == _ITEM_SEPARATOR_OR_END:
+                self._pos += 1
+                if char == ',':
+                    self._state = _ITEM
+                elif char == ']':
+                    self._state = _FIELD_SEPARATOR_OR_END
+                else:
+                    raise ValueError("Expected ',' or ']' at position {} of JSON array".format(self._pos - 1))
+
+
+class DXJSONStream(object):
+    '''
+    Iterable over the elements of one array-valued field of an API
+    response, returned by :func:`dxpy.DXHTTPRequest` when
+    *stream_json_array* is given. Elements are decoded and produced while
+    the response body is still being received.
+
+    The remaining fields of the response are available in :attr:`fields`.
+    Fields that precede the array in the response are available as soon as
+    the first element has been produced, and all of them once iteration is
+    complete.
+
+    If the connection fails part of the way through the body, and the
+    request is safe to retry, the request is reissued and the elements
+    that have already been produced are skipped.
+
+    A stream can only be iterated over once. Abandoning the iteration
+    early discards the connection the response is being received on.
+    '''
+    def __init__(self, response, array_key, reissue_request=None, max_retries=0,
+                 chunk_size=DEFAULT_STREAM_CHUNK_SIZE):
+        self.array_key = array_key
+        self.fields = {}
+        self._response = response
+        self._reissue_request = reissue_request
+        self._max_retries = max_retries
+        self._chunk_size = chunk_size
+
+    def _decode_response(self, response):
+        from . import connection_health
+        decoder = JSONArrayStreamDecoder(self.array_key)
+        self.fields = decoder.fields
+        try:
+            for chunk in response.stream(self._chunk_size, decode_content=True):
+                for item in decoder.feed(chunk):
+                    yield item
+            if 'content-length' in response.headers and int(response.headers['content-length']) != response.tell():
+                raise exceptions.ContentLengthError(
+                    "Received response with content-length header set to %s but content length is %d. [RequestID=%s]" %
+                    (response.headers['content-length'], response.tell(),
+                     response.headers.get("x-request-id", "unavailable")))
+            try:
+                remaining_items = decoder.close()
+            except ValueError:
+                # The JSON is not parsable, but we should be able to retry.
+                raise exceptions.BadJSONInReply("Invalid JSON received from server", response.status)
+            for item in remaining_items:
+                yield item
+        finally:
+            # Evicts the connection if the body has not been read in full
+            connection_health.release_connection(response)
+
+    def __iter__(self):
+        from . import _expected_exceptions, _extract_msg_from_last_exception, _retry_budget, DEFAULT_TIMEOUT
+        from .retry_policy import backoff_delay
+        response, self._response = self._response, None
+        if response is None:
+            raise exceptions.DXError("DXJSONStream can only be iterated over once")
+        num_produced, num_to_skip, try_index = 0, 0, 0
+        while True:
+            try:
+                for item in self._decode_response(response):
+                    if num_to_skip > 0:
+                        num_to_skip -= 1
+                        continue
+                    num_produced += 1
+                    yield item
+                return
+            except Exception as e:
+                if not isinstance(e, _expected_exceptions) or isinstance(e, exceptions.DXAPIError) or \
+                   self._reissue_request is None or try_index >= self._max_retries or \
+                   (_retry_budget is not None and not _retry_budget.try_retry()):
+                    raise
+                delay = backoff_delay(try_index, DEFAULT_TIMEOUT)
+                logger.warn("%s: %s. Waiting %.1f seconds before retry %d of %d, resuming after %d elements...",
+                            self.array_key, _extract_msg_from_last_exception(), delay, try_index + 1,
+                            self._max_retries, num_produced)
+                time.sleep(delay)
+                try_index += 1
+                response = self._reissue_request()._response
+                num_to_skip = num_produced
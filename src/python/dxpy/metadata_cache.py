@@ -0,0 +1,188 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Client-side cache of ``describe`` and ``listFolder`` results.
+
+When enabled (see :func:`dxpy.set_metadata_cache`), :func:`dxpy.DXHTTPRequest`
+serves repeated ``/xxxx/describe`` and ``/xxxx/listFolder`` calls with the
+same input from this cache, for up to *ttl* seconds. Only results that
+cannot change without an API call are cached:
+
+* describe and listFolder results of projects and containers,
+* describe results of data objects in the "closed" state.
+
+Descriptions of executions (jobs, analyses), apps, users and orgs, and of
+objects that are still open or closing, are never cached, so that loops
+waiting for a state change keep seeing fresh results.
+
+Any other API call made by this process is treated as a potential
+mutation. It evicts the cached results for every object or project ID in
+its route or input, and all cached listFolder results. Changes made by
+other clients become visible once the cached result expires.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import collections, copy, json, re, threading, time
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 1000
+
+_ID = re.compile(r'\b[a-z]+-[0-9A-Za-z]{24}\b')
+_CACHEABLE_ROUTE = re.compile(r'^/(([a-z]+)-[0-9A-Za-z]{24})/(describe|listFolder)$')
+_CONTAINER_CLASSES = {'project', 'container'}
+_UNCACHEABLE_CLASSES = {'job', 'analysis', 'app', 'globalworkflow', 'user', 'org', 'team'}
+_READ_ONLY_METHODS = {'describe', 'download', 'dryRun', 'findApps', 'findMembers', 'findProjects', 'get', 'getDetails',
+                      'getLog', 'isStageCompatible', 'listAuthorizedUsers', 'listCategories', 'listDevelopers',
+                      'listFolder', 'listProjects', 'describeDataObjects', 'describeProjects', 'findAffiliates',
+                      'findAnalyses', 'findDataObjects', 'findExecutions', 'findJobs', 'findOrgs',
+                      'findProjectMembers', 'findUsers', 'globalSearch', 'greet', 'resolveDataObjects',
+                      'shortenURL', 'whoami'}
+
+
+def is_read_only(resource):
+    '''
+    :param resource: API route, e.g. "/file-xxxx/describe"
+    :type resource: string
+    :returns: True if the API method is known not to modify anything
+    :rtype: boolean
+    '''
+    return resource.rsplit('/', 1)[-1] in _READ_ONLY_METHODS
+
+
+class MetadataCache(object):
+    '''
+    :param ttl: Time, in seconds, for which a cached result is served
+    :type ttl: float
+    :param max_entries: Number of results kept; the least recently used ones are evicted first
+    :type max_entries: int
+
+    Thread-safe TTL and LRU cache of describe and listFolder results.
+    '''
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # key -> (expiry time, IDs the entry depends on, value)
+        self._entries = collections.OrderedDict()
+        self._keys_by_id = {}
+        # Incremented on every invalidation, so that results read
+        # concurrently with a mutation are not cached
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for(resource, input_params):
+        '''
+        :returns: Cache key for the API call, or None if its result is never cached
+        :rtype: tuple
+        '''
+        match = _CACHEABLE_ROUTE.match(resource)
+        if match is None or match.group(2) in _UNCACHEABLE_CLASSES:
+            return None
+        try:
+            return (resource, json.dumps(input_params, sort_keys=True))
+        except TypeError:
+            return None
+
+    def get(self, key):
+        '''
+        :returns: (generation, value); the value is None if it is not cached. The generation is to be passed to :meth:`put`.
+        :rtype: tuple
+        '''
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.time():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return self._generation, None
+            self._entries.pop(key)
+            self._entries[key] = entry
+            self.hits += 1
+            return self._generation, copy.deepcopy(entry[2])
+
+    def put(self, key, value, generation):
+        '''
+        :param generation: Value returned by :meth:`get` before the call was made
+        :type generation: int
+
+        Caches the result of an API call, unless it may be out of date,
+        or may change without an API call.
+        '''
+        resource, input_json = key
+        match = _CACHEABLE_ROUTE.match(resource)
+        if match.group(2) not in _CONTAINER_CLASSES and \
+           (not isinstance(value, dict) or value.get('state') != 'closed'):
+            return
+        ids = {match.group(1)} | set(_ID.findall(input_json))
+        with self._lock:
+            if generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time() + self.ttl, ids, copy.deepcopy(value))
+            for object_id in ids:
+                self._keys_by_id.setdefault(object_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        _expiry, ids, _value = self._entries.pop(key)
+        for object_id in ids:
+            keys = self._keys_by_id.get(object_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_id[object_id]
+
+    def invalidate(self, resource, data):
+        '''
+        :param resource: Route of an API call that may modify objects
+        :type resource: string
+        :param data: Input of the call, serialized
+        :type data: bytes or string
+
+        Evicts the results that depend on any ID in *resource* or *data*,
+        and all listFolder results.
+        '''
+        if isinstance(data, bytes):
+            data = data.decode('utf-8', 'replace')
+        ids = set(_ID.findall(resource)) | set(_ID.findall(data or ''))
+        with self._lock:
+            self._generation += 1
+            keys = set(key for key in self._entries if key[0].endswith('/listFolder'))
+            for object_id in ids:
+                keys.update(self._keys_by_id.get(object_id, ()))
+            for key in keys:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._keys_by_id.clear()
+
+    def snapshot(self):
+        '''
+        :returns: Number of entries, hits, and misses
+        :rtype: dict
+        '''
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
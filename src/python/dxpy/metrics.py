@@ -0,0 +1,361 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Request Metrics
+***************
+
+:func:`dxpy.DXHTTPRequest` records every request attempt it makes in
+:data:`registry`, a process-wide :class:`MetricsRegistry`. For each route
+(an API route with object IDs replaced by ``xxxx``, e.g.
+``/file-xxxx/describe``, or the host name for requests to URLs outside
+the API server, such as file downloads), it keeps
+
+* a histogram of request latency, and the number of responses by HTTP
+  status (``error`` if no response was received),
+* the number of bytes sent and received,
+* the number of retries, by cause (e.g. ``503`` or
+  ``ContentLengthError``),
+* a histogram of the time spent waiting for the concurrency limit of the
+  host (see :mod:`dxpy.concurrency_control`).
+
+It also keeps, for each file, the number of ranged reads that were hedged,
+and the number of those in which the hedge completed first (see
+:mod:`dxpy.hedging`); these are returned by :func:`hedges`. Only the first
+:data:`MAX_HEDGED_FILES` files are counted separately; reads of any other
+file are counted under ``other``.
+
+The metrics can be read with :func:`snapshot`, exported in the Prometheus
+text format with :func:`to_prometheus`, or printed as a table with
+:func:`format_summary` (which ``dx --stats`` does when it exits).
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import re, threading
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+DEFAULT_WAIT_BUCKETS = (0.001, 0.01, 0.1, 0.5, 1, 5, 10, 60)
+# Number of files whose hedged reads are counted separately
+MAX_HEDGED_FILES = 100
+
+_OBJECT_ID = re.compile(r'\b([a-z]+)-[0-9A-Za-z]{24}\b')
+_EXECUTABLE_NAME = re.compile(r'^/(app|globalworkflow)-[^/]+/(?:[^/]+/(?=[^/]+$))?')
+
+
+def route_for_path(path):
+    '''
+    :param path: Route of an API server request, e.g. "/file-B0123456789ABCDEFGHIJKLM/describe"
+    :type path: string
+    :returns: The route with object IDs and executable names and versions replaced, e.g. "/file-xxxx/describe"
+    :rtype: string
+    '''
+    path = _EXECUTABLE_NAME.sub(r'/\1-xxxx/', path)
+    return _OBJECT_ID.sub(r'\1-xxxx', path)
+
+
+class Histogram(object):
+    '''
+    :param buckets: Upper bounds of the buckets, in increasing order
+    :type buckets: tuple of floats
+
+    Cumulative histogram, as in Prometheus. Not thread-safe on its own;
+    :class:`MetricsRegistry` serializes access to it.
+    '''
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        '''
+        :returns: Estimate of the *q*-quantile, interpolated linearly within its bucket
+        :rtype: float
+        '''
+        if self.count == 0:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count > 0:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i == len(self.buckets):
+                    return lower
+                return lower + (self.buckets[i] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def to_dict(self):
+        cumulative, buckets = 0, {}
+        for bound, bucket_count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            cumulative += bucket_count
+            buckets[str(bound)] = cumulative
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
+
+
+class _RouteMetrics(object):
+    def __init__(self):
+        self.responses = {}
+        self.latency = Histogram(DEFAULT_LATENCY_BUCKETS)
+        self.pool_wait = Histogram(DEFAULT_WAIT_BUCKETS)
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.retries = {}
+
+
+class MetricsRegistry(object):
+    '''
+    Thread-safe collection of request metrics, keyed by (method, route).
+    '''
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        # file ID -> [hedges issued, hedges that completed first]
+        self._hedges = {}
+
+    def _get(self, method, route):
+        metrics = self._routes.get((method, route))
+        if metrics is None:
+            metrics = self._routes[(method, route)] = _RouteMetrics()
+        return metrics
+
+    def observe_request(self, method, route, status, latency, request_bytes=0, response_bytes=0):
+        '''
+        :param status: HTTP status of the response, or None if no response was received
+        :type status: int
+        :param latency: Time from sending the request until the response was received (or the attempt failed), in seconds
+        :type latency: float
+
+        Records one request attempt.
+        '''
+        status = str(status) if status is not None else 'error'
+        with self._lock:
+            metrics = self._get(method, route)
+            metrics.responses[status] = metrics.responses.get(status, 0) + 1
+            metrics.latency.observe(latency)
+            metrics.request_bytes += request_bytes
+            metrics.response_bytes += response_bytes
+
+    def observe_retry(self, method, route, cause):
+        '''
+        :param cause: Reason for the retry: the HTTP status, or the name of the exception raised
+        :type cause: string
+        '''
+        with self._lock:
+            retries = self._get(method, route).retries
+            retries[cause] = retries.get(cause, 0) + 1
+
+    def observe_pool_wait(self, method, route, seconds):
+        '''
+        Records the time a request waited before it could be sent.
+        '''
+        with self._lock:
+            self._get(method, route).pool_wait.observe(seconds)
+
+    def observe_hedge(self, file_id, won):
+        '''
+        :param file_id: ID of the file read
+        :type file_id: string
+        :param won: Whether the hedge completed before the request it duplicated
+        :type won: boolean
+
+        Records one hedged read.
+        '''
+        with self._lock:
+            if file_id not in self._hedges and len(self._hedges) >= MAX_HEDGED_FILES:
+                file_id = 'other'
+            counts = self._hedges.setdefault(file_id, [0, 0])
+            counts[0] += 1
+            if won:
+                counts[1] += 1
+
+    def reset(self):
+        with self._lock:
+            self._routes = {}
+            self._hedges = {}
+
+    def hedge_snapshot(self):
+        '''
+        :returns: Numbers of hedged reads, and of hedges that completed first, keyed by file ID
+        :rtype: dict
+        '''
+        with self._lock:
+            return {file_id: {"hedges": issued, "won": won} for file_id, (issued, won) in self._hedges.items()}
+
+    def snapshot(self):
+        '''
+        :returns: Metrics of each route, keyed by "METHOD route"
+        :rtype: dict
+        '''
+        with self._lock:
+            return {"{} {}".format(method, route): {"responses": dict(metrics.responses),
+                                                    "latency": metrics.latency.to_dict(),
+                                                    "pool_wait": metrics.pool_wait.to_dict(),
+                                                    "request_bytes": metrics.request_bytes,
+                                                    "response_bytes": metrics.response_bytes,
+                                                    "retries": dict(metrics.retries)}
+                    for (method, route), metrics in self._routes.items()}
+
+    def to_prometheus(self):
+        '''
+        :returns: The metrics in the Prometheus text exposition format
+        :rtype: string
+        '''
+        lines = []
+
+        def header(name, metric_type, help_text):
+            lines.append("# HELP {} {}".format(name, help_text))
+            lines.append("# TYPE {} {}".format(name, metric_type))
+
+        def labels(**kwargs):
+            return "{" + ",".join('{}="{}"'.format(key, _escape_label(value))
+                                  for key, value in sorted(kwargs.items())) + "}"
+
+        def histogram(name, hist, **kwargs):
+            cumulative = 0
+            for bound, bucket_count in zip(list(hist.buckets) + ['+Inf'], hist.counts):
+                cumulative += bucket_count
+                lines.append("{}_bucket{} {}".format(name, labels(le=bound, **kwargs), cumulative))
+            lines.append("{}_sum{} {!r}".format(name, labels(**kwargs), hist.sum))
+            lines.append("{}_count{} {}".format(name, labels(**kwargs), hist.count))
+
+        with self._lock:
+            routes = sorted(self._routes.items())
+            header("dxpy_requests_total", "counter", "Request attempts, by response status")
+            for (method, route), metrics in routes:
+                for status, count in sorted(metrics.responses.items()):
+                    lines.append("dxpy_requests_total{} {}".format(labels(method=method, route=route, status=status),
+                                                                   count))
+            header("dxpy_request_duration_seconds", "histogram", "Latency of request attempts")
+            for (method, route), metrics in routes:
+                histogram("dxpy_request_duration_seconds", metrics.latency, method=method, route=route)
+            header("dxpy_request_bytes_total", "counter", "Bytes sent in request bodies")
+            for (method, route), metrics in routes:
+                lines.append("dxpy_request_bytes_total{} {}".format(labels(method=method, route=route),
+                                                                    metrics.request_bytes))
+            header("dxpy_response_bytes_total", "counter", "Bytes received in response bodies")
+            for (method, route), metrics in routes:
+                lines.append("dxpy_response_bytes_total{} {}".format(labels(method=method, route=route),
+                                                                     metrics.response_bytes))
+            header("dxpy_retries_total", "counter", "Retries, by cause")
+            for (method, route), metrics in routes:
+                for cause, count in sorted(metrics.retries.items()):
+                    lines.append("dxpy_retries_total{} {}".format(labels(method=method, route=route, cause=cause),
+                                                                  count))
+            header("dxpy_pool_wait_seconds", "histogram", "Time requests waited for the concurrency limit")
+            for (method, route), metrics in routes:
+                histogram("dxpy_pool_wait_seconds", metrics.pool_wait, method=method, route=route)
+            header("dxpy_hedged_reads_total", "counter", "Hedged reads, by file")
+            for file_id, (issued, won) in sorted(self._hedges.items()):
+                lines.append("dxpy_hedged_reads_total{} {}".format(labels(file=file_id), issued))
+            header("dxpy_hedged_reads_won_total", "counter", "Hedged reads in which the hedge completed first, by file")
+            for file_id, (issued, won) in sorted(self._hedges.items()):
+                lines.append("dxpy_hedged_reads_won_total{} {}".format(labels(file=file_id), won))
+        return "\n".join(lines) + "\n"
+
+    def format_summary(self):
+        '''
+        :returns: Table of request counts, latencies, bytes transferred, and retries per route, busiest first
+        :rtype: string
+        '''
+        with self._lock:
+            routes = sorted(self._routes.items(), key=lambda item: -item[1].latency.sum)
+            rows = [("route", "requests", "errors", "total s", "p50 ms", "p95 ms", "wait s", "sent", "received",
+                     "retries")]
+            for (method, route), metrics in routes:
+                num_errors = sum(count for status, count in metrics.responses.items() if not status.startswith('2'))
+                rows.append(("{} {}".format(method, route),
+                             str(metrics.latency.count),
+                             str(num_errors),
+                             "{:.1f}".format(metrics.latency.sum),
+                             "{:.0f}".format(metrics.latency.quantile(0.5) * 1000),
+                             "{:.0f}".format(metrics.latency.quantile(0.95) * 1000),
+                             "{:.1f}".format(metrics.pool_wait.sum),
+                             _format_bytes(metrics.request_bytes),
+                             _format_bytes(metrics.response_bytes),
+                             ", ".join("{}={}".format(cause, count)
+                                       for cause, count in sorted(metrics.retries.items())) or "-"))
+            hedges = sorted(self._hedges.items())
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        summary = "\n".join("  ".join(cell.ljust(width) if i == 0 or i == len(row) - 1 else cell.rjust(width)
+                                      for i, (cell, width) in enumerate(zip(row, widths))).rstrip()
+                            for row in rows) + "\n"
+        for file_id, (issued, won) in hedges:
+            summary += "hedged reads of {}: {} ({} completed first)\n".format(file_id, issued, won)
+        return summary
+
+
+def _escape_label(value):
+    return '{}'.format(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_bytes(num_bytes):
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if num_bytes < 1024 or unit == 'GiB':
+            return "{:.0f} {}".format(num_bytes, unit) if unit == 'B' else "{:.1f} {}".format(num_bytes, unit)
+        num_bytes /= 1024
+
+
+registry = MetricsRegistry()
+
+
+def snapshot():
+    '''
+    :returns: Metrics recorded by :func:`dxpy.DXHTTPRequest` in this process, keyed by "METHOD route"
+    :rtype: dict
+    '''
+    return registry.snapshot()
+
+
+def to_prometheus():
+    '''
+    :returns: Metrics recorded by :func:`dxpy.DXHTTPRequest` in this process, in the Prometheus text format
+    :rtype: string
+    '''
+    return registry.to_prometheus()
+
+
+def format_summary():
+    '''
+    :returns: Human-readable table of the metrics recorded in this process
+    :rtype: string
+    '''
+    return registry.format_summary()
+
+
+def hedges():
+    '''
+    :returns: Numbers of hedged reads in this process, and of hedges that completed first, keyed by file ID
+    :rtype: dict
+    '''
+    return registry.hedge_snapshot()
+
+
+def reset():
+    '''
+    Discards all metrics recorded so far.
+    '''
+    registry.reset()
@@ -0,0 +1,128 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Sizing of upload parts from measured throughput.
+
+By default, :class:`dxpy.DXFile` uploads parts of a fixed size, chosen
+from the limits of the project and the expected size of the file. When
+adaptive part sizing is enabled (see :func:`dxpy.set_adaptive_part_sizing`),
+the size of each part is instead chosen, as it is started, by a
+:class:`PartSizeController` from the parts uploaded so far:
+
+* parts grow (at most doubling at each adjustment) until uploading one
+  takes about :data:`TARGET_PART_DURATION` seconds, so that the overhead
+  of each request is small on fast connections;
+* parts shrink (halving at each adjustment) while more than
+  :data:`MAX_ERROR_RATE` of the upload attempts fail, so that retries
+  resend less data on slow or unreliable connections.
+
+Part sizes stay within the limits of the project, and are large enough
+that the rest of the file, if its size is known, fits in the number of
+parts left. If it is not known (e.g. when uploading from stdin), parts
+never shrink below the initial part size, which is chosen so that the
+largest file allowed fits in the number of parts allowed.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import threading
+
+TARGET_PART_DURATION = 10.0
+MAX_ERROR_RATE = 0.1
+# Number of parts uploaded between adjustments
+MIN_SAMPLES = 2
+
+
+class PartSizeController(object):
+    '''
+    :param initial_part_size: Size of the first parts, and smallest part size if *expected_file_size* is not given
+    :type initial_part_size: int
+    :param min_part_size: Smallest part size allowed
+    :type min_part_size: int
+    :param max_part_size: Largest part size allowed
+    :type max_part_size: int
+    :param max_num_parts: Largest number of parts allowed
+    :type max_num_parts: int
+    :param expected_file_size: Size of the file, if known
+    :type expected_file_size: int
+    :param alignment: Part sizes are multiples of this
+    :type alignment: int
+
+    Thread-safe: parts are observed from the upload threads.
+    '''
+    def __init__(self, initial_part_size, min_part_size, max_part_size, max_num_parts, expected_file_size=None,
+                 alignment=1):
+        self.min_part_size = min_part_size
+        self.max_part_size = max_part_size
+        self.max_num_parts = max_num_parts
+        self.expected_file_size = expected_file_size
+        self.alignment = alignment
+        self.initial_part_size = initial_part_size
+        self.part_size = initial_part_size
+        self._lock = threading.Lock()
+        # (size, duration, attempts) of the parts uploaded since the last adjustment
+        self._samples = []
+
+    def observe(self, size, duration, attempts=1):
+        '''
+        :param size: Size of the part, in bytes
+        :type size: int
+        :param duration: Time taken to upload it, including retries, in seconds
+        :type duration: float
+        :param attempts: Number of requests made to upload it
+        :type attempts: int
+        '''
+        with self._lock:
+            self._samples.append((size, duration, attempts))
+
+    def next_part_size(self, bytes_uploaded, num_parts):
+        '''
+        :param bytes_uploaded: Number of bytes of the file in the parts started so far
+        :type bytes_uploaded: int
+        :param num_parts: Number of parts started so far
+        :type num_parts: int
+        :returns: Size of the next part
+        :rtype: int
+        '''
+        with self._lock:
+            size = self.part_size
+            if len(self._samples) >= MIN_SAMPLES:
+                num_attempts = sum(attempts for _size, _duration, attempts in self._samples)
+                duration = sum(duration for _size, duration, _attempts in self._samples)
+                if (num_attempts - len(self._samples)) / num_attempts > MAX_ERROR_RATE:
+                    size //= 2
+                elif duration > 0:
+                    # Throughput of a single connection
+                    throughput = sum(size for size, _duration, _attempts in self._samples) / duration
+                    size = int(max(size // 2, min(size * 2, throughput * TARGET_PART_DURATION)))
+                self._samples = []
+
+            min_size = self.min_part_size
+            if self.expected_file_size is None:
+                min_size = max(min_size, self.initial_part_size)
+            elif num_parts < self.max_num_parts:
+                bytes_left = max(self.expected_file_size - bytes_uploaded, 0)
+                parts_left = self.max_num_parts - num_parts
+                min_size = max(min_size, (bytes_left + parts_left - 1) // parts_left)
+            size = min(max(size, min_size), self.max_part_size)
+            size -= size % self.alignment
+            if size < min_size:
+                size += self.alignment
+            if size > self.max_part_size:
+                size -= self.alignment
+            self.part_size = size
+            return size
@@ -0,0 +1,225 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Adaptive read-ahead for :class:`dxpy.DXFile`.
+
+A :class:`ReadAheadController` decides how large the ranged GET requests
+issued for sequential reads are (the chunk size), and how many of them
+may be in flight or waiting to be consumed at once (the window).
+
+The time a chunk takes to arrive is modelled as ``latency + size /
+bandwidth``, where *latency* covers the round trip and the time to the
+first byte, and *bandwidth* is that of a single connection. Both are
+estimated by a least-squares fit over recently fetched chunks. After
+every round of requests (one window's worth):
+
+* The chunk size is set so that the latency is a small fraction of the
+  time each request takes, i.e. to a few times the bandwidth-delay
+  product of a connection. It at most doubles or halves per round.
+* If the reader had to wait for data, and the throughput of the round
+  improved on the previous one, the window grows: it doubles until the
+  first round in which throughput does not improve, and grows by one
+  request per improving round after that.
+* If nearly every chunk was ready before the reader asked for it, the
+  reader is the bottleneck, and the window is halved (but one chunk is
+  always requested ahead of the one being read).
+* The window and chunk size never exceed a memory limit, by default a
+  quarter of the memory available when the controller is created.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import collections, os, threading, time
+
+DEFAULT_MIN_CHUNK_SIZE = 64 * 1024
+INITIAL_WINDOW = 4
+# At least one chunk beyond the one being consumed is always requested
+MIN_WINDOW = 2
+# The latency of a request should be at most 1/CHUNK_LATENCY_RATIO of its
+# transfer time
+CHUNK_LATENCY_RATIO = 4
+# Throughput has to improve by this factor for a round to count as an
+# improvement
+THROUGHPUT_GROWTH_THRESHOLD = 1.1
+# The reader is considered slow if at least this fraction of the chunks
+# consumed in a round were ready before it asked for them
+SLOW_READER_READY_FRACTION = 0.9
+# A chunk is considered to have been ready if the reader waited at most
+# this long for it, in seconds
+READY_WAIT = 0.001
+NUM_SAMPLES = 32
+
+
+def available_memory():
+    '''
+    :returns: Number of bytes of physical memory currently available, or None if it cannot be determined
+    :rtype: int
+    '''
+    try:
+        return os.sysconf(str('SC_AVPHYS_PAGES')) * os.sysconf(str('SC_PAGE_SIZE'))
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def fit_latency_and_bandwidth(samples):
+    '''
+    :param samples: Sizes, in bytes, and durations, in seconds, of requests
+    :type samples: list of (int, float) tuples
+    :returns: (latency, bandwidth) that best fit ``duration = latency + size / bandwidth``, or None if the samples do not determine them
+    :rtype: tuple
+    '''
+    if len(samples) < 2:
+        return None
+    mean_size = sum(size for size, _ in samples) / len(samples)
+    mean_duration = sum(duration for _, duration in samples) / len(samples)
+    variance = sum((size - mean_size) ** 2 for size, _ in samples)
+    if variance == 0:
+        return None
+    slope = sum((size - mean_size) * (duration - mean_duration) for size, duration in samples) / variance
+    if slope <= 0:
+        return None
+    return max(mean_duration - slope * mean_size, 0.0), 1.0 / slope
+
+
+class ReadAheadController(object):
+    '''
+    :param max_chunk_size: Largest chunk to request, in bytes
+    :type max_chunk_size: int
+    :param max_window: Largest number of chunks in flight or awaiting consumption
+    :type max_window: int
+    :param min_chunk_size: Smallest chunk to request, in bytes; also the size of the first chunks
+    :type min_chunk_size: int
+    :param memory_limit: Largest number of bytes in flight or awaiting consumption
+    :type memory_limit: int
+
+    Thread-safe: chunks are reported by the threads fetching them, and
+    consumption by the reading thread.
+    '''
+    def __init__(self, max_chunk_size, max_window, min_chunk_size=DEFAULT_MIN_CHUNK_SIZE, memory_limit=None):
+        if memory_limit is None:
+            memory = available_memory()
+            memory_limit = memory // 4 if memory else max_chunk_size * max_window
+        self.memory_limit = max(memory_limit, min_chunk_size)
+        self.max_chunk_size = max(min(max_chunk_size, self.memory_limit), 1)
+        self.min_chunk_size = min(min_chunk_size, self.max_chunk_size)
+        self.max_window = max(max_window, 1)
+        self.chunk_size = self.min_chunk_size
+        self.min_window = min(MIN_WINDOW, self.max_window)
+        self.window = min(INITIAL_WINDOW, self.max_window)
+        self.latency, self.bandwidth = None, None
+
+        self._lock = threading.Lock()
+        self._samples = collections.deque(maxlen=NUM_SAMPLES)
+        self._probing = True
+        self._last_throughput = None
+        self._reset_round()
+
+    def _reset_round(self):
+        self._round_started = time.time()
+        self._round_bytes = 0
+        self._round_chunks = 0
+        self._round_ready = 0
+        self._round_waited = False
+
+    def get_chunk_size(self):
+        '''
+        :returns: Size of the next chunk to request, in bytes
+        :rtype: int
+        '''
+        return self.chunk_size
+
+    def get_window(self):
+        '''
+        :returns: Number of chunks that may currently be in flight or awaiting consumption
+        :rtype: int
+        '''
+        return self.window
+
+    def fetch(self, read_range, num_bytes, *args, **kwargs):
+        '''
+        :param read_range: Function that fetches a chunk, e.g. :func:`dxpy._dxhttp_read_range`
+        :type read_range: function
+        :param num_bytes: Size of the chunk
+        :type num_bytes: int
+
+        Calls ``read_range(*args, **kwargs)``, records how long it took,
+        and returns its result.
+        '''
+        started = time.time()
+        data = read_range(*args, **kwargs)
+        with self._lock:
+            self._samples.append((num_bytes, time.time() - started))
+        return data
+
+    def consumed(self, num_bytes, waited):
+        '''
+        :param num_bytes: Size of the chunk consumed
+        :type num_bytes: int
+        :param waited: Time the reader waited for the chunk, in seconds
+        :type waited: float
+
+        Records the consumption of a chunk, and adjusts the chunk size and
+        window at the end of each round.
+        '''
+        with self._lock:
+            self._round_bytes += num_bytes
+            self._round_chunks += 1
+            if waited <= READY_WAIT:
+                self._round_ready += 1
+            else:
+                self._round_waited = True
+            if self._round_chunks >= max(self.window, 2):
+                self._adjust()
+                self._reset_round()
+
+    def _adjust(self):
+        fit = fit_latency_and_bandwidth(list(self._samples))
+        if fit is not None:
+            self.latency, self.bandwidth = fit
+            target = self.bandwidth * self.latency * CHUNK_LATENCY_RATIO
+            chunk_size = self.chunk_size
+            while chunk_size < target and chunk_size < self.chunk_size * 2:
+                chunk_size *= 2
+            if target < chunk_size / 2:
+                chunk_size = max(chunk_size // 2, int(target))
+            self.chunk_size = max(self.min_chunk_size, min(chunk_size, self.max_chunk_size))
+        elif self.chunk_size * 2 <= self.max_chunk_size:
+            # All chunks so far had the same size; vary it to learn more
+            self.chunk_size *= 2
+
+        elapsed = max(time.time() - self._round_started, 1e-6)
+        throughput = self._round_bytes / elapsed
+        if self._round_ready >= SLOW_READER_READY_FRACTION * self._round_chunks:
+            self.window = max(self.window // 2, self.min_window)
+        elif self._round_waited:
+            if self._last_throughput is None or throughput > self._last_throughput * THROUGHPUT_GROWTH_THRESHOLD:
+                self.window = self.window * 2 if self._probing else self.window + 1
+            else:
+                self._probing = False
+            self.window = min(self.window, self.max_window)
+        self._last_throughput = throughput
+
+        self.window = max(min(self.window, self.memory_limit // self.chunk_size), self.min_window)
+
+    def snapshot(self):
+        '''
+        :returns: Current chunk size, window, and latency and bandwidth estimates
+        :rtype: dict
+        '''
+        with self._lock:
+            return {"chunk_size": self.chunk_size, "window": self.window, "latency": self.latency,
+                    "bandwidth": self.bandwidth}
@@ -0,0 +1,284 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Process-wide limits on retries made by :func:`dxpy.DXHTTPRequest`.
+
+* :class:`RetryBudget` caps retries across all threads to a fraction of
+  the requests made, plus a small fixed rate, so that an outage does not
+  multiply the load on the server by the number of retries permitted per
+  request.
+* :class:`CircuitBreaker` tracks consecutive failures per host. Once a
+  host is clearly down, requests to it fail immediately with
+  :exc:`dxpy.exceptions.DXCircuitOpenError`, instead of each one going
+  through its full backoff schedule. After a cool-down period a single
+  probe request is let through; if it succeeds, requests flow again.
+* :func:`backoff_delay` adds jitter to the exponential backoff between
+  retries, so that threads that failed together do not retry together.
+
+Both limits are off by default, since they make requests fail that would
+otherwise be retried. The retry budget is shared by all requests, so a
+long-running upload or download could give up once others have used it
+up. A circuit breaker is shared by all the routes of a host, so failures
+on one route would fail the requests on all the others. Set the
+environment variables ``DX_RETRY_BUDGET`` or
+``DX_CIRCUIT_BREAKER`` to ``1`` to turn the respective limit on.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import random, threading, time
+
+from . import exceptions
+
+# Retries permitted per request made, in the long run
+DEFAULT_RETRY_RATIO = 0.2
+# Retries permitted per second regardless of the number of requests made
+DEFAULT_MIN_RETRIES_PER_SECOND = 10
+# Period, in seconds, over which unused retries can be saved up
+DEFAULT_BUDGET_PERIOD = 10
+
+DEFAULT_FAILURE_THRESHOLD = 10
+DEFAULT_RESET_TIMEOUT = 30
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+
+def backoff_delay(try_index, max_delay):
+    '''
+    :param try_index: Number of retries made so far
+    :type try_index: int
+    :param max_delay: Upper bound on the delay, in seconds
+    :type max_delay: float
+    :returns: Time to wait before the next retry, in seconds
+    :rtype: float
+
+    Exponential backoff with "equal jitter": the delay is chosen at
+    random between half of and the full ``2 ** try_index`` seconds.
+    '''
+    delay = min(2 ** try_index, max_delay)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class RetryBudget(object):
+    '''
+    :param ratio: Number of retries permitted for each request made
+    :type ratio: float
+    :param min_per_second: Number of retries permitted per second in addition to those earned by requests
+    :type min_per_second: float
+    :param period: Time, in seconds, over which unused retries are saved up
+    :type period: float
+
+    Token bucket shared by all threads of the process. Each request
+    deposits *ratio* tokens, tokens are also added at a rate of
+    *min_per_second*, and each retry withdraws one token. The bucket holds
+    at most the tokens earned over *period* seconds.
+    '''
+    def __init__(self, ratio=DEFAULT_RETRY_RATIO, min_per_second=DEFAULT_MIN_RETRIES_PER_SECOND,
+                 period=DEFAULT_BUDGET_PERIOD):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.capacity = max(min_per_second * period, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.time()
+        self._num_denied = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self._tokens + (now - self._updated) * self.min_per_second, self.capacity)
+        self._updated = now
+
+    def record_request(self):
+        '''
+        Records a request made for the first time (i.e. not a retry).
+        '''
+        with self._lock:
+            self._refill(time.time())
+            self._tokens = min(self._tokens + self.ratio, self.capacity)
+
+    def try_retry(self):
+        '''
+        :returns: True if a retry is permitted, in which case it is charged to the budget
+        :rtype: boolean
+        '''
+        with self._lock:
+            self._refill(time.time())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            self._num_denied += 1
+            return False
+
+    def snapshot(self):
+        '''
+        :returns: Retries currently available, and retries denied so far
+        :rtype: dict
+        '''
+        with self._lock:
+            self._refill(time.time())
+            return {"available": int(self._tokens), "denied": self._num_denied}
+
+
+class CircuitBreaker(object):
+    '''
+    :param failure_threshold: Number of consecutive failures after which the circuit opens
+    :type failure_threshold: int
+    :param reset_timeout: Time, in seconds, after which an open circuit lets a probe request through
+    :type reset_timeout: float
+
+    Circuit breaker for a single host, shared by all threads. It is
+
+    * *closed* while requests succeed; all requests are let through.
+    * *open* after *failure_threshold* consecutive failures; requests are
+      rejected.
+    * *half-open* once *reset_timeout* seconds have passed since it
+      opened; one probe request is let through, and the others are
+      rejected until its outcome is known. The circuit closes if the probe
+      succeeds, and opens again otherwise.
+    '''
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_timeout=DEFAULT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._num_failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._probe_started = None
+        self._num_rejected = 0
+        self._num_opened = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        '''
+        One of "closed", "open", or "half-open"
+        '''
+        with self._lock:
+            return self._current_state(time.time())
+
+    def _current_state(self, now):
+        if self._state == OPEN and now >= self._opened_at + self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        elif self._state == HALF_OPEN and self._probe_in_flight and now >= self._probe_started + self.reset_timeout:
+            # The probe is taking long, or its outcome was never reported
+            # (e.g. the thread was interrupted); let another one through
+            self._probe_in_flight = False
+        return self._state
+
+    def before_request(self):
+        '''
+        :returns: True if the request is the probe of a half-open circuit, False otherwise
+        :rtype: boolean
+        :raises: :exc:`~dxpy.exceptions.DXCircuitOpenError` if the request is rejected
+
+        Must be called before each request attempt. If the request is let
+        through, its outcome must be reported with :meth:`record`.
+        '''
+        with self._lock:
+            now = time.time()
+            state = self._current_state(now)
+            if state == CLOSED:
+                return False
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self._probe_started = now
+                return True
+            self._num_rejected += 1
+            retry_in = max(self._opened_at + self.reset_timeout - now, 0)
+        raise exceptions.DXCircuitOpenError(
+            "Requests are failing fast after {} consecutive failures; the next attempt to reach the server will "
+            "be made in {:.0f} seconds".format(self.failure_threshold, retry_in))
+
+    def record(self, ok, is_probe=False):
+        '''
+        :param ok: True if the host responded, False if the request failed in a way that suggests that the host is down, or None if the outcome says neither (e.g. a 503 response)
+        :type ok: boolean or None
+        :param is_probe: The value returned by :meth:`before_request` for this request
+        :type is_probe: boolean
+        '''
+        with self._lock:
+            now = time.time()
+            if is_probe:
+                self._probe_in_flight = False
+            if ok:
+                self._num_failures = 0
+                if is_probe or self._state == HALF_OPEN:
+                    self._state = CLOSED
+            elif ok is None:
+                if is_probe:
+                    # The host is up but asked clients to come back later
+                    self._open(now)
+            else:
+                self._num_failures += 1
+                if is_probe or (self._state == CLOSED and self._num_failures >= self.failure_threshold):
+                    self._open(now)
+
+    def _open(self, now):
+        if self._state != OPEN:
+            self._num_opened += 1
+        self._state = OPEN
+        self._opened_at = now
+
+    def snapshot(self):
+        '''
+        :returns: State, consecutive failures, times opened, and requests rejected
+        :rtype: dict
+        '''
+        with self._lock:
+            return {"state": self._current_state(time.time()),
+                    "consecutive_failures": self._num_failures,
+                    "opened": self._num_opened,
+                    "rejected": self._num_rejected}
+
+
+class CircuitBreakerRegistry(object):
+    '''
+    :param enabled: If False (the default), :meth:`get_breaker` returns None, and requests are never rejected
+    :type enabled: boolean
+
+    Process-wide registry of per-host :class:`CircuitBreaker` objects.
+    '''
+    def __init__(self, enabled=False, failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout=DEFAULT_RESET_TIMEOUT):
+        self.enabled = enabled
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._breakers = {}
+
+    def get_breaker(self, pool_key):
+        '''
+        :param pool_key: (scheme, host, port) of the request, see :func:`dxpy.connection_health.get_pool_key`
+        :returns: The circuit breaker for the host, or None if circuit breaking is disabled
+        :rtype: :class:`CircuitBreaker`
+        '''
+        if not self.enabled:
+            return None
+        with self._lock:
+            breaker = self._breakers.get(pool_key)
+            if breaker is None:
+                breaker = self._breakers[pool_key] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def snapshot(self):
+        '''
+        :returns: State of the circuit breaker of each host, keyed by "scheme://host:port"
+        :rtype: dict
+        '''
+        with self._lock:
+            breakers = list(self._breakers.items())
+        return {"{}://{}:{}".format(*key): breaker.snapshot() for key, breaker in breakers}
@@ -33,10 +33,10 @@ wrap_stdio_in_codecs()
 decode_command_line_args()
 
 import dxpy
-from ..cli import try_call, prompt_for_yn, INTERACTIVE_CLI
+from ..cli import try_call, try_call_err_exit, prompt_for_yn, register_exit_hook, INTERACTIVE_CLI
 from ..cli import workflow as workflow_cli
 from ..cli.cp import cp
-from ..cli.download import (download_one_file, download)
+from ..cli.download import (download_one_file, download, DEFAULT_PARALLEL_FILES)
 from ..cli.parsers import (no_color_arg, delim_arg, env_args, stdout_args, all_arg, json_arg, parser_dataobject_args,
                            parser_single_dataobject_output_args, process_properties_args,
                            find_by_properties_and_tags_args, process_find_by_property_args, process_dataobject_args,
@@ -52,6 +52,8 @@ from ..exceptions import (err_exit, DXError, DXCLIError, DXAPIError, network_exc
 from ..utils import warn, group_array_by_field, normalize_timedelta, normalize_time_input
 
 from ..app_categories import APP_CATEGORIES
+from ..cli.upload import (upload_directory, upload_local_file_from_args, manifest_record as upload_manifest_record,
+                          write_manifest as write_upload_manifest)
 from ..utils.printing import (CYAN, BLUE, YELLOW, GREEN, RED, WHITE, UNDERLINE, BOLD, ENDC, DNANEXUS_LOGO,
                               DNANEXUS_X, set_colors, set_delimiter, get_delimiter, DELIMITER, fill,
                               tty_rows, tty_cols, pager, format_find_results)
@@ -1931,11 +1933,16 @@ def upload(args, **kwargs):
         args.path += "/"
 
     paths = copy.copy(args.filename)
+    uploaded = []
     for path in paths:
         args.filename = path
-        upload_one(args, **kwargs)
+        uploaded.extend(upload_one(args, **kwargs))
+    if args.manifest is not None:
+        try:
+            write_upload_manifest(args.manifest, uploaded)
+        except:
+            err_exit()
 
-upload_seen_paths = set()
 def upload_one(args):
     try_call(process_dataobject_args, args)
 
@@ -1953,39 +1960,26 @@ def upload_one(args):
     if os.path.isdir(args.filename):
         if not args.recursive:
             parser.exit("Error: {f} is a directory but the -r/--recursive option was not given".format(f=args.filename))
-        norm_path = os.path.realpath(args.filename)
-        if norm_path in upload_seen_paths:
-            print("Skipping {f}: directory loop".format(f=args.filename), file=sys.stderr)
-            return
-        else:
-            upload_seen_paths.add(norm_path)
-
-        dir_listing = os.listdir(args.filename)
-        if len(dir_listing) == 0: # Create empty folder
-            dxpy.api.project_new_folder(project, {"folder": os.path.join(folder, os.path.basename(args.filename)),
-                                                  "parents": True})
-        else:
-            for f in dir_listing:
-                sub_args = copy.copy(args)
-                sub_args.mute = True
-                sub_args.filename = os.path.join(args.filename, f)
-                sub_args.path = u"{p}:{f}/{sf}/".format(p=project, f=folder, sf=os.path.basename(args.filename))
-                sub_args.parents = True
-                upload_one(sub_args)
+        return upload_directory(args, project, folder)
     else:
+        if args.resume and args.filename == '-':
+            parser.exit(1, "Error: --resume cannot be used to upload from stdin\n")
         try:
-            dxfile = dxpy.upload_local_file(filename=(None if args.filename == '-' else args.filename),
-                                            file=(sys.stdin.buffer if args.filename == '-' else None),
-                                            name=name,
-                                            tags=args.tags,
-                                            types=args.types,
-                                            hidden=args.hidden,
-                                            project=project,
-                                            properties=args.properties,
-                                            details=args.details,
-                                            folder=folder,
-                                            parents=args.parents,
-                                            show_progress=args.show_progress)
+            if args.filename == '-':
+                dxfile = dxpy.upload_local_file(file=sys.stdin.buffer,
+                                                name=name,
+                                                tags=args.tags,
+                                                types=args.types,
+                                                hidden=args.hidden,
+                                                project=project,
+                                                properties=args.properties,
+                                                details=args.details,
+                                                folder=folder,
+                                                parents=args.parents,
+                                                show_progress=args.show_progress)
+            else:
+                dxfile = upload_local_file_from_args(args, args.filename, project, folder, name, args.parents,
+                                                     args.show_progress)
             if args.wait:
                 dxfile._wait_on_close()
             if args.brief:
@@ -1994,6 +1988,7 @@ def upload_one(args):
                 print_desc(dxfile.describe(incl_properties=True, incl_details=True))
         except:
             err_exit()
+        return [upload_manifest_record(args.filename, dxfile)]
 
 def import_csv(args):
     sys.argv = [sys.argv[0] + ' import csv'] + args.importer_args
@@ -2413,12 +2408,10 @@ def close(args):
 
 def wait(args):
     had_error = False
+    handlers = []
     for path in args.path:
         if is_job_id(path) or is_analysis_id(path):
-            dxexecution = dxpy.get_handler(path)
-            print("Waiting for " + path + " to finish running...")
-            try_call(dxexecution.wait_on_done)
-            print("Done")
+            handlers.append((path, dxpy.get_handler(path)))
         else:
             # Attempt to resolve name
             try:
@@ -2430,10 +2423,26 @@ def wait(args):
                 print(fill('Could not resolve ' + path + ' to a data object'))
                 had_error = True
             else:
-                handler = dxpy.get_handler(entity_result['id'], project=project)
-                print("Waiting for " + path + " to close...")
-                try_call(handler._wait_on_close)
-                print("Done")
+                handlers.append((path, dxpy.get_handler(entity_result['id'], project=project)))
+
+    if len(handlers) == 1:
+        path, handler = handlers[0]
+        if isinstance(handler, (dxpy.DXJob, dxpy.DXAnalysis)):
+            print("Waiting for " + path + " to finish running...")
+            try_call(handler.wait_on_done)
+        else:
+            print("Waiting for " + path + " to close...")
+            try_call(handler._wait_on_close)
+        print("Done")
+    elif len(handlers) > 1:
+        # All are polled together, in batches
+        paths = {handler.get_id(): path for path, handler in handlers}
+        print("Waiting for {n} objects to close or finish running...".format(n=len(handlers)))
+        try:
+            for handler in dxpy.wait_all([handler for _path, handler in handlers], fail_fast=args.fail_fast):
+                print("Done: " + paths[handler.get_id()])
+        except:
+            try_call_err_exit()
 
     if had_error:
         parser.exit(1)
@@ -3472,6 +3481,10 @@ parser = DXArgumentParser(description=DNANEXUS_LOGO() + ' Command-Line Client, A
                           parents=[env_args],
                           usage='%(prog)s [-h] [--version] command ...')
 parser.add_argument('--version', action=PrintDXVersion, nargs=0, help="show program's version number and exit")
+parser.add_argument('--stats', action='store_true',
+                    help="print request counts, latencies, and bytes transferred, per API route, on exit")
+parser.add_argument('--metadata-cache', action='store_true',
+                    help="reuse describe and listFolder results of projects and closed objects for 60 seconds")
 
 subparsers = parser.add_subparsers(help=argparse.SUPPRESS, dest='command')
 subparsers.metavar = 'command'
@@ -3728,8 +3741,13 @@ parser_upload.add_argument('--path', '--destination',
                            nargs='?')
 parser_upload.add_argument('-r', '--recursive', help='Upload directories recursively', action='store_true')
 parser_upload.add_argument('--wait', help='Wait until the file has finished closing', action='store_true')
+parser_upload.add_argument('--resume', help=fill('Keep a local record of the parts uploaded, and if an earlier upload of the same file to the same destination was interrupted, upload only the parts it did not complete', width_adjustment=-24),
+                           action='store_true')
 parser_upload.add_argument('--no-progress', help='Do not show a progress bar', dest='show_progress',
                            action='store_false', default=sys.stderr.isatty())
+parser_upload.add_argument('--parallel-files', help='Number of files to upload at once when uploading a directory (default: %(default)s)',
+                           type=int, default=DEFAULT_PARALLEL_FILES)
+parser_upload.add_argument('--manifest', help=fill('Write a JSON array of the local paths, IDs and projects of the files uploaded to this local file', width_adjustment=-24))
 parser_upload.set_defaults(func=upload, mute=False)
 register_parser(parser_upload, categories='data')
 
@@ -3747,6 +3765,11 @@ parser_download.add_argument('-a', '--all', help='If multiple objects match the
                              action='store_true')
 parser_download.add_argument('--no-progress', help='Do not show a progress bar', dest='show_progress',
                              action='store_false', default=sys.stderr.isatty())
+parser_download.add_argument('--cache-dir', help='Directory of a local cache of downloaded files; files found in it are not downloaded again, and files downloaded are added to it (default: $DX_DOWNLOAD_CACHE_DIR, if set)')
+parser_download.add_argument('--cache-hardlink', help='Serve files from the --cache-dir by hard links where possible (the files created are then read-only)',
+                             action='store_true')
+parser_download.add_argument('--parallel-files', help='Number of files to download at once when downloading several (default: %(default)s)',
+                             type=int, default=DEFAULT_PARALLEL_FILES)
 parser_download.set_defaults(func=download_or_cat)
 register_parser(parser_download, categories='data')
 
@@ -4425,11 +4448,13 @@ parser_close.set_defaults(func=close)
 register_parser(parser_close, categories=('data', 'metadata'))
 
 parser_wait = subparsers.add_parser('wait', help='Wait for data object(s) to close or job(s) to finish',
-                                    description='Polls the state of specified data object(s) or job(s) until they are all in the desired state.  Waits until the "closed" state for a data object, and for any terminal state for a job ("terminated", "failed", or "done").  Exits with a non-zero code if a job reaches a terminal state that is not "done".',
+                                    description='Polls the state of specified data object(s) or job(s) until they are all in the desired state.  Waits until the "closed" state for a data object, and for any terminal state for a job ("terminated", "failed", or "done").  Exits with a non-zero code if a job reaches a terminal state that is not "done".  Several objects are polled together, and printed as they finish.',
                                     prog='dx wait',
                                     parents=[env_args])
 path_action = parser_wait.add_argument('path', help='Path to a data object or job ID to wait for', nargs='+')
 path_action.completer = DXPathCompleter()
+parser_wait.add_argument('--fail-fast', help=fill('When waiting for several objects, exit as soon as any job fails rather than once all have finished', width_adjustment=-24),
+                         action='store_true')
 parser_wait.set_defaults(func=wait)
 register_parser(parser_wait, categories=('data', 'metadata', 'exec'))
 
@@ -4728,6 +4753,9 @@ for category in parser_categories:
 parser_categories['all']['cmds'].sort()
 
 
+def print_request_stats():
+    sys.stderr.write("\n" + dxpy.metrics.format_summary())
+
 def main():
     # Bash argument completer hook
     if '_ARGCOMPLETE' in os.environ:
@@ -4743,6 +4771,10 @@ def main():
         set_cli_colors(args)
         set_delim(args)
         set_env_from_args(args)
+        if args.metadata_cache and 'DX_METADATA_CACHE_TTL' not in os.environ:
+            dxpy.set_metadata_cache()
+        if args.stats:
+            register_exit_hook(print_request_stats)
         try:
             args.func(args)
             # Flush buffered data in stdout before interpreter shutdown to ignore broken pipes
@@ -0,0 +1,147 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Local manifests of file uploads, from which interrupted uploads are resumed.
+
+When :func:`dxpy.upload_local_file` is given a *resume_manifest* (or
+``dx upload --resume`` is used), it records in a local file the remote
+file being uploaded to and the part size, followed by the offset, size and
+MD5 checksum of each part once it has been uploaded. The file holds one
+JSON object per line; the record of each part is appended to it, so the
+cost of recording a part does not grow with the number of parts. If the upload is
+interrupted, running it again with the same manifest uploads to the same
+remote file, and skips the parts that the manifest records and that
+``describe(fields={"parts"})`` reports as complete with the same size and
+checksum. The manifest is discarded, and the upload started over, if the
+local file has changed (its size or modification time differ) or the
+remote file is no longer open.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import hashlib, json, os, tempfile, threading
+
+from .compat import open
+
+
+def default_manifest_path(conf_dir, filename, project, folder, name):
+    '''
+    :param conf_dir: Directory of the user's configuration, e.g. ~/.dnanexus_config
+    :type conf_dir: string
+    :returns: Path of the manifest of the upload of the local file *filename* to *project*:*folder*/*name*
+    :rtype: string
+    '''
+    key = json.dumps([os.path.realpath(filename), project, folder, name])
+    return os.path.join(conf_dir, "upload_manifests", hashlib.sha256(key.encode('utf-8')).hexdigest() + ".json")
+
+
+class UploadManifest(object):
+    '''
+    :param path: Path of the manifest; created, with its directory, if needed
+    :type path: string
+    :param filename: Local file being uploaded
+    :type filename: string
+
+    Loads the manifest at *path*, if it exists and was written for the
+    current contents of *filename*. Thread-safe.
+    '''
+    def __init__(self, path, filename):
+        self.path = path
+        info = os.stat(filename)
+        self._local = {"path": os.path.realpath(filename), "size": info.st_size, "mtime": info.st_mtime}
+        self._lock = threading.Lock()
+        self.file_id, self.project, self.part_size, self.parts = None, None, None, {}
+        try:
+            with open(path, 'rb') as fh:
+                lines = fh.read().decode('utf-8').splitlines()
+            manifest = json.loads(lines[0])
+        except (IOError, OSError, ValueError, IndexError):
+            return
+        if manifest.get("local") == self._local:
+            self.file_id, self.project, self.part_size = manifest["file"], manifest["project"], manifest["partSize"]
+            self.parts = {int(index): part for index, part in manifest["parts"].items()}
+            for line in lines[1:]:
+                try:
+                    part = json.loads(line)
+                except ValueError:
+                    # The last record was cut short by the interruption
+                    break
+                self.parts[part.pop("index")] = part
+
+    def start(self, file_id, project, part_size):
+        '''
+        Records the remote file uploaded to, and the part size, forgetting any parts recorded for another file.
+        '''
+        with self._lock:
+            if (file_id, part_size) != (self.file_id, self.part_size):
+                self.parts = {}
+            self.file_id, self.project, self.part_size = file_id, project, part_size
+            self._save()
+
+    def record(self, index, size, md5):
+        '''
+        Records that part *index* has been uploaded.
+        '''
+        with self._lock:
+            part = {"offset": (index - 1) * self.part_size, "size": size, "md5": md5}
+            self.parts[index] = part
+            with open(self.path, 'ab') as fh:
+                fh.write((json.dumps(dict(part, index=index)) + '\n').encode('utf-8'))
+
+    def completed_parts(self, remote_parts):
+        '''
+        :param remote_parts: "parts" field of the description of the remote file
+        :type remote_parts: dict
+        :returns: Indices of the parts that need not be uploaded again
+        :rtype: set of ints
+        '''
+        completed = set()
+        for index, part in self.parts.items():
+            remote_part = remote_parts.get(str(index))
+            if remote_part is not None and remote_part.get("state") == "complete" and \
+                    remote_part.get("size") == part["size"] and remote_part.get("md5") == part["md5"]:
+                completed.add(index)
+        return completed
+
+    def _save(self):
+        # Rewrites the manifest, with the parts recorded so far; called
+        # with the lock held
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                if not os.path.isdir(directory):
+                    raise
+        manifest = {"local": self._local, "file": self.file_id, "project": self.project, "partSize": self.part_size,
+                    "parts": {str(index): part for index, part in self.parts.items()}}
+        # Written under a temporary name and renamed into place, so that
+        # an interruption never leaves a partial manifest
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(self.path) + ".", suffix=".tmp",
+                                        dir=directory or None)
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write((json.dumps(manifest) + '\n').encode('utf-8'))
+        os.rename(tmp_path, self.path)
+
+    def remove(self):
+        '''
+        Deletes the manifest, once the upload has completed.
+        '''
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
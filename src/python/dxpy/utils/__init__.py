@@ -90,8 +90,9 @@ def response_iterator(request_iterator, thread_pool, max_active_tasks=None):
     :type thread_pool: concurrent.futures.thread.ThreadPoolExecutor
     :param max_active_tasks:
         The maximum number of tasks that may be either running or waiting for consumption of their result.
-        If not given, defaults to the number of CPU cores on the machine.
-    :type max_active_tasks: int
+        If not given, defaults to the number of CPU cores on the machine. If a function, it is called for the
+        current maximum whenever a task could be submitted.
+    :type max_active_tasks: int or function
 
     Rate-limited asynchronous multithreaded task runner.
     Consumes tasks from *request_iterator*. Yields their results in order, while allowing up to *max_active_tasks* to run
@@ -101,6 +102,7 @@ def response_iterator(request_iterator, thread_pool, max_active_tasks=None):
     tasks_in_progress = collections.deque()
     if max_active_tasks is None:
         max_active_tasks = cpu_count()
+    get_max_active_tasks = max_active_tasks if callable(max_active_tasks) else lambda: max_active_tasks
 
     # The following two functions facilitate GC by not adding extra variables to the enclosing scope.
     def submit_task(task_iterator, executor, futures_queue):
@@ -117,19 +119,22 @@ def response_iterator(request_iterator, thread_pool, max_active_tasks=None):
             os._exit(os.EX_IOERR)
         return result
 
-    for _i in range(max_active_tasks):
-        try:
-            submit_task(request_iterator, thread_pool, tasks_in_progress)
-        except StopIteration:
-            break
+    def submit_tasks(task_iterator, executor, futures_queue):
+        # Returns False once the tasks are exhausted
+        while len(futures_queue) < get_max_active_tasks():
+            try:
+                submit_task(task_iterator, executor, futures_queue)
+            except StopIteration:
+                return False
+        return True
+
+    more_tasks = submit_tasks(request_iterator, thread_pool, tasks_in_progress)
 
     while len(tasks_in_progress) > 0:
         result = next_result(tasks_in_progress)
 
-        try:
-            submit_task(request_iterator, thread_pool, tasks_in_progress)
-        except StopIteration:
-            pass
+        if more_tasks:
+            more_tasks = submit_tasks(request_iterator, thread_pool, tasks_in_progress)
 
         yield result
         del result
@@ -26,6 +26,7 @@ from collections import namedtuple
 import pipes
 
 import dxpy
+from .. import json_codec
 from ..compat import USING_PYTHON2, open
 from ..exceptions import AppInternalError
 
@@ -137,7 +138,7 @@ def run(function_name=None, function_input=None):
             function_name = os.environ.get('DX_TEST_FUNCTION', 'main')
         if function_input is None:
             with open("job_input.json", "r") as fh:
-                function_input = json.load(fh)
+                function_input = json_codec.loads(fh.read())
 
         job = {'function': function_name, 'input': function_input}
 
@@ -159,7 +160,7 @@ def run(function_name=None, function_input=None):
         # TODO: protect against client removing its original working directory
         os.chdir(dx_working_dir)
         with open("job_output.json", "wb") as fh:
-            json.dump(result, fh, indent=2, cls=DXJSONEncoder)
+            fh.write(json_codec.dumps(result, indent=2, default=_dxobject_to_dxlink).encode('utf-8'))
             fh.write(b"\n")
 
     return result
@@ -255,6 +256,15 @@ class DXJSONEncoder(json.JSONEncoder):
         # Let the base class default method raise the TypeError
         return json.JSONEncoder.default(self, obj)
 
+def _dxobject_to_dxlink(obj):
+    """
+    *default* hook for :func:`dxpy.json_codec.dumps` that converts DXObject
+    objects into dxlinks, like :class:`DXJSONEncoder`.
+    """
+    if isinstance(obj, dxpy.DXObject):
+        return dxpy.dxlink(obj)
+    raise TypeError(repr(obj) + " is not JSON serializable")
+
 class DXExecDependencyError(AppInternalError):
     pass
 
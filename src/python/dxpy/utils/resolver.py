@@ -212,6 +212,37 @@ def object_exists_in_project(obj_id, proj_id):
     return try_call(dxpy.DXHTTPRequest, '/' + obj_id + '/describe', {'project': proj_id})['project'] == proj_id
 
 
+def any_object_exists_in_project(obj_ids, proj_id):
+    '''
+    :param obj_ids: object IDs
+    :type obj_ids: list of str
+    :param proj_id: project ID
+    :type proj_id: str
+
+    Returns True if any of the specified data objects can be found in the
+    specified project, checking them in batches of up to 1000 with
+    /system/describeDataObjects rather than with one call per object.
+    '''
+    if len(obj_ids) == 1:
+        return object_exists_in_project(obj_ids[0], proj_id)
+    if not is_container_id(proj_id):
+        raise ValueError('Expected %r to be a container ID' % (proj_id,))
+    for i in range(0, len(obj_ids), 1000):
+        batch = [{"id": obj_id, "project": proj_id, "describe": {"fields": {"project": True}}}
+                 for obj_id in obj_ids[i:i + 1000]]
+        try:
+            results = dxpy.api.system_describe_data_objects({"objects": batch})["results"]
+        except dxpy.DXAPIError:
+            # Typically one of the objects is inaccessible; check them one at a time
+            if any(object_exists_in_project(obj["id"], proj_id) for obj in batch):
+                return True
+            continue
+        if any(isinstance(result, dict) and isinstance(result.get("describe"), dict) and
+               result["describe"].get("project") == proj_id for result in results):
+            return True
+    return False
+
+
 # Special characters in bash to be escaped: #?*: ;&`"'/!$({[<>|~
 def escaper(match):
     return "\\" + match.group(0)
@@ -43,6 +43,7 @@ test_dependencies = [line.rstrip() for line in open(os.path.join(os.path.dirname
 dxfs_dependencies = [line.rstrip() for line in open(os.path.join(os.path.dirname(__file__), "requirements_dxfs.txt"))]
 readline_dependencies = [line.rstrip() for line in open(os.path.join(os.path.dirname(__file__), "requirements_readline.txt"))]
 backports_dependencies = [line.rstrip() for line in open(os.path.join(os.path.dirname(__file__), "requirements_backports.txt"))]
+aio_dependencies = [line.rstrip() for line in open(os.path.join(os.path.dirname(__file__), "requirements_aio.txt"))]
 
 # If on Windows, also depend on colorama, which translates ANSI terminal color control sequences into whatever cmd.exe uses.
 if platform.system() == 'Windows':
@@ -66,6 +67,11 @@ if sys.version_info[0] < 3:
     if platform.system() != 'Windows':
         dependencies.extend(dxfs_dependencies)
 
+# dxpy.aio uses async/await syntax, so it is only installed on Python 3.5+
+excluded_packages = ['test']
+if sys.version_info < (3, 5):
+    excluded_packages.append('dxpy.aio')
+
 if 'DNANEXUS_INSTALL_PYTHON_TEST_DEPS' in os.environ:
     dependencies.extend(test_dependencies)
 
@@ -84,13 +90,14 @@ setup(
     url='https://github.com/dnanexus/dx-toolkit',
     zip_safe=False,
     license='Apache Software License',
-    packages = find_packages(exclude=['test']),
+    packages = find_packages(exclude=excluded_packages),
     package_data={'dxpy.templating': template_files},
     scripts = glob.glob(os.path.join(os.path.dirname(__file__), 'scripts', 'dx*')),
     entry_points = {
         "console_scripts": scripts,
     },
     install_requires = dependencies,
+    extras_require = {"aio": aio_dependencies},
     tests_require = test_dependencies,
     test_suite = "test",
     classifiers=[
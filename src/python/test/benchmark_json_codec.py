@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Compares the JSON backends of dxpy.json_codec on representative payloads.
+Does not require access to the platform.
+
+    $ ./benchmark_json_codec.py [--codecs orjson,stdlib] [--seconds 1]
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import argparse, random, time
+
+from dxpy import json_codec
+
+
+def describe_page(num_results=1000):
+    ''' A page of /system/findDataObjects results with full describe hashes '''
+    rng = random.Random(0)
+    return {"results": [{"project": "project-" + "%024d" % i,
+                         "id": "file-" + "%024d" % i,
+                         "describe": {"id": "file-" + "%024d" % i,
+                                      "project": "project-" + "%024d" % i,
+                                      "class": "file",
+                                      "name": "sample_%d_R%d.fastq.gz" % (i, i % 2 + 1),
+                                      "folder": "/reads/batch_%d" % (i // 100),
+                                      "state": "closed",
+                                      "hidden": False,
+                                      "types": [],
+                                      "tags": ["run-%d" % (i % 7), "lane-%d" % (i % 8)],
+                                      "properties": {"sample": "S%05d" % i, "pipeline": "v1.2.3",
+                                                     "comment": "café – re-run"},
+                                      "size": rng.randint(10 ** 6, 10 ** 11),
+                                      "created": 1460000000000 + i, "modified": 1460000000000 + 2 * i,
+                                      "createdBy": {"user": "user-alice", "job": "job-" + "%024d" % i},
+                                      "media": "application/x-gzip",
+                                      "archivalState": "live",
+                                      "parts": {str(p): {"md5": "%032x" % rng.getrandbits(128), "size": 5242880}
+                                                for p in range(1, 4)}}}
+                        for i in range(num_results)],
+            "next": {"project": "project-" + "%024d" % num_results, "id": "file-" + "%024d" % num_results}}
+
+
+def row_batch(num_rows=10000):
+    ''' A batch of GTable rows, as sent by DXGTable.add_rows '''
+    rng = random.Random(0)
+    return [["chr%d" % (i % 22 + 1), i * 100, i * 100 + rng.randint(1, 500), "read_%d" % i,
+             rng.random() * 60, rng.randint(0, 255), i % 2 == 0] for i in range(num_rows)]
+
+
+def job_io(num_files=500):
+    ''' Job input or output with arrays of file links and scalar fields '''
+    return {"reads": [{"$dnanexus_link": {"project": "project-" + "%024d" % i, "id": "file-" + "%024d" % i}}
+                      for i in range(num_files)],
+            "reference": {"$dnanexus_link": "file-" + "x" * 24},
+            "sample_names": ["S%05d" % i for i in range(num_files)],
+            "quality_threshold": 30,
+            "trim": True,
+            "options": {"min_length": 50, "adapter": "AGATCGGAAGAGC", "threads": 16}}
+
+
+PAYLOADS = [("describe page", describe_page), ("row batch", row_batch), ("job I/O", job_io)]
+
+
+def measure(function, seconds):
+    num_calls, started = 0, time.time()
+    while True:
+        function()
+        num_calls += 1
+        elapsed = time.time() - started
+        if elapsed >= seconds:
+            return elapsed / num_calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--codecs', help='Comma-separated backends to compare (default: all available)')
+    parser.add_argument('--seconds', type=float, default=1.0, help='Time to spend on each measurement')
+    args = parser.parse_args()
+
+    names = args.codecs.split(',') if args.codecs else json_codec.available_json_codecs()
+    codecs = [json_codec.get_json_codec(name) for name in names]
+
+    print("{:<14} {:<11} {:>12} {:>12} {:>12} {:>9}".format("payload", "codec", "dumps (ms)", "dumps_bytes",
+                                                             "loads (ms)", "MB/s in"))
+    for payload_name, make_payload in PAYLOADS:
+        payload = make_payload()
+        encoded = json_codec.get_json_codec('stdlib').dumps_bytes(payload)
+        baseline = None
+        for codec in codecs:
+            assert codec.loads(codec.dumps_bytes(payload)) == payload
+            dumps_time = measure(lambda: codec.dumps(payload), args.seconds)
+            dumps_bytes_time = measure(lambda: codec.dumps_bytes(payload), args.seconds)
+            loads_time = measure(lambda: codec.loads(encoded), args.seconds)
+            if baseline is None:
+                baseline = loads_time
+            print("{:<14} {:<11} {:>12.2f} {:>12.2f} {:>12.2f} {:>9.1f}   loads x{:.1f}".format(
+                payload_name, codec.name, dumps_time * 1000, dumps_bytes_time * 1000, loads_time * 1000,
+                len(encoded) / loads_time / 2 ** 20, baseline / loads_time))
+        print("")
+
+
+if __name__ == '__main__':
+    main()
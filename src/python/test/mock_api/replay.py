@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# coding: utf-8
+'''
+Serves the HTTP traffic recorded in a cassette (see dxpy.cassette) in place
+of the API server and of the hosts that files are downloaded from, so that
+dxpy workloads can be profiled without access to the platform.
+
+    DX_RECORD_CASSETTE=find.jsonl dx find data --project project-xxxx
+    ./replay.py --cassette find.jsonl --port 5000 --latency-scale 1 --bandwidth 50M &
+    DX_APISERVER_HOST=localhost DX_APISERVER_PORT=5000 DX_APISERVER_PROTOCOL=http \
+        dx --stats find data --project project-xxxx
+'''
+
+from __future__ import print_function, unicode_literals
+
+import os, sys, time, argparse
+
+from flask import Flask, Response, request, jsonify
+
+from dxpy.cassette import CassettePlayer
+
+
+def parse_size(size):
+    units = {"K": 2 ** 10, "M": 2 ** 20, "G": 2 ** 30}
+    if size[-1:].upper() in units:
+        return float(size[:-1]) * units[size[-1:].upper()]
+    return float(size)
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--cassette", help="Cassette recorded with DX_RECORD_CASSETTE", required=True)
+parser.add_argument("--host", help="Hostname to serve on", default=os.environ.get("DX_APISERVER_HOST", "localhost"))
+parser.add_argument("--port", help="TCP port to serve on", type=int, default=os.environ.get("DX_APISERVER_PORT", 5000))
+parser.add_argument("--latency", help="Delay every response by this many seconds, instead of by the recorded latency",
+                    type=float)
+parser.add_argument("--latency-scale", help="Multiply recorded latencies by this factor (default: 1; 0 to respond "
+                    "immediately)", type=float, default=1.0)
+parser.add_argument("--bandwidth", help="Send response bodies at most this fast, in bytes per second, per response; "
+                    "suffixes K, M, G are accepted (default: unlimited)", type=parse_size)
+args = parser.parse_args()
+
+app = Flask(__name__)
+player = CassettePlayer(args.cassette)
+
+CHUNK_SIZE = 64 * 1024
+
+
+def throttled(body, bandwidth):
+    started = time.time()
+    for offset in range(0, len(body), CHUNK_SIZE):
+        chunk = body[offset:offset + CHUNK_SIZE]
+        yield chunk
+        ahead = (offset + len(chunk)) / bandwidth - (time.time() - started)
+        if ahead > 0:
+            time.sleep(ahead)
+
+
+@app.route("/", defaults={"path": ""}, methods=["GET", "POST", "PUT", "HEAD", "DELETE"])
+@app.route("/<path:path>", methods=["GET", "POST", "PUT", "HEAD", "DELETE"])
+def replay(path):
+    full_path = request.full_path if request.query_string else request.path
+    interaction = player.find(request.method, full_path, request.get_data(), request.headers.get("Range"))
+    if interaction is None:
+        print("No recorded response for", request.method, full_path, file=sys.stderr)
+        return jsonify(dict(error=dict(type="ResourceNotFound",
+                                       message="No recorded response for {} {}".format(request.method,
+                                                                                      full_path)))), 404
+
+    time.sleep(args.latency if args.latency is not None else interaction["latency"] * args.latency_scale)
+    body = player.response_body(interaction, request.url_root)
+    headers = dict(interaction["headers"], **{"Content-Length": str(len(body))})
+    if args.bandwidth:
+        return Response(throttled(body, args.bandwidth), status=interaction["status"], headers=headers)
+    return Response(body, status=interaction["status"], headers=headers)
+
+if __name__ == "__main__":
+    app.run(debug=False, use_reloader=False, threaded=True, host=args.host, port=args.port)
@@ -33,6 +33,7 @@ import dxpy_testutil as testutil
 from dxpy.exceptions import (DXAPIError, DXFileError, DXError, DXJobFailureError, ResourceNotFound)
 from dxpy.utils import pretty_print, warn
 from dxpy.utils.resolver import resolve_path, resolve_existing_path, ResolutionError, is_project_explicit
+from dxpy.compat import USING_PYTHON2
 
 def get_objects_from_listf(listf):
     objects = []
@@ -428,6 +429,23 @@ class TestDXFile(unittest.TestCase):
         dxpy.download_dxfile(self.dxfile, filename=self.new_file.name)
         self.assertTrue(filecmp.cmp(self.foo_file.name, self.new_file.name))
 
+    def test_download_cache(self):
+        self.dxfile = dxpy.upload_local_file(self.foo_file.name, wait_on_close=True)
+        cache_dir = tempfile.mkdtemp()
+        try:
+            dxpy.set_download_cache(cache_dir)
+            dxpy.download_dxfile(self.dxfile.get_id(), self.new_file.name)
+            self.assertTrue(filecmp.cmp(self.foo_file.name, self.new_file.name))
+            self.assertEqual(dxpy._download_cache.snapshot()["entries"], 1)
+
+            os.unlink(self.new_file.name)
+            dxpy.download_dxfile(self.dxfile.get_id(), self.new_file.name)
+            self.assertTrue(filecmp.cmp(self.foo_file.name, self.new_file.name))
+            self.assertEqual(dxpy._download_cache.snapshot()["hits"], 1)
+        finally:
+            dxpy.set_download_cache(None)
+            shutil.rmtree(cache_dir)
+
     @unittest.skipUnless(testutil.TEST_MULTIPLE_USERS, 'skipping test that would require multiple users')
     def test_upload_file_with_custom_auth(self):
         tempdir = tempfile.mkdtemp()
@@ -585,6 +603,19 @@ class TestDXFile(unittest.TestCase):
         finally:
             dxpy.set_job_id(previous_job_id)
 
+    def test_readinto(self):
+        data = (string.ascii_letters + string.digits + '._+') * 4099
+        dxfile = dxpy.DXFile(dxpy.upload_string(data, wait_on_close=True).get_id())
+        buf = bytearray(200000)
+        self.assertEqual(dxfile.readinto(memoryview(buf)[10:150010]), 150000)
+        self.assertEqual(bytes(buf[10:150010]), data[:150000].encode('utf-8'))
+        self.assertEqual(dxfile.tell(), 150000)
+        self.assertEqual(dxfile.readinto(buf), len(data) - 150000)
+        self.assertEqual(bytes(buf[:len(data) - 150000]), data[150000:].encode('utf-8'))
+        self.assertEqual(dxfile.readinto(buf), 0)
+        dxfile.seek(5)
+        self.assertEqual(dxfile.read(10), data[5:15].encode('utf-8'))
+
     def test_iter_dxfile(self):
         dxid = ""
         with dxpy.new_dxfile() as self.dxfile:
@@ -2344,6 +2375,44 @@ class TestHTTPResponses(unittest.TestCase):
         self.assertGreater(end_time - start_time, min_sec_with_retries)
 
 
+@unittest.skipIf(USING_PYTHON2, 'dxpy.aio requires Python 3.5+')
+class TestAsyncHTTPRequests(unittest.TestCase):
+    def setUp(self):
+        setUpTempProjects(self)
+
+    def tearDown(self):
+        tearDownTempProjects(self)
+
+    def run_coroutine(self, coroutine):
+        # No async/await syntax here, so that this file still compiles on Python 2
+        import asyncio, dxpy.aio
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            loop.run_until_complete(dxpy.aio.close())
+            loop.close()
+
+    def test_concurrent_describe(self):
+        import asyncio, dxpy.aio
+        record_ids = [dxpy.new_dxrecord(project=self.proj_id, name=str(i)).get_id() for i in range(20)]
+
+        descriptions = self.run_coroutine(asyncio.gather(*[dxpy.aio.api.record_describe(record_id,
+                                                                                         {"project": self.proj_id})
+                                                           for record_id in record_ids]))
+        self.assertEqual([desc["id"] for desc in descriptions], record_ids)
+        self.assertEqual([desc["name"] for desc in descriptions], [str(i) for i in range(20)])
+
+    def test_errors(self):
+        import dxpy.aio
+        with self.assertRaises(ResourceNotFound):
+            self.run_coroutine(dxpy.aio.api.record_describe("record-" + "0" * 24))
+        resp = self.run_coroutine(dxpy.aio.api.system_find_projects({'limit': 1}, want_full_response=True))
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(resp.headers['x-content-type-options'], 'nosniff')
+
+
 class TestDataobjectFunctions(unittest.TestCase):
     def setUp(self):
         setUpTempProjects(self)
@@ -2429,6 +2498,31 @@ class TestDataobjectFunctions(unittest.TestCase):
         self.assertEqual(handler._name, "swiss-army-knife")
         self.assertEqual(handler._alias, "1.0.0")
 
+    def test_describe_batching(self):
+        records = [dxpy.new_dxrecord(project=self.proj_id, name="record " + str(i), properties={"i": str(i)})
+                   for i in range(10)]
+        missing_record = dxpy.DXRecord("record-" + "0" * 24, project=self.proj_id)
+
+        def describe(handler):
+            try:
+                return handler.describe(fields={"name", "properties"})
+            except ResourceNotFound:
+                return None
+
+        dxpy.enable_describe_batching(window=0.5)
+        try:
+            thread_pool = dxpy.utils.get_futures_threadpool(max_workers=len(records) + 1)
+            descriptions = list(thread_pool.map(describe, records + [missing_record]))
+        finally:
+            dxpy.disable_describe_batching()
+
+        self.assertIsNone(descriptions[-1])
+        for i, (record, desc) in enumerate(zip(records, descriptions)):
+            self.assertEqual(desc["id"], record.get_id())
+            self.assertEqual(desc["name"], "record " + str(i))
+            self.assertEqual(desc["properties"], {"i": str(i)})
+            self.assertEqual(record._desc, desc)
+
 
 class TestResolver(testutil.DXTestCase):
     def setUp(self):
@@ -19,7 +19,7 @@
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
-import unittest, time, json, re, os
+import unittest, time, json, re, os, threading
 import dateutil.parser
 import dxpy
 from dxpy import AppError, AppInternalError, DXFile, DXRecord
@@ -100,6 +100,1399 @@ class TestResponseIterator(unittest.TestCase):
         for i, res in enumerate(response_iterator(tasks(), get_futures_threadpool(5), max_active_tasks=6)):
             self.assertEqual(i, res)
 
+class TestConnectionHealth(unittest.TestCase):
+    def test_get_pool_key(self):
+        from dxpy.connection_health import get_pool_key
+        self.assertEqual(get_pool_key("https://API.dnanexus.com/file-xxxx/download"), ("https", "api.dnanexus.com", 443))
+        self.assertEqual(get_pool_key("http://localhost:8124/system/whoami"), ("http", "localhost", 8124))
+
+    def test_health_tracker(self):
+        from dxpy.connection_health import ConnectionHealthTracker
+        tracker = ConnectionHealthTracker(window_size=10, max_error_rate=0.5, min_errors=3)
+        host, other_host = ("https", "s3.amazonaws.com", 443), ("https", "api.dnanexus.com", 443)
+        for i in range(8):
+            self.assertFalse(tracker.record(host, ok=True))
+            self.assertFalse(tracker.record(other_host, ok=True))
+        # Sporadic errors do not reset the pool
+        self.assertFalse(tracker.record(host, ok=False))
+        self.assertFalse(tracker.record(host, ok=False))
+        self.assertFalse(tracker.record(host, ok=False))
+        self.assertAlmostEqual(tracker.error_rate(host), 0.3)
+        # Errors on one host do not affect the other
+        self.assertEqual(tracker.error_rate(other_host), 0.0)
+        self.assertFalse(tracker.record(host, ok=False))
+        self.assertFalse(tracker.record(host, ok=False))
+        self.assertTrue(tracker.record(host, ok=False))
+        # The window starts over after a reset
+        self.assertEqual(tracker.error_rate(host), 0.0)
+        self.assertFalse(tracker.record(host, ok=False))
+        self.assertEqual(tracker.snapshot()["https://s3.amazonaws.com:443"],
+                         {"requests": 15, "errors": 7, "pool_resets": 1})
+
+
+class TestConcurrencyControl(unittest.TestCase):
+    def test_aimd(self):
+        from dxpy import concurrency_control
+        # Opt-in
+        self.assertIsNone(concurrency_control.ConcurrencyController().get_limiter(("https", "api.dnanexus.com", 443)))
+        limiter = concurrency_control.AdaptiveConcurrencyLimiter(min_limit=2, max_limit=16)
+        self.assertEqual(limiter.limit, 16)
+        for i in range(3):
+            limiter.acquire()
+        sent_at = time.time()
+        # Overload signals from requests that were in flight together only
+        # count once
+        limiter.release(sent_at, overloaded=True)
+        limiter.release(sent_at, overloaded=True)
+        self.assertEqual(limiter.limit, 8)
+        limiter.release(sent_at)
+        self.assertEqual(limiter.limit, 8)
+        # Additive increase: about one per *limit* successful requests
+        for i in range(9):
+            limiter.acquire()
+            limiter.release(time.time())
+        self.assertEqual(limiter.limit, 9)
+        self.assertEqual(limiter.snapshot()["in_flight"], 0)
+
+        for i in range(concurrency_control.MIN_LATENCY_SAMPLES):
+            limiter.acquire()
+            limiter.release(time.time(), latency=0.01)
+        limit_before_slowdown = limiter.limit
+        self.assertGreater(limit_before_slowdown, 9)
+        for i in range(5):
+            limiter.acquire()
+            limiter.release(time.time(), latency=0.1)
+        self.assertLess(limiter.limit, limit_before_slowdown)
+
+    def test_limit_and_pause_apply_across_threads(self):
+        from dxpy.concurrency_control import AdaptiveConcurrencyLimiter
+        import threading
+        limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=4)
+        lock, state = threading.Lock(), {"in_flight": 0, "max_in_flight": 0}
+        def request():
+            limiter.acquire()
+            with lock:
+                state["in_flight"] += 1
+                state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            time.sleep(0.01)
+            with lock:
+                state["in_flight"] -= 1
+            limiter.release(time.time())
+        threads = [threading.Thread(target=request) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(state["max_in_flight"], 4)
+
+        # The host is paused only when the limit is already at its minimum
+        limiter._limit = limiter.min_limit
+        limiter.acquire()
+        limiter.release(time.time(), overloaded=True, retry_after=0.3)
+        start_time = time.time()
+        self.assertGreaterEqual(limiter.acquire(), 0.2)
+        self.assertGreaterEqual(time.time() - start_time, 0.2)
+        limiter.release(time.time())
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_backoff_delay(self):
+        from dxpy.retry_policy import backoff_delay
+        for try_index in range(5):
+            delay = backoff_delay(try_index, 600)
+            self.assertGreaterEqual(delay, 2 ** try_index / 2)
+            self.assertLessEqual(delay, 2 ** try_index)
+        self.assertLessEqual(backoff_delay(20, 600), 600)
+
+    def test_retry_budget(self):
+        from dxpy.retry_policy import RetryBudget
+        budget = RetryBudget(ratio=0.5, min_per_second=0, period=10)
+        budget._tokens = 0
+        self.assertFalse(budget.try_retry())
+        budget.record_request()
+        budget.record_request()
+        self.assertTrue(budget.try_retry())
+        self.assertFalse(budget.try_retry())
+        self.assertEqual(budget.snapshot()["denied"], 2)
+
+    def test_circuit_breaker(self):
+        from dxpy.retry_policy import CircuitBreaker, CircuitBreakerRegistry
+        from dxpy.exceptions import DXCircuitOpenError
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.2)
+        for i in range(2):
+            self.assertFalse(breaker.before_request())
+            breaker.record(False)
+        # A response from the host resets the count; 503s are neutral
+        breaker.record(True)
+        breaker.record(None)
+        breaker.record(False)
+        breaker.record(False)
+        self.assertEqual(breaker.state, "closed")
+        breaker.record(False)
+        self.assertEqual(breaker.state, "open")
+        with self.assertRaises(DXCircuitOpenError):
+            breaker.before_request()
+
+        # After the timeout, one probe is let through at a time
+        time.sleep(0.25)
+        self.assertEqual(breaker.state, "half-open")
+        self.assertTrue(breaker.before_request())
+        with self.assertRaises(DXCircuitOpenError):
+            breaker.before_request()
+        breaker.record(False, is_probe=True)
+        self.assertEqual(breaker.state, "open")
+        time.sleep(0.25)
+        self.assertTrue(breaker.before_request())
+        breaker.record(True, is_probe=True)
+        self.assertEqual(breaker.state, "closed")
+        self.assertEqual(breaker.snapshot()["opened"], 2)
+        # Circuit breakers are opt-in
+        self.assertIsNone(CircuitBreakerRegistry().get_breaker(("https", "api.dnanexus.com", 443)))
+
+    @unittest.skipIf(USING_PYTHON2, 'dxpy.aio requires Python 3.5+')
+    def test_aio_retry_policy(self):
+        import asyncio, aiohttp, dxpy.aio
+        from dxpy.retry_policy import RetryBudget, CircuitBreakerRegistry
+        from dxpy.exceptions import DXCircuitOpenError
+        loop = asyncio.new_event_loop()
+        attempts, delays = [], []
+        def done(exception=None):
+            future = loop.create_future()
+            if exception is None:
+                future.set_result(None)
+            else:
+                future.set_exception(exception)
+            return future
+        class FakeRequest(object):
+            def __aenter__(self):
+                attempts.append(None)
+                return done(aiohttp.ServerDisconnectedError())
+            def __aexit__(self, *args):
+                return done()
+        class FakeSession(object):
+            def request(self, method, url, **kwargs):
+                return FakeRequest()
+        def sleep(delay):
+            delays.append(delay)
+            return done()
+
+        originals = (dxpy.aio._get_session, asyncio.sleep, dxpy._retry_budget, dxpy._circuit_breakers)
+        dxpy.aio._get_session, asyncio.sleep = FakeSession, sleep
+        try:
+            # The budget permits a single retry, after a jittered delay
+            dxpy._retry_budget = RetryBudget(ratio=0, min_per_second=0)
+            with self.assertRaises(aiohttp.ServerDisconnectedError):
+                loop.run_until_complete(dxpy.aio.DXHTTPRequest("/file/new", {}, always_retry=True))
+            self.assertEqual(len(attempts), 2)
+            self.assertEqual(len(delays), 1)
+            self.assertTrue(0.5 <= delays[0] <= 1)
+
+            dxpy._retry_budget = None
+            dxpy._circuit_breakers = CircuitBreakerRegistry(enabled=True, failure_threshold=2)
+            del attempts[:]
+            with self.assertRaises(DXCircuitOpenError):
+                loop.run_until_complete(dxpy.aio.DXHTTPRequest("/file/new", {}, always_retry=True))
+            self.assertEqual(len(attempts), 2)
+        finally:
+            dxpy.aio._get_session, asyncio.sleep, dxpy._retry_budget, dxpy._circuit_breakers = originals
+            loop.close()
+
+
+class TestMetrics(unittest.TestCase):
+    def test_route_for_path(self):
+        from dxpy.metrics import route_for_path
+        self.assertEqual(route_for_path("/file-B0123456789ABCDEFGHIJKLM/describe"), "/file-xxxx/describe")
+        self.assertEqual(route_for_path("/system/findDataObjects"), "/system/findDataObjects")
+        self.assertEqual(route_for_path("/app-bwa_mem/1.0.0/run"), "/app-xxxx/run")
+        self.assertEqual(route_for_path("/app-bwa_mem/run"), "/app-xxxx/run")
+
+    def test_registry(self):
+        from dxpy.metrics import MetricsRegistry
+        registry = MetricsRegistry()
+        for latency in (0.02, 0.03, 0.2, 3):
+            registry.observe_request("POST", "/file-xxxx/describe", 200, latency, request_bytes=10,
+                                     response_bytes=100)
+        registry.observe_request("POST", "/file-xxxx/describe", None, 0.5)
+        registry.observe_retry("POST", "/file-xxxx/describe", "BadStatusLine")
+        registry.observe_pool_wait("GET", "example.com", 0.002)
+
+        snapshot = registry.snapshot()
+        route = snapshot["POST /file-xxxx/describe"]
+        self.assertEqual(route["responses"], {"200": 4, "error": 1})
+        self.assertEqual(route["latency"]["count"], 5)
+        self.assertEqual(route["latency"]["buckets"]["0.05"], 2)
+        self.assertEqual(route["latency"]["buckets"]["+Inf"], 5)
+        self.assertEqual((route["request_bytes"], route["response_bytes"]), (40, 400))
+        self.assertEqual(route["retries"], {"BadStatusLine": 1})
+        self.assertEqual(snapshot["GET example.com"]["pool_wait"]["count"], 1)
+
+        text = registry.to_prometheus()
+        self.assertIn('dxpy_requests_total{method="POST",route="/file-xxxx/describe",status="error"} 1', text)
+        self.assertIn('dxpy_request_duration_seconds_bucket{le="+Inf",method="POST",route="/file-xxxx/describe"} 5',
+                      text)
+        self.assertIn('dxpy_retries_total{cause="BadStatusLine",method="POST",route="/file-xxxx/describe"} 1', text)
+        self.assertIn("POST /file-xxxx/describe", registry.format_summary())
+
+    def test_hedged_files_limit(self):
+        from dxpy import metrics
+        registry = metrics.MetricsRegistry()
+        for i in range(metrics.MAX_HEDGED_FILES + 10):
+            registry.observe_hedge("file-{}".format(i), won=i % 2 == 0)
+        registry.observe_hedge("file-0", won=False)
+        hedges = registry.hedge_snapshot()
+        self.assertEqual(len(hedges), metrics.MAX_HEDGED_FILES + 1)
+        self.assertEqual(hedges["file-0"], {"hedges": 2, "won": 1})
+        self.assertEqual(hedges["other"], {"hedges": 10, "won": 5})
+
+
+class TestCassette(unittest.TestCase):
+    def test_record_and_replay(self):
+        import io, shutil, tempfile
+        from requests.packages import urllib3
+        from dxpy.cassette import CassetteRecorder, CassettePlayer
+
+        def response(body, content_type):
+            return urllib3.HTTPResponse(body=io.BytesIO(body), headers={"Content-Type": content_type}, status=200,
+                                        preload_content=True)
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(temp_dir, "cassette.jsonl")
+            recorder = CassetteRecorder(path)
+            url_response = b'{"url": "https://dl.example.com/F/D?token=1"}'
+            recorder.record("POST", "https://api.example.com/file-xxxx/download", {}, b'{"duration": 3600}',
+                            response(url_response, "application/json"), time.time())
+            for body in (b'{"n": 1}', b'{"n": 2}'):
+                recorder.record("POST", "https://api.example.com/system/whoami", {}, b'{}',
+                                response(body, "application/json"), time.time())
+            recorder.record("GET", "https://dl.example.com/F/D?token=1", {"Range": "bytes=0-3"}, '',
+                            response(b'\x00\x01\x02\xff', "application/octet-stream"), time.time(), api=False)
+
+            player = CassettePlayer(path)
+            interaction = player.find("POST", "/file-xxxx/download", b'{"duration":3600}')
+            self.assertEqual(json.loads(player.response_body(interaction, "http://localhost:5000/").decode()),
+                             {"url": "http://localhost:5000/_replay/https/dl.example.com/F/D?token=1"})
+            # Responses recorded for the same request are served in turn;
+            # unmatched bodies fall back to the path
+            for expected_n in (1, 2, 2):
+                interaction = player.find("POST", "/system/whoami", b'{"nonce": "x"}')
+                self.assertEqual(json.loads(player.response_body(interaction, "")), {"n": expected_n})
+            interaction = player.find("GET", "/_replay/https/dl.example.com/F/D?token=1", b'', "bytes=0-3")
+            self.assertEqual(player.response_body(interaction, ""), b'\x00\x01\x02\xff')
+            self.assertIsNone(player.find("GET", "/_replay/https/dl.example.com/F/D?token=1", b'', "bytes=4-7"))
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+class TestMetadataCache(unittest.TestCase):
+    def test_caching_and_invalidation(self):
+        from dxpy.metadata_cache import MetadataCache, is_read_only
+        project_id, file_id = "project-" + "0" * 24, "file-" + "1" * 24
+        cache = MetadataCache(ttl=60, max_entries=2)
+        self.assertIsNone(cache.key_for("/job-" + "2" * 24 + "/describe", {}))
+        self.assertTrue(is_read_only("/system/findDataObjects"))
+        self.assertFalse(is_read_only("/%s/rename" % (file_id,)))
+
+        file_key = cache.key_for("/%s/describe" % (file_id,), {"project": project_id, "fields": {"name": True}})
+        generation, value = cache.get(file_key)
+        self.assertIsNone(value)
+        # Objects that are not closed may change without an API call
+        cache.put(file_key, {"id": file_id, "state": "closing"}, generation)
+        self.assertIsNone(cache.get(file_key)[1])
+        cache.put(file_key, {"id": file_id, "state": "closed"}, generation)
+        generation, value = cache.get(file_key)
+        self.assertEqual(value, {"id": file_id, "state": "closed"})
+        value["state"] = "modified by the caller"
+        self.assertEqual(cache.get(file_key)[1]["state"], "closed")
+
+        # A mutation of the project the object was described in evicts it,
+        # and results read concurrently with the mutation are not cached
+        list_key = cache.key_for("/%s/listFolder" % (project_id,), {"folder": "/"})
+        list_generation = cache.get(list_key)[0]
+        cache.invalidate("/%s/renameFolder" % (project_id,), b'{"folder": "/a", "name": "b"}')
+        self.assertIsNone(cache.get(file_key)[1])
+        cache.put(list_key, {"objects": [], "folders": []}, list_generation)
+        self.assertIsNone(cache.get(list_key)[1])
+
+        # LRU eviction and expiry
+        for i in range(3):
+            key = cache.key_for("/project-%024d/describe" % i, {})
+            cache.put(key, {"id": "project-%024d" % i}, cache.get(key)[0])
+        self.assertEqual(cache.snapshot()["entries"], 2)
+        self.assertIsNone(cache.get(cache.key_for("/project-%024d/describe" % 0, {}))[1])
+        cache.ttl = -1
+        key = cache.key_for("/project-%024d/describe" % 5, {})
+        cache.put(key, {"id": "project-%024d" % 5}, cache.get(key)[0])
+        self.assertIsNone(cache.get(key)[1])
+
+
+class TestDXFileReads(unittest.TestCase):
+    def make_dxfile(self, data, chunk_size):
+        # A handler whose reads are served from *data*, in chunks of
+        # *chunk_size* bytes, instead of by the platform
+        dxfile = DXFile("file-" + "0" * 24)
+        dxfile._file_length = len(data)
+        def generate_read_requests(start_pos=0, **kwargs):
+            for chunk_start in range(start_pos, len(data), chunk_size):
+                yield (lambda start: data[start:start + chunk_size]), [chunk_start], {}
+        dxfile._generate_read_requests = generate_read_requests
+        return dxfile
+
+    def test_read_and_readinto(self):
+        data = bytes(bytearray(range(256))) * 40
+        dxfile = self.make_dxfile(data, 1000)
+        self.assertEqual(dxfile.read(10), data[:10])
+        self.assertEqual(dxfile.read(2500), data[10:2510])
+        buf = bytearray(3000)
+        self.assertEqual(dxfile.readinto(memoryview(buf)[100:]), 2900)
+        self.assertEqual(bytes(buf[100:]), data[2510:5410])
+        self.assertEqual(dxfile.tell(), 5410)
+
+        # Seeks within the current chunk, or to its end, keep the requests
+        # in flight
+        dxfile.seek(5100)
+        self.assertEqual(dxfile.read(5), data[5100:5105])
+        dxfile.seek(6000)
+        self.assertIsNotNone(dxfile._response_iterator)
+        self.assertEqual(dxfile.read(3), data[6000:6003])
+        dxfile.seek(100)
+        self.assertIsNone(dxfile._response_iterator)
+        self.assertEqual(dxfile.read(), data[100:])
+        self.assertEqual(dxfile.read(), b"")
+        self.assertEqual(dxfile.readinto(buf), 0)
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_lru_and_disk_tier(self):
+        import shutil, tempfile
+        from dxpy.block_cache import BlockCache
+        file_id = "file-" + "0" * 24
+        disk_dir = tempfile.mkdtemp()
+        try:
+            cache = BlockCache(memory_limit=300, block_size=100, disk_dir=disk_dir, disk_limit=250)
+            for index in range(3):
+                cache.put(file_id, index, bytes(bytearray([index])) * 100)
+            self.assertEqual(cache.get(file_id, 0), b"\x00" * 100)
+            # Block 1 is the least recently used one, and is spilled to disk
+            cache.put(file_id, 3, b"\x03" * 100)
+            self.assertEqual(cache.snapshot()["memory_blocks"], 3)
+            self.assertEqual(cache.snapshot()["disk_blocks"], 1)
+            self.assertEqual(cache.get(file_id, 1), b"\x01" * 100)
+            self.assertEqual(cache.snapshot()["disk_hits"], 1)
+            self.assertIsNone(cache.get(file_id, 4))
+            self.assertIsNone(cache.get("file-" + "1" * 24, 0))
+            self.assertEqual(cache.snapshot()["misses"], 2)
+
+            # The disk tier is reused by other caches, and bounded
+            cache.clear()
+            for index in range(4, 8):
+                cache.put(file_id, index, bytes(bytearray([index])) * 100)
+            self.assertLessEqual(cache.snapshot()["disk_bytes"], 250)
+            other_cache = BlockCache(memory_limit=300, block_size=100, disk_dir=disk_dir)
+            self.assertEqual(other_cache.snapshot()["disk_blocks"], 2)
+            self.assertEqual(other_cache.get(file_id, 4), b"\x04" * 100)
+            # Blocks of another size are not used
+            self.assertEqual(BlockCache(block_size=200, disk_dir=disk_dir).snapshot()["disk_blocks"], 0)
+
+            # A directory that does not exist is created readable only by the user
+            new_dir = os.path.join(disk_dir, "new")
+            BlockCache(disk_dir=new_dir)
+            self.assertEqual(os.stat(new_dir).st_mode & 0o777, 0o700)
+        finally:
+            shutil.rmtree(disk_dir)
+
+    def test_dxfile_random_access(self):
+        data = bytes(bytearray(range(256))) * 40
+        requests = []
+        def read_range(url, headers, start_pos, end_pos, timeout, sub_range=True):
+            requests.append((start_pos, end_pos))
+            return data[start_pos:end_pos + 1]
+        orig_read_range = dxpy._dxhttp_read_range
+        dxpy._dxhttp_read_range = read_range
+        dxpy.set_block_cache(memory_limit=1000 * 1000, block_size=1000)
+        try:
+            for i in range(2):
+                dxfile = DXFile("file-" + "0" * 24)
+                dxfile._file_length = len(data)
+                dxfile.get_download_url = lambda **kwargs: ("http://localhost/", {})
+                dxfile.seek(8100)
+                self.assertEqual(dxfile.read(500), data[8100:8600])
+                dxfile.seek(1500)
+                self.assertEqual(dxfile.read(1000), data[1500:2500])
+                dxfile.seek(8500)
+                self.assertEqual(dxfile.read(), data[8500:])
+                # Each block is downloaded at most once. Read-ahead grows
+                # only with sequential reads, so the blocks in between
+                # are not requested
+                self.assertEqual(len(requests), len(set(requests)))
+                self.assertIn((10000, 10239), requests)
+                self.assertNotIn((6000, 6999), requests)
+                self.assertNotIn((0, 999), requests)
+        finally:
+            dxpy._dxhttp_read_range = orig_read_range
+            dxpy.set_block_cache(None)
+
+
+class TestDownloadCache(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tempdir)
+
+    def make_file(self, name, data):
+        path = os.path.join(self.tempdir, name)
+        with open(path, "wb") as fh:
+            fh.write(data)
+        return path
+
+    def parts_for(self, data):
+        import hashlib
+        return {"1": {"size": len(data), "md5": hashlib.md5(data).hexdigest()}}
+
+    def test_add_and_fetch(self):
+        from dxpy.download_cache import DownloadCache
+        for link in ("auto", "hardlink"):
+            cache = DownloadCache(os.path.join(self.tempdir, "cache-" + link), max_size=250, link=link)
+            file_id, data = "file-" + "0" * 24, b"a" * 100
+            dest = os.path.join(self.tempdir, "dest")
+            self.assertIsNone(cache.fetch(file_id, self.parts_for(data), dest))
+            cache.add(file_id, self.parts_for(data), self.make_file("downloaded", data))
+            self.assertIn(cache.fetch(file_id, self.parts_for(data), dest), ("hardlink", "reflink", "copy"))
+            with open(dest, "rb") as fh:
+                self.assertEqual(fh.read(), data)
+            # Other versions of the file, and files without checksums, are not served
+            self.assertIsNone(cache.fetch(file_id, self.parts_for(b"b" * 100), dest))
+            cache.add(file_id, {"1": {"size": 100}}, self.make_file("no_md5", data))
+            self.assertEqual(cache.snapshot()["entries"], 1)
+            self.assertEqual(cache.snapshot()["hits"], 1)
+            os.unlink(dest)
+            os.unlink(os.path.join(self.tempdir, "downloaded"))
+
+    def test_fetch_onto_own_hardlink(self):
+        from dxpy.download_cache import DownloadCache
+        cache = DownloadCache(os.path.join(self.tempdir, "cache"), link="hardlink")
+        file_id, data = "file-" + "0" * 24, b"a" * 100
+        dest = self.make_file("out", data)
+        cache.add(file_id, self.parts_for(data), dest)
+        # Downloading again to a path that is already linked to the entry
+        # leaves no temporary file behind
+        for i in range(2):
+            self.assertTrue(cache.fetch(file_id, self.parts_for(data), dest))
+        self.assertEqual(sorted(os.listdir(self.tempdir)), ["cache", "out"])
+        with open(dest, "rb") as fh:
+            self.assertEqual(fh.read(), data)
+
+    def test_eviction(self):
+        from dxpy.download_cache import DownloadCache
+        cache = DownloadCache(os.path.join(self.tempdir, "cache"), max_size=250)
+        dest = os.path.join(self.tempdir, "dest")
+        file_ids = ["file-" + str(i) * 24 for i in range(3)]
+        data = b"a" * 100
+        cache.add(file_ids[0], self.parts_for(data), self.make_file("f0", data))
+        cache.add(file_ids[1], self.parts_for(data), self.make_file("f1", data))
+        entries = sorted(os.listdir(cache.directory))
+        # Make the first file the most recently used one
+        os.utime(os.path.join(cache.directory, [e for e in entries if e.startswith(file_ids[1])][0]),
+                 (time.time() - 60, time.time() - 60))
+        self.assertTrue(cache.fetch(file_ids[0], self.parts_for(data), dest))
+        cache.add(file_ids[2], self.parts_for(data), self.make_file("f2", data))
+        self.assertEqual(cache.snapshot()["entries"], 2)
+        self.assertIsNone(cache.fetch(file_ids[1], self.parts_for(data), dest))
+        self.assertTrue(cache.fetch(file_ids[0], self.parts_for(data), dest))
+        self.assertTrue(cache.fetch(file_ids[2], self.parts_for(data), dest))
+
+
+class TestDownloadDXFile(unittest.TestCase):
+    def test_out_of_order_chunks(self):
+        import hashlib, random, tempfile
+        from dxpy.bindings import dxfile_functions
+        from dxpy.exceptions import DXChecksumMismatchError
+        part_size, num_parts = 1024 * 1024, 3
+        data = os.urandom(part_size * num_parts)
+        parts = {str(i + 1): {"size": part_size, "md5": hashlib.md5(data[i * part_size:(i + 1) * part_size]).hexdigest()}
+                 for i in range(num_parts)}
+        chunks_completed = []
+        def read_range(url, headers, start_pos, end_pos, timeout, sub_range=True):
+            # Chunks complete in a random order
+            time.sleep(random.random() / 20)
+            chunks_completed.append(start_pos)
+            return data[start_pos:end_pos + 1]
+        def make_handler():
+            dxfile = DXFile("file-" + "0" * 24)
+            dxfile.describe = lambda **kwargs: {"id": dxfile.get_id(), "parts": parts, "size": len(data),
+                                                "state": "closed"}
+            dxfile.get_download_url = lambda **kwargs: ("http://localhost/", {})
+            return dxfile
+
+        orig_read_range, orig_min_buffer_size = dxpy._dxhttp_read_range, dxfile_functions.dxfile.MIN_BUFFER_SIZE
+        dxpy._dxhttp_read_range = read_range
+        # Several chunks per part
+        dxfile_functions.dxfile.MIN_BUFFER_SIZE = 256 * 1024
+        fd, filename = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            dxpy.download_dxfile(make_handler(), filename)
+            with open(filename, "rb") as fh:
+                self.assertEqual(fh.read(), data)
+            self.assertEqual(len(chunks_completed), 12)
+            dxpy.download_dxfile(make_handler(), filename, append=True)
+            with open(filename, "rb") as fh:
+                self.assertEqual(fh.read(), data + data)
+
+            parts["2"]["md5"] = "0" * 32
+            os.unlink(filename)
+            with self.assertRaises(DXChecksumMismatchError):
+                dxpy.download_dxfile(make_handler(), filename)
+        finally:
+            dxpy._dxhttp_read_range = orig_read_range
+            dxfile_functions.dxfile.MIN_BUFFER_SIZE = orig_min_buffer_size
+            os.unlink(filename)
+
+    def test_describe_output(self):
+        import hashlib, shutil, tempfile
+        data = b"remote-contents"
+        file_id = "file-" + "0" * 24
+        desc = {"id": file_id, "parts": {"1": {"size": len(data), "md5": hashlib.md5(data).hexdigest()}},
+                "size": len(data), "state": "closed"}
+        def describe(*args, **kwargs):
+            raise AssertionError("The file should not be described again")
+
+        orig_read_range, orig_cache = dxpy._dxhttp_read_range, dxpy._download_cache
+        orig_describe, orig_get_download_url = DXFile.describe, DXFile.get_download_url
+        dxpy._dxhttp_read_range = lambda url, headers, start_pos, end_pos, timeout, sub_range=True: \
+            data[start_pos:end_pos + 1]
+        DXFile.describe = describe
+        DXFile.get_download_url = lambda self, **kwargs: ("http://localhost/", {})
+        tempdir = tempfile.mkdtemp()
+        filename = os.path.join(tempdir, "dest")
+        try:
+            for cache_dir in (None, os.path.join(tempdir, "cache")):
+                dxpy.set_download_cache(cache_dir)
+                for dxid in (file_id, DXFile(file_id)):
+                    entries = dxpy._download_cache.snapshot()["entries"] if cache_dir is not None else 0
+                    with open(filename, "wb") as fh:
+                        fh.write(b"PREFIX-")
+                    dxpy.download_dxfile(dxid, filename, append=True, describe_output=desc)
+                    with open(filename, "rb") as fh:
+                        self.assertEqual(fh.read(), b"PREFIX-" + data)
+                    # The appended file is not added to the cache
+                    if cache_dir is not None:
+                        self.assertEqual(dxpy._download_cache.snapshot()["entries"], entries)
+                    os.unlink(filename)
+                    dxpy.download_dxfile(dxid, filename, describe_output=desc)
+                    with open(filename, "rb") as fh:
+                        self.assertEqual(fh.read(), data)
+                    os.unlink(filename)
+                if cache_dir is not None:
+                    self.assertEqual(dxpy._download_cache.snapshot()["entries"], 1)
+                    self.assertEqual(dxpy._download_cache.snapshot()["hits"], 1)
+        finally:
+            dxpy._dxhttp_read_range = orig_read_range
+            dxpy._download_cache = orig_cache
+            DXFile.describe, DXFile.get_download_url = orig_describe, orig_get_download_url
+            shutil.rmtree(tempdir)
+
+
+class TestHedging(unittest.TestCase):
+    def test_hedge_policy(self):
+        import concurrent.futures
+        from dxpy import hedging
+        from dxpy.hedging import HedgePolicy
+        from dxpy import metrics
+        metrics.reset()
+        policy = HedgePolicy(percentile=0.9, min_samples=10, max_hedge_ratio=0.2)
+        self.assertIsNone(policy.hedge_delay(1024))
+        def fast_attempt():
+            time.sleep(0.01)
+            return b"x"
+        for i in range(10):
+            self.assertEqual(policy.call(fast_attempt, 1024, label="file-a"), b"x")
+        # Durations of smaller requests are scaled up to the size of larger ones
+        self.assertGreater(policy.hedge_delay(1024 * 1024), policy.hedge_delay(1024))
+
+        # A straggler is hedged, and the hedge completes first
+        calls = []
+        def attempt():
+            calls.append(None)
+            if len(calls) == 1:
+                time.sleep(1)
+                return b"slow"
+            return b"fast"
+        started = time.time()
+        self.assertEqual(policy.call(attempt, 1024, label="file-a"), b"fast")
+        self.assertLess(time.time() - started, 0.5)
+        self.assertEqual(len(calls), 2)
+
+        # The result of the other request is used if one fails
+        calls = []
+        def failing_attempt():
+            calls.append(None)
+            if len(calls) == 1:
+                time.sleep(0.2)
+                return b"slow"
+            raise IOError()
+        self.assertEqual(policy.call(failing_attempt, 1024, label="file-b"), b"slow")
+        self.assertEqual(metrics.hedges(), {"file-a": {"hedges": 1, "won": 1}, "file-b": {"hedges": 1, "won": 0}})
+        self.assertIn('dxpy_hedged_reads_total{file="file-a"} 1', metrics.to_prometheus())
+
+        # Hedges are limited to a fraction of all requests
+        self.assertEqual(policy.snapshot(), {"requests": 12, "hedges": 2})
+        calls = []
+        self.assertEqual(policy.call(attempt, 1024, label="file-a"), b"slow")
+        self.assertEqual(len(calls), 1)
+
+        # Primary requests do not wait for the threads on which hedges are sent
+        release = threading.Event()
+        executor = policy._get_executor()
+        blockers = [executor.submit(release.wait) for i in range(hedging.MAX_HEDGE_THREADS)]
+        try:
+            started = time.time()
+            self.assertEqual(policy.call(fast_attempt, 1024, label="file-c"), b"x")
+            self.assertLess(time.time() - started, 0.5)
+        finally:
+            release.set()
+            concurrent.futures.wait(blockers)
+        metrics.reset()
+
+
+class TestUploadParts(unittest.TestCase):
+    def test_prepared_parts(self):
+        import hashlib
+        uploads, puts = [], {}
+        lock = threading.Lock()
+        def file_upload(object_id, input_params, **kwargs):
+            with lock:
+                uploads.append(input_params["index"])
+            # The URL of part 3 expires before it is used
+            expires = 0 if input_params["index"] == 3 and uploads.count(3) == 1 else time.time() * 1000 + 3600000
+            return {"url": "https://upload/{}/{}".format(input_params["index"], uploads.count(input_params["index"])),
+                    "headers": {"Content-MD5": input_params["md5"]}, "expires": expires}
+        def http_request(get_url_and_headers, data, **kwargs):
+            url, headers = get_url_and_headers()
+            self.assertEqual(hashlib.md5(data).hexdigest(), headers["Content-MD5"])
+            with lock:
+                puts[url] = bytes(bytearray(data))
+
+        orig_file_upload, orig_http_request = dxpy.api.file_upload, dxpy.DXHTTPRequest
+        dxpy.api.file_upload, dxpy.DXHTTPRequest = file_upload, http_request
+        try:
+            dxfile = DXFile("file-" + "0" * 24)
+            dxfile._write_bufsize = 1024
+            data = os.urandom(4 * 1024 + 100)
+            dxfile.write(data)
+            dxfile.flush()
+        finally:
+            dxpy.api.file_upload, dxpy.DXHTTPRequest = orig_file_upload, orig_http_request
+        # Each part's URL is requested once, ahead of its upload, unless it
+        # expired first
+        self.assertEqual(sorted(uploads), [1, 2, 3, 3, 4, 5])
+        self.assertEqual(sorted(puts), ["https://upload/1/1", "https://upload/2/1", "https://upload/3/2",
+                                        "https://upload/4/1", "https://upload/5/1"])
+        self.assertEqual(b"".join(puts[url] for url in sorted(puts)), data)
+        self.assertEqual(dxfile._num_uploaded_parts, 5)
+
+
+    def test_resumed_upload(self):
+        import mmap, shutil, tempfile
+        from dxpy.upload_manifest import UploadManifest
+        part_size = mmap.ALLOCATIONGRANULARITY
+        files = {}
+        failing_parts = set([3, 4, 5, 6])
+        in_flight = [0]
+        lock = threading.Lock()
+        def file_new(input_params, **kwargs):
+            file_id = "file-{:024d}".format(len(files))
+            files[file_id] = {"state": "open", "parts": {}}
+            return {"id": file_id}
+        def project_describe(object_id, input_params, **kwargs):
+            return {"fileUploadParameters": {"maximumNumParts": 10000, "minimumPartSize": part_size,
+                                             "maximumPartSize": part_size, "maximumFileSize": 2 ** 40,
+                                             "emptyLastPartAllowed": True}}
+        def file_describe(object_id, input_params, **kwargs):
+            return {"id": object_id, "state": files[object_id]["state"], "parts": files[object_id]["parts"]}
+        def file_upload(object_id, input_params, **kwargs):
+            return {"url": json.dumps([object_id, input_params]), "headers": {}}
+        def http_request(get_url_and_headers, data, **kwargs):
+            url, headers = get_url_and_headers()
+            object_id, input_params = json.loads(url)
+            with lock:
+                in_flight[0] += 1
+            try:
+                if input_params["index"] in failing_parts:
+                    raise IOError("Interrupted")
+                with lock:
+                    uploaded.append(input_params["index"])
+                    files[object_id]["parts"][str(input_params["index"])] = {
+                        "state": "complete", "size": input_params["size"], "md5": input_params["md5"],
+                        "data": bytes(bytearray(data))}
+            finally:
+                with lock:
+                    in_flight[0] -= 1
+        def file_close(object_id, *args, **kwargs):
+            files[object_id]["state"] = "closed"
+
+        originals = (dxpy.api.file_new, dxpy.api.project_describe, DXFile._describe, dxpy.api.file_upload,
+                     dxpy.DXHTTPRequest, dxpy.api.file_close)
+        dxpy.api.file_new, dxpy.api.project_describe, dxpy.api.file_upload = file_new, project_describe, file_upload
+        DXFile._describe, dxpy.DXHTTPRequest, dxpy.api.file_close = staticmethod(file_describe), http_request, file_close
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filename, manifest = os.path.join(tmpdir, "data"), os.path.join(tmpdir, "manifests", "data.json")
+            data = os.urandom(part_size * 5 + 100)
+            with open(filename, "wb") as fh:
+                fh.write(data)
+
+            uploaded = []
+            with self.assertRaises(IOError):
+                dxpy.upload_local_file(filename, project="project-" + "0" * 24, resume_manifest=manifest)
+            # No part is still being uploaded once the failure is raised,
+            # and the manifest records all of those uploaded
+            self.assertEqual(in_flight[0], 0)
+            uploaded_before = set(uploaded)
+            self.assertIn(1, uploaded_before)
+            self.assertEqual(set(UploadManifest(manifest, filename).parts), uploaded_before)
+
+            # Only the parts that were not uploaded are uploaded when resuming
+            uploaded, failing_parts = [], set()
+            dxfile = dxpy.upload_local_file(filename, project="project-" + "0" * 24, resume_manifest=manifest)
+            self.assertEqual(len(files), 1)
+            self.assertEqual(set(uploaded), set(range(1, 7)) - uploaded_before)
+            parts = files[dxfile.get_id()]["parts"]
+            self.assertEqual(b"".join(parts[str(i)]["data"] for i in range(1, 7)), data)
+            self.assertEqual(files[dxfile.get_id()]["state"], "closed")
+            self.assertFalse(os.path.exists(manifest))
+        finally:
+            (dxpy.api.file_new, dxpy.api.project_describe, DXFile._describe, dxpy.api.file_upload, dxpy.DXHTTPRequest,
+             dxpy.api.file_close) = originals
+            shutil.rmtree(tmpdir)
+
+
+    def test_upload_manifest(self):
+        import shutil, tempfile
+        from dxpy.upload_manifest import UploadManifest
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filename, path = os.path.join(tmpdir, "data"), os.path.join(tmpdir, "manifest.json")
+            with open(filename, "wb") as fh:
+                fh.write(b"0" * 100)
+            manifest = UploadManifest(path, filename)
+            manifest.start("file-" + "0" * 24, "project-" + "0" * 24, 10)
+            manifest.record(1, 10, "a" * 32)
+            manifest.record(3, 10, "c" * 32)
+            # One line per part is appended
+            with open(path, "rb") as fh:
+                lines = fh.read().decode("utf-8").splitlines()
+            self.assertEqual(len(lines), 3)
+            with open(path, "ab") as fh:
+                fh.write(b'{"index": 2, "off')
+            loaded = UploadManifest(path, filename)
+            self.assertEqual((loaded.file_id, loaded.part_size), ("file-" + "0" * 24, 10))
+            self.assertEqual(loaded.parts, {1: {"offset": 0, "size": 10, "md5": "a" * 32},
+                                            3: {"offset": 20, "size": 10, "md5": "c" * 32}})
+            # Starting over with another file forgets the parts
+            loaded.start("file-" + "1" * 24, "project-" + "0" * 24, 10)
+            self.assertEqual(UploadManifest(path, filename).parts, {})
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_part_size_controller(self):
+        from dxpy.part_sizing import PartSizeController
+        MiB = 1024 * 1024
+        controller = PartSizeController(16 * MiB, 5 * MiB, 5 * 1024 * MiB, 10000, expected_file_size=1024 * MiB,
+                                        alignment=4096)
+        # 100 MB/s per connection: parts grow, doubling at most, towards 10 s worth
+        for i in range(8):
+            size = controller.part_size
+            controller.observe(size, size / 1e8)
+            controller.observe(size, size / 1e8)
+            controller.next_part_size(0, 0)
+        self.assertEqual(controller.part_size, 1e9 - 1e9 % 4096)
+        # Failures shrink them
+        controller.observe(controller.part_size, 10, attempts=2)
+        controller.observe(controller.part_size, 10, attempts=2)
+        self.assertEqual(controller.next_part_size(0, 0), (1e9 - 1e9 % 4096) // 2)
+        for i in range(20):
+            controller.observe(controller.part_size, 10, attempts=3)
+            controller.observe(controller.part_size, 10, attempts=3)
+            controller.next_part_size(0, 0)
+        self.assertEqual(controller.part_size, 5 * MiB)
+
+        # If the size of the file is not known, they shrink no further than the initial part size
+        controller = PartSizeController(16 * MiB, 5 * MiB, 5 * 1024 * MiB, 10000, alignment=4096)
+        for i in range(4):
+            controller.observe(controller.part_size, 10, attempts=3)
+            controller.observe(controller.part_size, 10, attempts=3)
+            controller.next_part_size(0, 0)
+        self.assertEqual(controller.part_size, 16 * MiB)
+
+        # Rounding up to the alignment does not exceed the largest part size
+        controller = PartSizeController(10000, 9000, 10000, 10000, alignment=4096)
+        self.assertEqual(controller.next_part_size(0, 0), 8192)
+
+        # The rest of the file must fit in the parts left
+        controller = PartSizeController(16 * MiB, 5 * MiB, 5 * 1024 * MiB, 100, expected_file_size=10 * 1024 * MiB,
+                                        alignment=4096)
+        controller.observe(16 * MiB, 10, attempts=3)
+        controller.observe(16 * MiB, 10, attempts=3)
+        size = controller.next_part_size(90 * 16 * MiB, 90)
+        self.assertGreaterEqual(size * 10, 10 * 1024 * MiB - 90 * 16 * MiB)
+        self.assertEqual(size % 4096, 0)
+
+
+    def test_streaming_upload(self):
+        import hashlib
+        from dxpy.bindings import dxfile_functions
+        part_size = 64 * 1024
+        parts = {}
+        def project_describe(object_id, input_params, **kwargs):
+            return {"fileUploadParameters": {"maximumNumParts": 10000, "minimumPartSize": part_size,
+                                             "maximumPartSize": part_size, "maximumFileSize": 2 ** 40,
+                                             "emptyLastPartAllowed": True}}
+        def file_upload(object_id, input_params, **kwargs):
+            return {"url": json.dumps(input_params), "headers": {}}
+        def http_request(get_url_and_headers, data, **kwargs):
+            input_params = json.loads(get_url_and_headers()[0])
+            self.assertEqual(hashlib.md5(data).hexdigest(), input_params["md5"])
+            time.sleep(0.01)
+            parts[input_params["index"]] = bytes(bytearray(data))
+
+        data = os.urandom(part_size * 20 + 100)
+        read_fd, write_fd = os.pipe()
+        def write_to_pipe():
+            with os.fdopen(write_fd, "wb") as fh:
+                for i in range(0, len(data), 10000):
+                    fh.write(data[i:i + 10000])
+        writer = threading.Thread(target=write_to_pipe)
+        writer.start()
+
+        originals = (dxpy.api.file_new, dxpy.api.project_describe, dxpy.api.file_upload, dxpy.DXHTTPRequest,
+                     dxpy.api.file_close, dxfile_functions.dxfile.UPLOAD_MEMORY_LIMIT)
+        dxpy.api.file_new = lambda input_params, **kwargs: {"id": "file-" + "0" * 24}
+        dxpy.api.project_describe, dxpy.api.file_upload, dxpy.DXHTTPRequest = project_describe, file_upload, http_request
+        dxpy.api.file_close = lambda *args, **kwargs: None
+        dxfile_functions.dxfile.UPLOAD_MEMORY_LIMIT = 3 * part_size
+        try:
+            with os.fdopen(read_fd, "rb") as fh:
+                dxfile = dxpy.upload_local_file(file=fh, name="stdin", project="project-" + "0" * 24)
+        finally:
+            (dxpy.api.file_new, dxpy.api.project_describe, dxpy.api.file_upload, dxpy.DXHTTPRequest,
+             dxpy.api.file_close, dxfile_functions.dxfile.UPLOAD_MEMORY_LIMIT) = originals
+            writer.join()
+        self.assertEqual(b"".join(parts[i] for i in sorted(parts)), data)
+        # Parts were read into, and uploaded from, at most three recycled buffers
+        self.assertLessEqual(dxfile._buffer_pool.snapshot()["allocated_bytes"], 3 * part_size)
+
+
+class TestParallelTransfers(unittest.TestCase):
+    def test_run_downloads(self):
+        import argparse
+        from dxpy.cli import download
+        started, in_flight, max_in_flight = [], [0], [0]
+        lock = threading.Lock()
+        def download_dxfile(dxid, filename, show_progress=False, project=None, describe_output=None):
+            # The descriptions found are reused
+            self.assertEqual(describe_output["id"], dxid)
+            with lock:
+                started.append(dxid)
+                in_flight[0] += 1
+                max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+            time.sleep(0.05)
+            with lock:
+                in_flight[0] -= 1
+
+        downloads = [("project-" + "0" * 24, {"id": "file-{}".format(i), "name": str(i), "class": "file",
+                                              "state": "closed", "size": i * 100}, str(i)) for i in range(8)]
+        downloads.append(("project-" + "0" * 24, {"id": "file-open", "name": "open", "class": "file",
+                                                  "state": "open"}, "open"))
+        args = argparse.Namespace(overwrite=True, show_progress=False, parallel_files=3)
+        original = dxpy.download_dxfile
+        dxpy.download_dxfile = download_dxfile
+        try:
+            download._run_downloads(downloads, args)
+        finally:
+            dxpy.download_dxfile = original
+        # Files that are not closed are skipped, and the largest are started first
+        self.assertEqual(sorted(started), ["file-{}".format(i) for i in range(8)])
+        self.assertEqual(set(started[:3]), {"file-7", "file-6", "file-5"})
+        self.assertEqual(max_in_flight[0], 3)
+
+        # Files downloaded to the same path are downloaded one at a time, in order
+        del started[:]
+        max_in_flight[0] = 0
+        dxpy.download_dxfile = download_dxfile
+        try:
+            download._run_downloads(downloads[:3] + [(downloads[0][0], downloads[1][1], "0")], args)
+        finally:
+            dxpy.download_dxfile = original
+        self.assertEqual(started, ["file-0", "file-1", "file-2", "file-1"])
+        self.assertEqual(max_in_flight[0], 1)
+
+    def test_run_downloads_failure(self):
+        import argparse
+        from dxpy.cli import download
+        class Exited(Exception):
+            pass
+        release, exits = threading.Event(), []
+        def download_dxfile(dxid, filename, **kwargs):
+            if dxid == "file-slow":
+                release.wait()
+            else:
+                raise IOError("failed")
+        def exit_now(code):
+            exits.append(code)
+            raise Exited()
+
+        downloads = [("project-" + "0" * 24, {"id": "file-" + name, "name": name, "class": "file", "state": "closed",
+                                              "size": size}, name) for name, size in (("slow", 100), ("fails", 1))]
+        args = argparse.Namespace(overwrite=True, show_progress=False, parallel_files=2)
+        hook = lambda: exits.append("hook")
+        originals = (dxpy.download_dxfile, os._exit)
+        dxpy.download_dxfile, os._exit = download_dxfile, exit_now
+        dxpy.cli._exit_hooks.append(hook)
+        try:
+            # Exits without waiting for the download still running, after calling the exit hooks
+            with self.assertRaises(Exited):
+                download._run_downloads(downloads, args)
+            self.assertFalse(release.is_set())
+            self.assertEqual(len(exits), 2)
+            self.assertEqual(exits[0], "hook")
+            self.assertNotEqual(exits[1], 0)
+        finally:
+            dxpy.download_dxfile, os._exit = originals
+            dxpy.cli._exit_hooks.remove(hook)
+            release.set()
+
+
+    def test_any_object_exists_in_project(self):
+        from dxpy.utils.resolver import any_object_exists_in_project
+        project, other_project = "project-" + "0" * 24, "project-" + "1" * 24
+        calls = []
+        def describe_data_objects(input_params, **kwargs):
+            calls.append(len(input_params["objects"]))
+            return {"results": [{"describe": {"id": obj["id"], "project": other_project if obj["id"] != "file-x"
+                                              else project}} for obj in input_params["objects"]]}
+        original = dxpy.api.system_describe_data_objects
+        dxpy.api.system_describe_data_objects = describe_data_objects
+        try:
+            file_ids = ["file-{:024d}".format(i) for i in range(1500)]
+            self.assertFalse(any_object_exists_in_project(file_ids, project))
+            self.assertEqual(calls, [1000, 500])
+            self.assertTrue(any_object_exists_in_project(file_ids[:10] + ["file-x"], project))
+        finally:
+            dxpy.api.system_describe_data_objects = original
+
+
+    def test_upload_directory(self):
+        import argparse, shutil, tempfile
+        from dxpy.cli import upload
+        folders, uploads = [], []
+        lock = threading.Lock()
+        class FakeFile(object):
+            def __init__(self, dxid):
+                self.dxid = dxid
+            def get_id(self):
+                return self.dxid
+            def get_proj_id(self):
+                return "project-" + "0" * 24
+        def upload_local_file(filename=None, folder=None, name=None, **kwargs):
+            with lock:
+                uploads.append((filename, folder, name))
+                return FakeFile("file-{:024d}".format(len(uploads)))
+
+        tmpdir = tempfile.mkdtemp()
+        originals = (dxpy.upload_local_file, dxpy.api.project_new_folder)
+        dxpy.upload_local_file = upload_local_file
+        dxpy.api.project_new_folder = lambda project, input_params, **kwargs: folders.append(input_params["folder"])
+        try:
+            root = os.path.join(tmpdir, "root")
+            for dirname in ("a/b", "a/c", "empty"):
+                os.makedirs(os.path.join(root, dirname))
+            for filename, size in (("x", 10), ("a/y", 30), ("a/b/z", 20)):
+                with open(os.path.join(root, filename), "wb") as fh:
+                    fh.write(b"0" * size)
+            args = argparse.Namespace(filename=root, resume=False, tags=None, types=None, hidden=False,
+                                      properties=None, details=None, show_progress=False, brief=False, wait=False,
+                                      parallel_files=4)
+            records = upload.upload_directory(args, "project-" + "0" * 24, "/dest")
+            manifest = os.path.join(tmpdir, "manifest.json")
+            upload.write_manifest(manifest, records)
+            with open(manifest) as fh:
+                self.assertEqual(json.load(fh), records)
+        finally:
+            dxpy.upload_local_file, dxpy.api.project_new_folder = originals
+            shutil.rmtree(tmpdir)
+        # Only the leaf folders are created
+        self.assertEqual(sorted(folders), ["/dest/root/a/b", "/dest/root/a/c", "/dest/root/empty"])
+        self.assertEqual(sorted(uploads), [(os.path.join(root, "a", "b", "z"), "/dest/root/a/b", "z"),
+                                           (os.path.join(root, "a", "y"), "/dest/root/a", "y"),
+                                           (os.path.join(root, "x"), "/dest/root", "x")])
+        self.assertEqual(sorted(record["path"] for record in records), sorted(upload[0] for upload in uploads))
+
+    def test_upload_directory_into_root(self):
+        import argparse, shutil, tempfile
+        from dxpy.cli import upload
+        folders, uploads = [], []
+        class FakeFile(object):
+            def get_id(self):
+                return "file-" + "0" * 24
+            def get_proj_id(self):
+                return "project-" + "0" * 24
+        def upload_local_file(filename=None, folder=None, name=None, **kwargs):
+            uploads.append((name, folder))
+            return FakeFile()
+
+        tmpdir = tempfile.mkdtemp()
+        originals = (dxpy.upload_local_file, dxpy.api.project_new_folder)
+        dxpy.upload_local_file = upload_local_file
+        dxpy.api.project_new_folder = lambda project, input_params, **kwargs: folders.append(input_params["folder"])
+        try:
+            root = os.path.join(tmpdir, "root")
+            os.makedirs(root)
+            for filename in ("x", "y"):
+                with open(os.path.join(root, filename), "wb") as fh:
+                    fh.write(b"0")
+            # With a trailing slash, as added by tab completion, the files go into the folder itself
+            args = argparse.Namespace(filename=root + "/", resume=False, tags=None, types=None, hidden=False,
+                                      properties=None, details=None, show_progress=False, brief=False, wait=False,
+                                      parallel_files=1)
+            upload.upload_directory(args, "project-" + "0" * 24, "/")
+        finally:
+            dxpy.upload_local_file, dxpy.api.project_new_folder = originals
+            shutil.rmtree(tmpdir)
+        # The root folder is not created
+        self.assertEqual(folders, [])
+        self.assertEqual(sorted(uploads), [("x", "/"), ("y", "/")])
+
+    def test_upload_directory_dangling_symlink(self):
+        import argparse, shutil, tempfile
+        from dxpy.cli import upload
+        folders = []
+        tmpdir = tempfile.mkdtemp()
+        original = dxpy.api.project_new_folder
+        dxpy.api.project_new_folder = lambda project, input_params, **kwargs: folders.append(input_params["folder"])
+        try:
+            root = os.path.join(tmpdir, "root")
+            os.makedirs(root)
+            for filename in ("x", "y"):
+                with open(os.path.join(root, filename), "wb") as fh:
+                    fh.write(b"0")
+            os.symlink(os.path.join(tmpdir, "missing"), os.path.join(root, "dangling"))
+            args = argparse.Namespace(filename=root, parallel_files=4)
+            # Reported as an error, before anything is created
+            with self.assertRaises(SystemExit):
+                upload.upload_directory(args, "project-" + "0" * 24, "/dest")
+            self.assertEqual(folders, [])
+        finally:
+            dxpy.api.project_new_folder = original
+            shutil.rmtree(tmpdir)
+
+
+class TestWaitAll(unittest.TestCase):
+    def test_wait_all(self):
+        from dxpy.exceptions import DXError, DXJobFailureError
+        jobs = [dxpy.DXJob("job-{:024d}".format(i)) for i in range(1200)]
+        files = [DXFile("file-{:024d}".format(i), project="project-" + "0" * 24) for i in range(3)]
+        polls = []
+        def job_state(job_id, poll):
+            index = int(job_id[4:])
+            if index == 7:
+                return "failed"
+            return "done" if index % 3 < poll else "running"
+        def find_executions(input_params, **kwargs):
+            polls.append(("executions", len(input_params["id"])))
+            poll = len([p for p in polls if p[0] == "executions"]) // 2
+            return {"results": [{"id": job_id, "describe": {"id": job_id, "state": job_state(job_id, poll),
+                                                            "failureReason": "AppError", "failureMessage": "oops"}}
+                                for job_id in input_params["id"]]}
+        def describe_data_objects(input_params, **kwargs):
+            polls.append(("data objects", len(input_params["objects"])))
+            return {"results": [{"describe": {"id": obj["id"], "state": "closed" if obj["id"] != files[2].get_id()
+                                              else "open"}} for obj in input_params["objects"]]}
+
+        originals = (dxpy.api.system_find_executions, dxpy.api.system_describe_data_objects)
+        dxpy.api.system_find_executions, dxpy.api.system_describe_data_objects = find_executions, describe_data_objects
+        try:
+            finished = []
+            with self.assertRaisesRegexp(DXJobFailureError, "AppError: oops.*Unexpected state: open"):
+                for handler in dxpy.wait_all(jobs + files, initial_interval=0.01, max_interval=0.02):
+                    finished.append(handler)
+            # Every object was polled in batches of at most 1000, and
+            # yielded once as it finished, except the failed ones
+            self.assertEqual(polls[:3], [("executions", 1000), ("executions", 200), ("data objects", 3)])
+            self.assertEqual(len(finished), len(set(finished)))
+            self.assertEqual(set(finished), set(jobs + files[:2]) - set([jobs[7]]))
+
+            del polls[:]
+            with self.assertRaisesRegexp(DXError, "Unexpected state: open"):
+                list(dxpy.wait_all(files, fail_fast=True))
+            self.assertEqual(len(polls), 1)
+        finally:
+            dxpy.api.system_find_executions, dxpy.api.system_describe_data_objects = originals
+
+
+class TestDownloadURLCache(unittest.TestCase):
+    def test_shared_download_urls(self):
+        import shutil, tempfile
+        from dxpy import download_url_cache
+        calls = []
+        def file_download(object_id, input_params, **kwargs):
+            calls.append(input_params)
+            return {"url": "https://dl/{}/{}".format(object_id, len(calls)), "headers": {},
+                    "expires": int((time.time() + 3600) * 1000)}
+
+        tmpdir = tempfile.mkdtemp()
+        originals = (dxpy.api.file_download, dxpy._download_url_cache, download_url_cache.REFRESH_FRACTION)
+        dxpy.api.file_download = file_download
+        try:
+            dxpy.set_download_url_cache(tmpdir)
+            file_id = "file-" + "0" * 24
+            # All handlers share the URL
+            url1, _headers = DXFile(file_id).get_download_url(preauthenticated=True)
+            url2, _headers = DXFile(file_id).get_download_url(preauthenticated=True)
+            self.assertEqual((url1, len(calls)), (url2, 1))
+            # Other inputs, and explicit durations, get their own URLs
+            self.assertNotEqual(DXFile(file_id).get_download_url(preauthenticated=True, filename="x")[0], url1)
+            self.assertNotEqual(DXFile(file_id).get_download_url(preauthenticated=True, duration=600)[0], url1)
+            self.assertEqual(len(calls), 3)
+
+            # Another process finds the URL on disk
+            dxpy.set_download_url_cache(tmpdir)
+            self.assertEqual(DXFile(file_id).get_download_url(preauthenticated=True)[0], url1)
+            self.assertEqual(len(calls), 3)
+
+            # Past most of its lifetime, the URL is still returned while a
+            # new one is fetched in the background
+            dxpy.set_download_url_cache(None)
+            url3 = DXFile(file_id).get_download_url()[0]
+            download_url_cache.REFRESH_FRACTION = 0
+            self.assertEqual(DXFile(file_id).get_download_url()[0], url3)
+            for _ in range(100):
+                if len(calls) == 5:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(len(calls), 5)
+            download_url_cache.REFRESH_FRACTION = originals[2]
+            self.assertNotEqual(DXFile(file_id).get_download_url()[0], url3)
+        finally:
+            dxpy.api.file_download, dxpy._download_url_cache, download_url_cache.REFRESH_FRACTION = originals
+            shutil.rmtree(tmpdir)
+
+
+    def test_invalidation_and_pruning(self):
+        import shutil, tempfile
+        from dxpy import download_url_cache
+        from dxpy.download_url_cache import DownloadURLCache
+        calls = []
+        def fetch(expires_in=3600):
+            calls.append(None)
+            return {"url": "https://dl/{}".format(len(calls)), "expires": int((time.time() + expires_in) * 1000)}
+
+        tmpdir = tempfile.mkdtemp()
+        original_max_entries = download_url_cache.MAX_ENTRIES
+        try:
+            cache = DownloadURLCache(tmpdir)
+            url, _headers = cache.get("a", fetch)
+            # A URL that failed is dropped, also for other processes
+            cache.invalidate_url(url)
+            self.assertNotEqual(DownloadURLCache(tmpdir).get("a", fetch)[0], url)
+            self.assertEqual(len(calls), 2)
+            self.assertEqual(os.listdir(tmpdir), ["a.json"])
+
+            # Expired entries, and the oldest beyond MAX_ENTRIES, are dropped
+            download_url_cache.MAX_ENTRIES = 150
+            cache = DownloadURLCache()
+            for i in range(100):
+                cache.get("expired-{}".format(i), lambda: fetch(expires_in=0))
+            for i in range(200):
+                cache.get("key-{}".format(i), fetch)
+            self.assertEqual(len(cache._entries), 150)
+            self.assertIn("key-199", cache._entries)
+            self.assertFalse(any(key.startswith("expired-") for key in cache._entries))
+            self.assertEqual(set(cache._fetch_locks), set(cache._entries))
+        finally:
+            download_url_cache.MAX_ENTRIES = original_max_entries
+            shutil.rmtree(tmpdir)
+
+    def test_failed_read_invalidates_url(self):
+        calls = []
+        def file_download(object_id, input_params, **kwargs):
+            calls.append(input_params)
+            return {"url": "https://dl/{}".format(len(calls)), "headers": {}}
+        def request(url, *args, **kwargs):
+            raise dxpy.exceptions.HTTPError("403 Forbidden")
+
+        originals = (dxpy.api.file_download, dxpy.DXHTTPRequest, dxpy._download_url_cache)
+        dxpy.api.file_download, dxpy.DXHTTPRequest = file_download, request
+        try:
+            dxpy.set_download_url_cache(None)
+            dxfile = DXFile("file-" + "0" * 24)
+            url, headers = dxfile.get_download_url()
+            with self.assertRaises(dxpy.exceptions.HTTPError):
+                dxpy._dxhttp_read_range(url, headers, 0, 9, 10)
+            self.assertNotEqual(dxfile.get_download_url()[0], url)
+        finally:
+            dxpy.api.file_download, dxpy.DXHTTPRequest, dxpy._download_url_cache = originals
+
+
+class TestReadAhead(unittest.TestCase):
+    def test_fit_latency_and_bandwidth(self):
+        from dxpy.read_ahead import fit_latency_and_bandwidth
+        samples = [(size, 0.05 + size / 1e8) for size in (2 ** 16, 2 ** 18, 2 ** 20, 2 ** 22)]
+        latency, bandwidth = fit_latency_and_bandwidth(samples)
+        self.assertAlmostEqual(latency, 0.05)
+        self.assertAlmostEqual(bandwidth / 1e8, 1.0)
+        self.assertIsNone(fit_latency_and_bandwidth(samples[:1]))
+        self.assertIsNone(fit_latency_and_bandwidth([(2 ** 20, 0.1), (2 ** 20, 0.2)]))
+
+    def test_controller(self):
+        from dxpy.read_ahead import ReadAheadController
+        controller = ReadAheadController(max_chunk_size=2 ** 24, max_window=16, memory_limit=2 ** 30)
+        self.assertEqual(controller.get_chunk_size(), 2 ** 16)
+        self.assertEqual(controller.get_window(), 4)
+
+        def fetch_round(wait):
+            for i in range(controller.get_window()):
+                size = controller.get_chunk_size()
+                # 50 ms latency, 100 MB/s per connection
+                controller._samples.append((size, 0.05 + size / 1e8))
+                controller._round_started -= 0.1
+                controller.consumed(size, wait)
+
+        # While the reader waits for data and throughput improves, chunks
+        # grow towards a few times the bandwidth-delay product, and the
+        # window grows
+        for i in range(8):
+            fetch_round(0.1)
+        self.assertEqual(controller.get_chunk_size(), 2 ** 24)
+        self.assertEqual(controller.get_window(), 16)
+        self.assertAlmostEqual(controller.latency, 0.05)
+
+        # A slow reader shrinks the window
+        fetch_round(0)
+        self.assertEqual(controller.get_window(), 8)
+        for i in range(4):
+            fetch_round(0)
+        self.assertEqual(controller.get_window(), 2)
+
+        # The window is bounded by the memory limit
+        controller = ReadAheadController(max_chunk_size=2 ** 24, max_window=16, memory_limit=2 ** 26)
+        for i in range(8):
+            fetch_round(0.1)
+        self.assertEqual(controller.get_chunk_size(), 2 ** 24)
+        self.assertEqual(controller.get_window(), 4)
+
+    def test_response_iterator_window(self):
+        window = [1]
+        active, max_active = [0], [0]
+        lock = threading.Lock()
+
+        def task(i):
+            with lock:
+                active[0] += 1
+                max_active[0] = max(max_active[0], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+            return i
+
+        def tasks():
+            for i in range(20):
+                yield task, [i], {}
+
+        results = []
+        for res in response_iterator(tasks(), get_futures_threadpool(8), max_active_tasks=lambda: window[0]):
+            results.append(res)
+            if res == 9:
+                window[0] = 4
+        self.assertEqual(results, list(range(20)))
+        self.assertEqual(max_active[0], 4)
+
+
+class TestJSONArrayStreamDecoder(unittest.TestCase):
+    def decode_in_chunks(self, body, array_key, chunk_size):
+        from dxpy.json_stream import JSONArrayStreamDecoder
+        decoder = JSONArrayStreamDecoder(array_key)
+        items = []
+        for i in range(0, len(body), chunk_size):
+            items.extend(decoder.feed(body[i:i + chunk_size]))
+        items.extend(decoder.close())
+        return items, decoder.fields
+
+    def test_streaming_decode(self):
+        response = {"next": {"project": "project-xxxx", "id": "file-xxxx"},
+                    "results": [{"id": "file-%04d" % i, "describe": {"name": "\u00e9 %d" % i, "size": i * 1.5,
+                                                                    "tags": ["a", "b"], "hidden": i % 2 == 0,
+                                                                    "details": None}}
+                                for i in range(100)] + [12345, "x", None],
+                    "total": 103}
+        for body in json.dumps(response).encode('utf-8'), json.dumps(response, indent=4).encode('utf-8'):
+            for chunk_size in (1, 7, 64, 1024 * 1024):
+                items, fields = self.decode_in_chunks(body, "results", chunk_size)
+                self.assertEqual(items, response["results"])
+                self.assertEqual(fields, {"next": response["next"], "total": 103})
+
+        self.assertEqual(self.decode_in_chunks(b'{"data": [], "next": null}', "data", 3), ([], {"next": None}))
+        self.assertEqual(self.decode_in_chunks(b' { } ', "data", 1), ([], {}))
+
+    def test_elements_produced_incrementally(self):
+        from dxpy.json_stream import JSONArrayStreamDecoder
+        decoder = JSONArrayStreamDecoder("data")
+        self.assertEqual(decoder.feed(b'{"length": 2, "data": [[0, "a"'), [])
+        self.assertEqual(decoder.fields, {"length": 2})
+        self.assertEqual(decoder.feed(b'], [1, 12'), [[0, "a"]])
+        # A number is only complete once the next character has been received
+        self.assertEqual(decoder.feed(b'3'), [])
+        self.assertEqual(decoder.feed(b']]'), [[1, 123]])
+        self.assertEqual(decoder.feed(b', "next": 2}'), [])
+        self.assertEqual(decoder.close(), [])
+        self.assertEqual(decoder.fields, {"length": 2, "next": 2})
+
+    def test_malformed_input(self):
+        for body in (b'{"data": [1, 2', b'{"data": [1 2]}', b'[1, 2]', b'{"data": [1]} x', b'{"data": [1,]}'):
+            with self.assertRaises(ValueError):
+                self.decode_in_chunks(body, "data", 4)
+
+
+class TestFind(unittest.TestCase):
+    def test_find_executions_by_parent(self):
+        # "byParent" and "describe" follow the results
+        response = {"results": [{"id": "job-" + "0" * 24}], "next": None, "byParent": {"job-" + "1" * 24: []},
+                    "describe": {}}
+        def find_executions(input_params, **kwargs):
+            self.assertNotIn("stream_json_array", kwargs)
+            return response
+        orig_find_executions = dxpy.api.system_find_executions
+        dxpy.api.system_find_executions = find_executions
+        try:
+            self.assertEqual(list(dxpy.find_executions()),
+                             [(response["results"][0], response["byParent"], response["describe"])])
+        finally:
+            dxpy.api.system_find_executions = orig_find_executions
+
+    def test_find_data_objects_streaming(self):
+        results = [{"id": "file-{:024d}".format(i), "project": "project-" + "0" * 24} for i in range(3)]
+        class FakeStream(object):
+            fields = {"next": None}
+            def __iter__(self):
+                return iter(results)
+        streamed = []
+        def find_data_objects(input_params, stream_json_array=None, **kwargs):
+            streamed.append(stream_json_array)
+            return FakeStream() if stream_json_array else {"results": results, "next": None}
+        orig_find_data_objects = dxpy.api.system_find_data_objects
+        dxpy.api.system_find_data_objects = find_data_objects
+        try:
+            # Pages are only streamed when asked for
+            self.assertEqual(list(dxpy.find_data_objects()), results)
+            self.assertEqual(list(dxpy.find_data_objects(stream=True)), results)
+            self.assertEqual(streamed, [None, "results"])
+        finally:
+            dxpy.api.system_find_data_objects = orig_find_data_objects
+
+
 class TestDXUtils(unittest.TestCase):
     def test_dxjsonencoder(self):
         f = DXFile("file-" + "x"*24, project="project-" + "y"*24)
@@ -109,6 +1502,44 @@ class TestDXUtils(unittest.TestCase):
         self.assertEqual(serialized,
                          '{"a": [{"b": {"$dnanexus_link": "file-xxxxxxxxxxxxxxxxxxxxxxxx"}}, {"$dnanexus_link": "record-rrrrrrrrrrrrrrrrrrrrrrrr"}]}')
 
+class TestJSONCodec(unittest.TestCase):
+    def test_codecs_agree_with_stdlib(self):
+        from dxpy import json_codec
+        f = DXFile("file-" + "x"*24, project="project-" + "y"*24)
+        values = [{"id": "file-xxxx", "name": "\u00e9\u4e2d/\"x\"", "size": 12345678901, "float": 0.1 + 0.2,
+                   "tags": [], "details": {"nested": [None, True, False, -1.5e-300]}},
+                  [[0, "chr1", 100, 200.5], [1, "chr2", 2 ** 70, -3]],
+                  "string", 3, None]
+        self.assertIn("stdlib", json_codec.available_json_codecs())
+        for name in json_codec.available_json_codecs():
+            codec = json_codec.get_json_codec(name)
+            for value in values:
+                self.assertEqual(codec.loads(codec.dumps(value)), value)
+                self.assertEqual(codec.loads(codec.dumps_bytes(value)), value)
+                self.assertEqual(codec.loads(json.dumps(value)), value)
+                self.assertEqual(codec.loads(json.dumps(value).encode('utf-8')), value)
+                for indent in (2, 4):
+                    self.assertEqual(json.loads(codec.dumps(value, indent=indent, sort_keys=True)), value)
+            self.assertEqual(codec.loads(codec.dumps({"a": f}, default=exec_utils._dxobject_to_dxlink)),
+                             {"a": {"$dnanexus_link": "file-" + "x"*24}})
+            with self.assertRaises(TypeError):
+                codec.dumps({"a": object()})
+            with self.assertRaises(ValueError):
+                codec.loads('{"a": ')
+
+    def test_select_codec(self):
+        from dxpy import json_codec
+        original_codec = json_codec.get_json_codec()
+        try:
+            json_codec.set_json_codec("stdlib")
+            self.assertEqual(json_codec.get_json_codec().name, "stdlib")
+            self.assertEqual(json_codec.dumps({"a": [1]}), '{"a": [1]}')
+            with self.assertRaises(ValueError):
+                json_codec.set_json_codec("nonexistent")
+        finally:
+            json_codec.set_json_codec(original_codec.name)
+
+
 class TestEDI(DXExecDependencyInstaller):
     def __init__(self, *args, **kwargs):
         self.command_log, self.message_log = [], []